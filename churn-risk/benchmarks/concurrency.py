@@ -0,0 +1,118 @@
+"""
+Latency benchmark of the Wave handlers with simultaneous users.
+
+Every simulated user alternates typeahead searches and profile selections at a fixed pace. A profile selection
+renders three explanation plots, simulated by a blocking call of --render-seconds, as H2O-3 mostly waits on the
+JVM while plotting. The plots are rendered under one lock, like in the app. The handlers either call the renders
+inline on the event loop, as the app used to, or await them on the TaskRunner worker pool. Run it from the
+churn-risk directory:
+
+    python -m benchmarks.concurrency --users 10
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.background import Superseded, TaskRunner
+from src.config import Configuration
+from src.search import CustomerSearch
+
+plot_kinds = ["shap", "top_negative_pd", "top_positive_pd"]
+
+
+class Handlers:
+
+    def __init__(self, customer_search, render_seconds, tasks=None):
+        self.customer_search = customer_search
+        self.render_seconds = render_seconds
+        self.tasks = tasks
+        self.plot_lock = threading.Lock()
+
+    def render(self, row_index, plot_kind):
+        with self.plot_lock:
+            time.sleep(self.render_seconds)
+        return f"{row_index}-{plot_kind}"
+
+    async def search(self, query):
+        return self.customer_search.search(query, 40)
+
+    async def show_profile(self, client_id, row_index):
+        if self.tasks is None:
+            return [self.render(row_index, plot_kind) for plot_kind in plot_kinds]
+
+        request_id = self.tasks.start(client_id)
+        try:
+            return await asyncio.gather(*[
+                self.tasks.run_for(client_id, request_id, self.render, row_index, plot_kind)
+                for plot_kind in plot_kinds
+            ])
+        finally:
+            self.tasks.finish(client_id, request_id)
+
+
+async def timed(latencies, kind, arrival, handler):
+    # Latency counts from the arrival of the request, so time spent waiting for a blocked event loop is included
+    await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+    try:
+        await handler
+    except Superseded:
+        return
+    latencies[kind].append(time.perf_counter() - arrival)
+
+
+async def simulate_user(handlers, user, args, queries, latencies, start):
+    for selection in range(args.selections):
+        arrival = start + user * args.think_seconds / args.users + selection * args.think_seconds
+        query = queries[(user + selection) % len(queries)]
+        await timed(latencies, "search", arrival, handlers.search(query))
+        row_index = user * args.selections + selection
+        await timed(latencies, "profile", arrival, handlers.show_profile(user, row_index))
+
+
+async def simulate(handlers, args, queries):
+    latencies = {"search": [], "profile": []}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        simulate_user(handlers, user, args, queries, latencies, start) for user in range(args.users)
+    ])
+    return latencies
+
+
+def report(name, latencies):
+    for kind, values in latencies.items():
+        values = np.array(values) * 1000
+        print(f"{name:<12} {kind:<8} p50 {np.percentile(values, 50):8.1f}ms  p95 {np.percentile(values, 95):8.1f}ms")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark handler latency with simultaneous users.")
+    parser.add_argument("--users", type=int, default=10, help="number of simultaneous users")
+    parser.add_argument("--selections", type=int, default=3, help="number of profiles selected by every user")
+    parser.add_argument("--render-seconds", type=float, default=0.05, help="duration of one plot render")
+    parser.add_argument("--think-seconds", type=float, default=1.0, help="time between selections of a user")
+    parser.add_argument("--workers", type=int, default=Configuration().worker_count, help="worker pool size")
+    args = parser.parse_args(args)
+
+    config = Configuration()
+    df = pd.read_csv(config.testing_data_url)
+    customer_search = CustomerSearch(df, [config.id_column] + config.search_columns)
+    queries = [str(phone)[:3] for phone in df[config.id_column].head(50)] + ["KS", "OH", "415"]
+
+    print(f"{args.users} users, {args.selections} selections each, {args.render_seconds * 1000:.0f}ms per plot")
+    inline = asyncio.run(simulate(Handlers(customer_search, args.render_seconds), args, queries))
+    report("inline", inline)
+
+    tasks = TaskRunner(args.workers)
+    try:
+        pooled = asyncio.run(simulate(Handlers(customer_search, args.render_seconds, tasks), args, queries))
+    finally:
+        tasks.shutdown()
+    report("worker pool", pooled)
+
+
+if __name__ == "__main__":
+    main()
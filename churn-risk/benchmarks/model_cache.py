@@ -0,0 +1,49 @@
+"""
+Cold-start vs warm-start benchmark of the ChurnPredictor model cache.
+
+A cold start trains the GBM and scores the testing data, a warm start loads both from the model cache.
+Run it from the churn-risk directory:
+
+    python -m benchmarks.model_cache
+"""
+import shutil
+import tempfile
+import time
+
+import h2o
+
+from src.churn_predictor import ChurnPredictor
+from src.config import Configuration
+
+
+def time_startup(churn_predictor, config):
+    start = time.perf_counter()
+    churn_predictor.build_model(config.training_data_url, config.default_model)
+    churn_predictor.set_testing_data_frame(config.testing_data_url)
+    churn_predictor.predict()
+    return time.perf_counter() - start
+
+
+def main(repeats=5):
+    config = Configuration()
+    cache_dir = tempfile.mkdtemp()
+
+    try:
+        churn_predictor = ChurnPredictor(cache_dir)
+        cold = time_startup(churn_predictor, config)
+
+        warm = []
+        for _ in range(repeats):
+            # Start every run from an empty cluster, just like a restarted pod
+            h2o.remove_all()
+            warm.append(time_startup(churn_predictor, config))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"cold start: {cold:.3f}s")
+    print(f"warm start: {min(warm):.3f}s min, {sum(warm) / len(warm):.3f}s mean over {repeats} runs")
+    print(f"speedup:    {cold / min(warm):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
 from test.e2e import walkthrough
 
+import asyncio
+import threading
+import uuid
+
+import matplotlib.pyplot as plt
 import pandas as pd
 from h2o_wave import app, main, Q, ui
 from plotly import graph_objects as go
 
+from .background import Superseded, TaskRunner
 from .churn_predictor import ChurnPredictor
 from .config import Configuration
+from .customer_store import CustomerStore
+from .explanation_cache import ExplanationCache
+from .search import CustomerSearch
 from .plots import (
     convert_plot_to_html,
     generate_figure_pie_of_target_percent,
@@ -13,101 +22,181 @@ from .plots import (
     tall_stat_card_dollars,
     wide_stat_card_dollars,
 )
-from .utils import python_code_content
+from .utils import fill_missing_values, python_code_content
 
 config = Configuration()
-churn_predictor = ChurnPredictor()
+churn_predictor = ChurnPredictor(config.model_cache_dir)
+explanation_cache = ExplanationCache(config.explanation_cache_bytes, config.warm_up_workers)
+# Blocking H2O-3 and matplotlib calls run on these workers, never on the Wave event loop
+tasks = TaskRunner(config.worker_count)
+
+# H2O-3 SHAP plots draw on the global pyplot state, so only one of them can be rendered at a time
+plot_lock = threading.Lock()
+explanation_plots = {
+    "shap": churn_predictor.get_shap_explanation,
+    "top_negative_pd": churn_predictor.get_top_negative_pd_explanation,
+    "top_positive_pd": churn_predictor.get_top_positive_pd_explanation,
+}
+explanation_titles = {
+    "shap": "",
+    "top_negative_pd": "Feature Most Contributing to Retention",
+    "top_positive_pd": "Feature Most Contributing to Churn",
+}
+
+
+def sanitize_dataframe(df):
+    fill_missing_values(df, config.def_column_values, config.mandatory_columns)
+
+
+def load_customer_store():
+    df = pd.read_csv(config.testing_data_url)
+    sanitize_dataframe(df)
+    df[config.total_charge_column] = df[config.charge_columns].sum(axis=1)
+    return CustomerStore(
+        df, config.id_column, config.column_types, config.charge_columns + [config.total_charge_column]
+    )
+
+
+customer_store = load_customer_store()
+customer_search = CustomerSearch(customer_store.frame, [config.id_column] + config.search_columns)
 
 
-df = pd.read_csv(config.testing_data_url).head(40)
-df.fillna(config.def_column_values, inplace=True)
-df.dropna(subset=config.mandatory_columns, inplace=True)
-phone_choices = [ui.choice(name=phone, label=str(phone)) for phone in df[config.id_column]]
+def get_phone_choices(query, selected_phones):
+    """
+    Return the picker choices of the customers matching the search query.
 
+    :param query: prefix of a phone number, state or area code
+    :param selected_phones: list of selected phone numbers, always kept in the choices
+    :return: list of wave UI choices
+    """
+    positions = customer_search.search(query, config.search_result_count)
+    phones = [str(phone) for phone in customer_store.get_ids_at(positions)]
+    phones = [phone for phone in selected_phones or [] if phone not in phones] + phones
+    return [ui.choice(name=phone, label=phone) for phone in phones]
 
-def show_profile(q: Q):
+
+async def show_profile(q: Q):
     del q.page["content"]
+    if q.args.customer_search is not None:
+        q.client.customer_search = q.args.customer_search
     q.page['search'] = ui.form_card(box=config.boxes['search'], items=[
         ui.text_xl("Customer Profiles from Model Predictions"),
+        ui.textbox(
+            name="customer_search",
+            label="Search by phone number, state or area code",
+            value=q.client.customer_search,
+            trigger=True,
+        ),
         ui.picker(
             name="customers",
             label="Customer Phone Number",
-            choices=phone_choices,
+            choices=get_phone_choices(q.client.customer_search, q.args.customers),
             max_choices=1,
             values=q.args.customers,
             trigger=True
        )
     ])
-    if not q.args.customers:
+    position = customer_store.get_position(q.args.customers[0]) if q.args.customers else None
+    if position is None:
       q.page["empty_profile_page"] = ui.form_card(box=config.boxes["empty_profile_page"], items=[
         ui.text_xl("To see the analysis results, you need to choose a phone number first.")
       ])
     else: 
         del q.page["empty_profile_page"]
-        df = pd.read_csv(config.testing_data_url)
-        cust_phone_no = q.args.customers[0]
-        q.client.selected_customer_index = int(df[df[config.id_column] == cust_phone_no].index[0])
-        populate_churn_plots(q)
-        populate_customer_churn_stats(cust_phone_no,df,q)
-
-
-def populate_churn_plots(q):
-    shap_plot = churn_predictor.get_shap_explanation(q.client.selected_customer_index)
-    q.page["shap_plot"] = ui.image_card(
-        box=config.boxes["shap_plot"],
-        title="",
-        type="png",
-        image=get_image_from_matplotlib(shap_plot),
-    )
+        q.client.selected_customer_index = customer_store.get_row_index(position)
+        populate_customer_churn_stats(position, q)
+        await populate_churn_plots(q)
 
-    top_negative_pd_plot = churn_predictor.get_top_negative_pd_explanation(q.client.selected_customer_index)
-    q.page["top_negative_pd_plot"] = ui.image_card(
-        box=config.boxes["top_negative_pd_plot"],
-        title="Feature Most Contributing to Retention",
-        type="png",
-        image=get_image_from_matplotlib(top_negative_pd_plot),
-    )
 
-    top_positive_pd_plot = churn_predictor.get_top_positive_pd_explanation(q.client.selected_customer_index)
-    q.page["top_positive_pd_plot"] = ui.image_card(
-        box=config.boxes["top_positive_pd_plot"],
-        title="Feature Most Contributing to Churn",
-        type="png",
-        image=get_image_from_matplotlib(top_positive_pd_plot),
-    )
+def render_explanation(key):
+    _, row_index, plot_kind = key
+    if plot_kind != "shap":
+        # Partial dependence plots are drawn on their own figures, outside of pyplot
+        return get_image_from_matplotlib(explanation_plots[plot_kind](row_index))
+
+    with plot_lock:
+        figure = explanation_plots[plot_kind](row_index)
+        image = get_image_from_matplotlib(figure)
+        plt.close(figure)
+    return image
+
 
+def get_explanation_image(row_index, plot_kind):
+    key = (churn_predictor.model_key, row_index, plot_kind)
+    return explanation_cache.get_or_render(key, render_explanation)
 
-def populate_customer_churn_stats(cust_phone_no, df, q):
-    df["Total Charges"] = (df.Total_Day_charge + df.Total_Eve_Charge + df.Total_Night_Charge + df.Total_Intl_Charge)
 
-    df = df[
-        [
-            "Total_Day_charge",
-            "Total_Eve_Charge",
-            "Total_Night_Charge",
-            "Total_Intl_Charge",
-            config.id_column,
-            "Total Charges",
-        ]
+def warm_up_explanations():
+    keys = [
+        (churn_predictor.model_key, row_index, plot_kind)
+        for row_index in churn_predictor.get_highest_churn_rows(config.warm_up_customers)
+        for plot_kind in explanation_plots
     ]
+    explanation_cache.warm_up(keys, render_explanation)
 
-    df.columns = ["Day Charges", "Evening Charges", "Night Charges", "Int'l Charges", config.id_column, "Total Charges"]
 
-    q.page["day_stat"] = wide_stat_card_dollars(
-        df, cust_phone_no, "Day Charges", config.boxes["day_stat"], config.color
-    )
-    q.page["eve_stat"] = wide_stat_card_dollars(
-        df, cust_phone_no, "Evening Charges", config.boxes["eve_stat"], config.color
-    )
-    q.page["night_stat"] = wide_stat_card_dollars(
-        df, cust_phone_no, "Night Charges", config.boxes["night_stat"], config.color
-    )
-    q.page["intl_stat"] = wide_stat_card_dollars(
-        df, cust_phone_no, "Int'l Charges", config.boxes["intl_stat"], config.color
+async def populate_churn_plots(q):
+    """
+    Show the explanation plots of the selected customer.
+
+    Cached plots are shown right away, the others get a progress card and are rendered on the worker pool, each
+    one shown as soon as it is ready. A newer selection of the same client supersedes the pending renders.
+    """
+    row_index = q.client.selected_customer_index
+    request_id = tasks.start(q.client.client_id)
+
+    missing_plots = []
+    for plot_kind in explanation_plots:
+        image = explanation_cache.get((churn_predictor.model_key, row_index, plot_kind))
+        if image is None:
+            missing_plots.append(plot_kind)
+            q.page[f"{plot_kind}_plot"] = ui.form_card(box=config.boxes[f"{plot_kind}_plot"], items=[
+                ui.progress(label="Rendering explanation", caption=explanation_titles[plot_kind])
+            ])
+        else:
+            show_explanation_image(q, plot_kind, image)
+
+    if not missing_plots:
+        tasks.finish(q.client.client_id, request_id)
+        return
+
+    await q.page.save()
+    try:
+        await asyncio.gather(*[
+            render_explanation_card(q, request_id, row_index, plot_kind) for plot_kind in missing_plots
+        ])
+    except Superseded:
+        return
+    tasks.finish(q.client.client_id, request_id)
+
+
+async def render_explanation_card(q, request_id, row_index, plot_kind):
+    image = await tasks.run_for(q.client.client_id, request_id, get_explanation_image, row_index, plot_kind)
+    show_explanation_image(q, plot_kind, image)
+    await q.page.save()
+
+
+def show_explanation_image(q, plot_kind, image):
+    q.page[f"{plot_kind}_plot"] = ui.image_card(
+        box=config.boxes[f"{plot_kind}_plot"],
+        title=explanation_titles[plot_kind],
+        type="png",
+        image=image,
     )
+
+
+def populate_customer_churn_stats(position, q):
+    customer = customer_store.get_record(position, [config.id_column] + config.charge_columns)
+    cust_phone_no = customer[config.id_column]
+
+    for column, label, box in zip(config.charge_columns, config.charge_labels, config.charge_boxes):
+        charge, rank = customer_store.get_percentile(position, column)
+        q.page[box] = wide_stat_card_dollars(charge, rank, label, config.boxes[box], config.color)
+
+    charge, rank = customer_store.get_percentile(position, config.total_charge_column)
     q.page["total_stat"] = tall_stat_card_dollars(
-        df,
-        cust_phone_no,
+        charge,
+        rank,
         "Total Charges",
         config.boxes["total_stat"],
         config.total_gauge_color,
@@ -120,15 +209,10 @@ def populate_customer_churn_stats(cust_phone_no, df, q):
         value=f"{churn_predictor.get_churn_rate_of_customer(q.client.selected_customer_index)}%",
     )
 
-    labels = ["Day Charges", "Evening Charges", "Night Charges", "Int'l Charges"]
-    values = [
-        df[df[config.id_column] == cust_phone_no][labels[0]].values[0],
-        df[df[config.id_column] == cust_phone_no][labels[1]].values[0],
-        df[df[config.id_column] == cust_phone_no][labels[2]].values[0],
-        df[df[config.id_column] == cust_phone_no][labels[3]].values[0],
-    ]
+    labels = config.charge_labels
+    values = [customer[column] for column in config.charge_columns]
 
-    html_plot = generate_figure_pie_of_target_percent( "", labels, values, get_figure_layout())
+    html_plot = generate_figure_pie_of_target_percent("", labels, values, get_figure_layout())
 
     q.page["stat_pie"] = ui.frame_card(
         box=config.boxes["stat_pie"],
@@ -141,12 +225,38 @@ def get_figure_layout():
     return go.Layout(margin=go.layout.Margin(l=0, r=0, b=0, t=0, pad=0, autoexpand=True))
 
 
-async def initialize(q: Q):
+def load_model():
     # Initialize H2O-3 model and tests data set
     churn_predictor.build_model(config.training_data_url, config.default_model)
     churn_predictor.set_testing_data_frame(config.testing_data_url)
     churn_predictor.predict()
+    if config.warm_up_customers:
+        warm_up_explanations()
 
+
+async def wait_for_model(q: Q):
+    """
+    Load the model on the worker pool once for all clients, showing a progress card meanwhile.
+    """
+    if q.app.model_loaded:
+        return
+
+    q.page["loading"] = ui.form_card(box=config.boxes["content"], items=[
+        ui.progress(label="Loading the churn model", caption="Training or loading the model and scoring customers")
+    ])
+    await q.page.save()
+
+    if q.app.model_lock is None:
+        q.app.model_lock = asyncio.Lock()
+    async with q.app.model_lock:
+        if not q.app.model_loaded:
+            await tasks.run(load_model)
+            q.app.model_loaded = True
+    del q.page["loading"]
+
+
+async def initialize(q: Q):
+    q.client.client_id = str(uuid.uuid4())
     q.app.header_png = await q.site.upload([config.image_path])
     q.app.training_file_url = await q.site.upload([config.working_data])
     q.page["title"] = ui.header_card(
@@ -166,6 +276,7 @@ async def initialize(q: Q):
         ],
     )
     q.page['meta'] = ui.meta_card(box='', title='Telcom Churn Analytics')
+    await wait_for_model(q)
     q.client.app_initialized = True
 
 
@@ -177,6 +288,6 @@ async def serve(q: Q):
     if q.args['#'] == 'tour':
         q.page["content"] = ui.form_card(box=config.boxes["content"], items=python_code_content("app.py"))
     else:
-        show_profile(q)
+        await show_profile(q)
 
     await q.page.save()
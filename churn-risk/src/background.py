@@ -0,0 +1,90 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Superseded(Exception):
+    """
+    Raised when the result of a call is no longer wanted because the client started a newer request.
+    """
+
+
+class TaskRunner:
+    """
+    Runs blocking calls on a pool of worker threads so the Wave event loop keeps serving other clients.
+
+    Calls are grouped into requests per client. Starting a new request supersedes the pending one of the same
+    client: its calls which have not started yet are cancelled, and awaiting any of its results raises
+    Superseded, so a stale selection never overwrites the page of a newer one.
+    """
+
+    def __init__(self, max_workers):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-runner")
+        self._requests = {}
+        self._pending = {}
+        self._next_request = 0
+
+    async def run(self, func, *args):
+        """
+        Run a blocking call on the worker pool and wait for its result without blocking the event loop.
+
+        :param func: function to call
+        :param args: arguments of the function
+        :return: result of the call
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def start(self, client_id):
+        """
+        Start a new request of a client, superseding its pending one.
+
+        :param client_id: unique id of the client
+        :return: request id to pass to run_for()
+        """
+        for future in self._pending.pop(client_id, []):
+            future.cancel()
+
+        self._next_request += 1
+        self._requests[client_id] = self._next_request
+        return self._next_request
+
+    def is_current(self, client_id, request_id):
+        return self._requests.get(client_id) == request_id
+
+    def finish(self, client_id, request_id):
+        if self.is_current(client_id, request_id):
+            del self._requests[client_id]
+            self._pending.pop(client_id, None)
+
+    async def run_for(self, client_id, request_id, func, *args):
+        """
+        Run a blocking call of a client request on the worker pool.
+
+        :param client_id: unique id of the client
+        :param request_id: request id returned by start()
+        :param func: function to call
+        :param args: arguments of the function
+        :return: result of the call
+        :raises Superseded: if the client started a newer request in the meantime
+        """
+        if not self.is_current(client_id, request_id):
+            raise Superseded()
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        pending = self._pending.setdefault(client_id, [])
+        pending.append(future)
+        try:
+            result = await future
+        except asyncio.CancelledError:
+            if future.cancelled() and not self.is_current(client_id, request_id):
+                raise Superseded()
+            raise
+        finally:
+            if future in pending:
+                pending.remove(future)
+
+        if not self.is_current(client_id, request_id):
+            raise Superseded()
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,147 @@
+"""
+Batch scoring of customer churn outside of the Wave app.
+
+Streams an arbitrarily large customer CSV in chunks, scores the chunks in parallel and writes the churn
+probability with the top contributing features of every customer to a Parquet file, one row group per chunk.
+Chunks are scored by the native model in worker processes, or by the H2O-3 cluster from worker threads when the
+model could not be exported.
+Run it from the churn-risk directory:
+
+    python -m src.batch_score --input customers.csv --output churn_scores.parquet
+"""
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .churn_predictor import ChurnPredictor
+from .config import Configuration
+from .scored_results import ScoredResults
+from .utils import fill_missing_values
+
+# Native model of a worker process, sent once when the process starts instead of with every chunk
+worker_model = None
+
+
+def get_output_schema(config):
+    """
+    Return the schema of the Parquet file, fixed so that every chunk is written with the same column types.
+    """
+    return pa.schema([
+        (config.id_column, pa.string()),
+        ("churn_probability", pa.float64()),
+        ("top_positive_feature", pa.string()),
+        ("top_positive_contribution", pa.float64()),
+        ("top_negative_feature", pa.string()),
+        ("top_negative_contribution", pa.float64()),
+    ])
+
+
+def score_chunk(score_batch, config, chunk):
+    fill_missing_values(chunk, config.def_column_values, config.mandatory_columns)
+    if chunk.empty:
+        return None
+
+    scores = score_batch(chunk).get_top_contributions_frame()
+    scores = scores.rename(columns={"score": "churn_probability"})
+    scores.insert(0, config.id_column, chunk[config.id_column].to_numpy())
+    return scores
+
+
+def init_worker(native_model):
+    global worker_model
+    worker_model = native_model
+
+
+def score_chunk_in_worker(config, chunk):
+    return score_chunk(lambda df: ScoredResults(*worker_model.score_frames(df), "TRUE"), config, chunk)
+
+
+def score_file(churn_predictor, config, input_path, output_path, chunk_size, workers):
+    """
+    Score a customer CSV file chunk by chunk and write the results to a Parquet file.
+
+    At most twice as many chunks as workers are held in memory at any time, and chunks are written in input order.
+    The native model scores in worker processes, as encoding and scoring a chunk holds the GIL. H2O-3 scores in its
+    own multi-threaded cluster, so worker threads only wait for it.
+
+    :param churn_predictor: ChurnPredictor with a built model
+    :param config: app Configuration
+    :param input_path: path of the customer CSV file
+    :param output_path: path of the Parquet file to write
+    :param chunk_size: number of customers per chunk
+    :param workers: number of chunks scored in parallel
+    :return: number of scored customers
+    """
+    writer = None
+    scored_rows = 0
+    start = time.perf_counter()
+    schema = get_output_schema(config)
+
+    def write(scores):
+        nonlocal writer, scored_rows
+        if scores is None:
+            return
+
+        # Chunks may parse the same column into different types, e.g. int64 and float64 when one has a NaN
+        table = pa.Table.from_pandas(scores, schema=schema, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(output_path, schema)
+        writer.write_table(table)
+
+        scored_rows += len(scores)
+        elapsed = time.perf_counter() - start
+        print(f"scored {scored_rows} rows in {elapsed:.1f}s ({scored_rows / elapsed:.0f} rows/s)", file=sys.stderr)
+
+    if churn_predictor.native_model:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(churn_predictor.native_model,))
+        score, args = score_chunk_in_worker, (config,)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        score, args = score_chunk, (churn_predictor.score_batch, config)
+
+    pending = deque()
+    try:
+        with executor:
+            # Customer ids are kept as written, e.g. with their leading zeros
+            for chunk in pd.read_csv(input_path, chunksize=chunk_size, dtype={config.id_column: str}):
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+                pending.append(executor.submit(score, *args, chunk))
+
+            while pending:
+                write(pending.popleft().result())
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return scored_rows
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Score customer churn of a CSV file in batch.")
+    parser.add_argument("--input", required=True, help="path of the customer CSV file")
+    parser.add_argument("--output", required=True, help="path of the Parquet file to write")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="number of customers per chunk")
+    parser.add_argument("--workers", type=int, default=2, help="number of chunks scored in parallel")
+    args = parser.parse_args(args)
+
+    config = Configuration()
+    churn_predictor = ChurnPredictor(config.model_cache_dir)
+    churn_predictor.build_model(config.training_data_url, config.default_model)
+
+    start = time.perf_counter()
+    scored_rows = score_file(churn_predictor, config, args.input, args.output, args.chunk_size, args.workers)
+    elapsed = time.perf_counter() - start
+    rate = scored_rows / max(elapsed, 1e-9)
+    print(f"done: {scored_rows} rows in {elapsed:.1f}s ({rate:.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
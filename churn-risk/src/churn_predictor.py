@@ -1,6 +1,15 @@
+import os
+
 import h2o
+import numpy as np
+import pandas as pd
 from h2o.estimators.gbm import H2OGradientBoostingEstimator
 
+from .model_cache import ModelCache
+from .partial_dependence import PartialDependence
+from .scored_results import ScoredResults
+from .tree_scorer import TreeEnsemble
+
 
 class ChurnPredictor:
     """
@@ -8,39 +17,198 @@ class ChurnPredictor:
 
     ChurnPredictor builds an abstraction between H2O-3 machine learning library and the Churn Risk app
     giving the developer freedom to integrate any 3rd party machine library with a minimal change to the app code.
+
+    The H2O-3 cluster is only started to train the model, or to score and explain with H2O-3 when the model could
+    not be exported to the native scorer. A native model loaded from the cache serves without the JVM.
     """
 
-    def __init__(self):
+    native_model_file = "native_model.npz"
+    native_model_tolerance = 1e-6
+    # H2O-3 computes the contributions in single precision
+    native_contributions_tolerance = 1e-5
+    # Number of customers the partial dependence curves are averaged over
+    partial_dependence_rows = 5000
+
+    def __init__(self, cache_dir=None):
         self.model = None
+        self.model_id = None
+        self.native_model = None
+        self.model_key = None
         self.train_df = None
         self.test_df = None
+        self.testing_df = None
+        self.testing_data_path = None
         self.predicted_df = None
         self.contributions_df = None
+        self.scored = None
+        self.partial_dependence = None
+        self.cache = ModelCache(cache_dir) if cache_dir else None
+        self.h2o_started = False
 
-        h2o.init()
+    def start_h2o(self):
+        """
+        Start the H2O-3 cluster, or connect to a running one, unless it was already done.
+        """
+        if not self.h2o_started:
+            h2o.init()
+            self.h2o_started = True
 
     def build_model(self, training_data_path, model_id):
+        """
+        Train the GBM model, or load it from the model cache when it was already trained on the same data.
+
+        :param training_data_path: path of the training data file
+        :param model_id: H2O-3 model id
+        """
+        params = {"model_id": model_id, "seed": 1234}
+        self.model_id = model_id
+
+        if self.cache:
+            self.model_key = self.cache.get_key(training_data_path, params)
+            native_model_path = self.cache.get_artifact_path(self.model_key, "native_model_path")
+            if native_model_path:
+                # Scored and explained in-process, neither the H2O-3 model nor the cluster are needed
+                self.native_model = TreeEnsemble.load(native_model_path)
+                return
+
+            model_path = self.cache.get_model_path(self.model_key)
+            if model_path:
+                self.start_h2o()
+                self.model = h2o.load_model(model_path)
+                return
+
+        self.start_h2o()
         train_df = h2o.import_file(
             path=training_data_path, destination_frame="telco_churn_train.csv"
         )
 
         predictors = train_df.columns
         response = "Churn?"
-        train, valid = train_df.split_frame([0.8])
+        train, valid = train_df.split_frame([0.8], seed=params["seed"])
 
-        self.model = H2OGradientBoostingEstimator(model_id=model_id, seed=1234)
+        self.model = H2OGradientBoostingEstimator(**params)
         self.model.train(
             x=predictors, y=response, training_frame=train, validation_frame=valid
         )
+        self.model_key = self.model_key or self.model.model_id
+        self.native_model = self.export_native_model(train, valid)
+
+        if self.cache:
+            model_dir = self.cache.get_model_dir(self.model_key)
+            model_path = h2o.save_model(self.model, path=model_dir, force=True)
+            self.cache.save_model_path(self.model_key, model_path)
+
+            if self.native_model:
+                native_model_path = os.path.join(model_dir, self.native_model_file)
+                self.native_model.save(native_model_path)
+                self.cache.save_artifact_path(self.model_key, "native_model_path", native_model_path)
+
+    def export_native_model(self, train, valid):
+        """
+        Export the trained model to the in-process tree scorer.
+
+        The exported model is only used when it reproduces both the H2O-3 predictions and contributions of the
+        validation frame.
+
+        :param train: H2OFrame the model was trained on
+        :param valid: H2OFrame to verify the exported model on
+        :return: TreeEnsemble or None
+        """
+        try:
+            native_model = TreeEnsemble.from_h2o(self.model, train.as_data_frame())
+        except ValueError:
+            return None
+
+        matrix = native_model.encode(valid.as_data_frame())
+        expected = self.model.predict(valid).as_data_frame()["TRUE"].to_numpy()
+        if not np.allclose(native_model.predict(matrix), expected, rtol=0, atol=self.native_model_tolerance):
+            return None
+
+        expected = self.model.predict_contributions(valid).as_data_frame()
+        expected = expected[native_model.feature_names + ["BiasTerm"]].to_numpy()
+        actual = np.column_stack([
+            native_model.predict_contributions(matrix), np.full(len(matrix), native_model.expected_value())
+        ])
+        if not np.allclose(actual, expected, rtol=0, atol=self.native_contributions_tolerance):
+            return None
+        return native_model
 
     def set_testing_data_frame(self, testing_data_path):
-        self.test_df = h2o.import_file(
-            path=testing_data_path, destination_frame="telco_churn_test.csv"
-        )
+        self.testing_data_path = testing_data_path
+        if not self.native_model:
+            # Only H2O-3 needs the testing data in the cluster, to score and explain it
+            self.test_df = h2o.import_file(
+                path=testing_data_path, destination_frame="telco_churn_test.csv"
+            )
 
     def predict(self):
-        self.predicted_df = self.model.predict(self.test_df)
-        self.contributions_df = self.model.predict_contributions(self.test_df)
+        """
+        Score the testing data frame, reusing the cached predictions and contributions when available.
+
+        The data is scored in-process by the native model when there is one, and by H2O-3 otherwise.
+        The results are materialised once into NumPy lookup tables, see ScoredResults.
+        """
+        frames = self.cache.load_frames(self.model_key, self.testing_data_path) if self.cache else None
+        testing_df = pd.read_csv(self.testing_data_path)
+        self.testing_df = testing_df
+
+        if frames is None and self.native_model:
+            frames = self.native_model.score_frames(testing_df)
+
+            if self.cache:
+                self.cache.save_frames(self.model_key, self.testing_data_path, *frames)
+
+        if frames is None:
+            self.predicted_df = self.model.predict(self.test_df)
+            self.contributions_df = self.model.predict_contributions(self.test_df)
+            frames = self.predicted_df.as_data_frame(), self.contributions_df.as_data_frame()
+
+            if self.cache:
+                self.cache.save_frames(self.model_key, self.testing_data_path, *frames)
+
+        predictions, contributions = frames
+        self.scored = ScoredResults(predictions, contributions, "TRUE")
+        self.partial_dependence = PartialDependence(
+            self.predict_scores, testing_df, self.scored.feature_names, max_rows=self.partial_dependence_rows
+        )
+
+    def predict_scores(self, df):
+        """
+        Return the churn probabilities of a batch of customers, without contributions.
+
+        :param df: Pandas DataFrame of customers
+        :return: NumPy array of churn probabilities
+        """
+        if self.native_model:
+            return self.native_model.predict(self.native_model.encode(df))
+
+        frame = h2o.H2OFrame(df)
+        predicted_df = self.model.predict(frame)
+        try:
+            return predicted_df.as_data_frame()["TRUE"].to_numpy()
+        finally:
+            for h2o_frame in (frame, predicted_df):
+                h2o.remove(h2o_frame)
+
+    def score_batch(self, df):
+        """
+        Score a batch of customers outside of the testing data frame.
+
+        :param df: Pandas DataFrame of customers
+        :return: ScoredResults of the batch
+        """
+        if self.native_model:
+            return ScoredResults(*self.native_model.score_frames(df), "TRUE")
+
+        frame = h2o.H2OFrame(df)
+        predicted_df = self.model.predict(frame)
+        contributions_df = self.model.predict_contributions(frame)
+        try:
+            return ScoredResults(predicted_df.as_data_frame(), contributions_df.as_data_frame(), "TRUE")
+        finally:
+            # Free the cluster memory right away, batches are scored one after the other
+            for h2o_frame in (frame, predicted_df, contributions_df):
+                h2o.remove(h2o_frame)
 
     def get_churn_rate_of_customer(self, row_index):
         """
@@ -49,47 +217,43 @@ class ChurnPredictor:
         :param row_index: row index of the customer in dataframe
         :return: percentage as a float
         """
-        return round(
-            float(self.predicted_df.as_data_frame()["TRUE"][row_index]) * 100, 2
-        )
+        return round(self.scored.get_score(row_index) * 100, 2)
+
+    def get_highest_churn_rows(self, count):
+        """
+        Return the row indices of the customers with the highest churn rates.
+
+        :param count: number of customers to return
+        :return: list of row indices, highest churn rate first
+        """
+        return self.scored.get_highest_score_rows(count).tolist()
 
     def get_shap_explanation(self, row_index):
+        """
+        Return the SHAP explanation of a customer, drawn from the native contributions when there is a native model.
+
+        :param row_index: row index of the customer in the testing data frame
+        :return: matplotlib figure object
+        """
+        if self.native_model:
+            title = f'SHAP explanation for "{self.model_id}" on row {row_index}'
+            return self.scored.plot_contributions(row_index, title, self.testing_df.iloc[row_index].to_dict())
         return self.model.shap_explain_row_plot(frame=self.test_df, row_index=row_index)
 
     def get_top_negative_pd_explanation(self, row_index):
         """
         Return the partial dependence explanation of the top negatively contributing feature.
 
-        :param row_index: row index to select from H2OFrame for the explanation
+        :param row_index: row index of the customer in the testing data frame
         :return: matplotlib figure object
         """
-        # column_index = self.contributions_df.idxmin(axis=1).as_data_frame()[
-        #     "which.min"
-        # ][row_index]
-
-        # Using Pandas DataFrame.idxmin() until https://h2oai.atlassian.net/browse/PUBDEV-7906 is fixed
-        pdf = self.contributions_df.as_data_frame()
-        del pdf["BiasTerm"]  # Delete bias column added by predict_contributions()
-        min_column_name = pdf.idxmin(axis=1)[row_index]
-
-        return self.model.pd_plot(
-            frame=self.test_df,
-            row_index=row_index,
-            column=min_column_name,
-        )
+        return self.partial_dependence.plot(row_index, self.scored.get_top_negative_feature(row_index))
 
     def get_top_positive_pd_explanation(self, row_index):
         """
         Return the partial dependence explanation of the top positively contributing feature.
 
-        :param row_index: row index to select from H2OFrame for the explanation
+        :param row_index: row index of the customer in the testing data frame
         :return: matplotlib figure object
         """
-        column_index = self.contributions_df.idxmax(axis=1).as_data_frame()[
-            "which.max"
-        ][row_index]
-        return self.model.pd_plot(
-            frame=self.test_df,
-            row_index=row_index,
-            column=self.test_df.col_names[column_index],
-        )
+        return self.partial_dependence.plot(row_index, self.scored.get_top_positive_feature(row_index))
@@ -11,6 +11,14 @@ class Configuration:
         self.training_path = "data/churnTrain.csv"
         self.testing_path = "data/churnTest.csv"
         self.default_model = "telco_churn_model"
+        self.model_cache_dir = "./model_cache"
+
+        self.explanation_cache_bytes = 64 * 1024 * 1024
+        # Number of highest churn rate customers whose explanations are rendered in the background at startup
+        self.warm_up_customers = 20
+        self.warm_up_workers = 1
+        # Worker threads running the blocking H2O-3 and matplotlib calls of the Wave handlers
+        self.worker_count = 4
 
         self.y_col = "Churn"
         self.x_cols = [
@@ -37,6 +45,27 @@ class Configuration:
         ]
 
         self.id_column = "Phone_No"
+        self.column_types = {
+            "State": "category",
+            "Account_Length": "int32",
+            "Area_Code": "int16",
+            "Phone_No": "int64",
+            "International_Plan": "category",
+            "Voice_Mail_Plan": "category",
+            "No_Vmail_Messages": "int16",
+            "Total_Day_Calls": "int16",
+            "Total_Eve_Calls": "int16",
+            "Total_Night_Calls": "int16",
+            "Total_Intl_Calls": "int16",
+            "No_CS_Calls": "int16",
+        }
+        self.charge_columns = ["Total_Day_charge", "Total_Eve_Charge", "Total_Night_Charge", "Total_Intl_Charge"]
+        self.charge_labels = ["Day Charges", "Evening Charges", "Night Charges", "Int'l Charges"]
+        self.charge_boxes = ["day_stat", "eve_stat", "night_stat", "intl_stat"]
+        self.total_charge_column = "Total_Charges"
+
+        self.search_columns = ["State", "Area_Code"]
+        self.search_result_count = 40
 
         self.title = "Telecom Churn Analytics"
         self.subtitle = "EDA & Churn Modeling with AutoML & Wave"
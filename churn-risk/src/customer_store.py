@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+
+class CustomerStore:
+    """
+    Columnar in-memory store of customers.
+
+    The customers are loaded once at startup into typed columns, and a hash index maps each customer id to its row
+    position, so fetching a customer costs a single index probe no matter how many customers there are.
+    Percentile ranks of the ranked columns are computed once as well.
+    """
+
+    def __init__(self, df, id_column, column_types=None, ranked_columns=None):
+        """
+        :param df: Pandas DataFrame of sanitized customers, its index holds the row indices of the scored frame
+        :param id_column: column holding the unique customer ids
+        :param column_types: optional dict of column name to dtype
+        :param ranked_columns: optional list of numeric columns to precompute percentile ranks for
+        """
+        if column_types:
+            df = df.astype({column: dtype for column, dtype in column_types.items() if column in df.columns})
+
+        self.id_column = id_column
+        self.frame = df.reset_index(drop=True)
+        self.row_indices = df.index.to_numpy()
+        self.columns = {column: self.frame[column].array for column in self.frame.columns}
+
+        self._index = pd.Index(self.frame[id_column])
+        if not self._index.is_unique:
+            raise ValueError(f"Column {id_column} contains duplicate customer ids")
+
+        self.percentiles = {
+            column: self.frame[column].rank(pct=True).to_numpy() for column in ranked_columns or []
+        }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __contains__(self, customer_id):
+        return self.get_position(customer_id) is not None
+
+    def get_position(self, customer_id):
+        """
+        Return the row position of a customer in the store.
+
+        :param customer_id: customer id, either typed or as a string coming from the UI
+        :return: row position as an int or None if the customer does not exist
+        """
+        try:
+            key = self._index.dtype.type(customer_id)
+            return self._index.get_loc(key)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_row_index(self, position):
+        """
+        Return the row index of a customer in the scored data frame.
+
+        :param position: row position returned by get_position()
+        :return: row index as an int
+        """
+        return int(self.row_indices[position])
+
+    def get_record(self, position, columns=None):
+        """
+        Return the fields of a customer.
+
+        :param position: row position returned by get_position()
+        :param columns: optional list of columns to return, defaults to all columns
+        :return: dict of column name to value
+        """
+        return {column: to_python(self.columns[column][position]) for column in (columns or self.columns)}
+
+    def get_percentile(self, position, column):
+        """
+        Return the value of a customer and its percentile rank among all customers.
+
+        :param position: row position returned by get_position()
+        :param column: one of the ranked columns
+        :return: tuple of (value, percentile rank between 0 and 1)
+        """
+        return to_python(self.columns[column][position]), float(self.percentiles[column][position])
+
+    def get_ids(self, count=None):
+        ids = self.frame[self.id_column]
+        return ids.to_numpy() if count is None else ids.head(count).to_numpy()
+
+    def get_ids_at(self, positions):
+        return self.frame[self.id_column].to_numpy()[positions]
+
+
+def to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExplanationCache:
+    """
+    Least recently used cache of rendered explanation images.
+
+    Images are base64 encoded PNG strings keyed by (model id, row index, plot kind). The cache is bounded by
+    the total size of the stored images rather than by their count, as plot sizes differ a lot.
+    """
+
+    def __init__(self, max_bytes, max_workers=1):
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._images
+
+    def __len__(self):
+        with self._lock:
+            return len(self._images)
+
+    def get(self, key):
+        """
+        Return the cached image and mark it as recently used.
+
+        :param key: tuple of (model id, row index, plot kind)
+        :return: base64 encoded image or None on a cache miss
+        """
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        """
+        Store an image, evicting the least recently used ones until the cache fits into max_bytes.
+
+        :param key: tuple of (model id, row index, plot kind)
+        :param image: base64 encoded image
+        """
+        image_size = len(image)
+        if image_size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._images:
+                self.size -= len(self._images.pop(key))
+            while self._images and self.size + image_size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+            self._images[key] = image
+            self.size += image_size
+
+    def get_or_render(self, key, render):
+        """
+        Return the cached image, rendering and caching it on a miss.
+
+        :param key: tuple of (model id, row index, plot kind)
+        :param render: function which takes the key and returns a base64 encoded image
+        :return: base64 encoded image
+        """
+        image = self.get(key)
+        if image is None:
+            image = render(key)
+            self.put(key, image)
+        return image
+
+    def warm_up(self, keys, render):
+        """
+        Render the images of the given keys in the background.
+
+        :param keys: iterable of (model id, row index, plot kind) tuples, most important first
+        :param render: function which takes a key and returns a base64 encoded image
+        :return: list of futures, one per image which was not cached yet
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="explanations")
+
+        return [
+            self._executor.submit(self._warm_up_key, key, render)
+            for key in keys if key not in self
+        ]
+
+    def _warm_up_key(self, key, render):
+        # The key may have been rendered by a request while it was waiting in the queue
+        if key not in self:
+            self.put(key, render(key))
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size = 0
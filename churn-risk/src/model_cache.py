@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+class ModelCache:
+    """
+    On-disk cache for trained model artifacts and their scoring results.
+
+    Every artifact lives in a directory named after a content hash of the training file and the estimator
+    parameters, so the model is only retrained when the data or the model configuration changes.
+    """
+
+    manifest_file = "manifest.json"
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def get_key(self, training_data_path, params):
+        """
+        Return the cache key of a model.
+
+        :param training_data_path: path of the training data file
+        :param params: dict of estimator parameters
+        :return: hex digest as a string
+        """
+        digest = hashlib.sha256()
+        digest.update(get_file_digest(training_data_path).encode("utf-8"))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def get_model_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get_model_path(self, key):
+        """
+        Return the path of the cached model binary, or None if the model has not been saved yet.
+
+        :param key: cache key returned by get_key()
+        :return: path as a string or None
+        """
+        return self.get_artifact_path(key, "model_path")
+
+    def save_model_path(self, key, model_path):
+        self.save_artifact_path(key, "model_path", model_path)
+
+    def get_artifact_path(self, key, name):
+        """
+        Return the path of a cached model artifact, or None if it has not been saved yet.
+
+        :param key: cache key returned by get_key()
+        :param name: name of the artifact in the manifest
+        :return: path as a string or None
+        """
+        manifest = self._read_manifest(key)
+        path = manifest.get(name)
+        if path and os.path.exists(path):
+            return path
+        return None
+
+    def save_artifact_path(self, key, name, path):
+        manifest = self._read_manifest(key)
+        manifest[name] = path
+        self._write_manifest(key, manifest)
+
+    def load_frames(self, key, testing_data_path):
+        """
+        Return the cached predictions and contributions of the given testing data.
+
+        :param key: cache key of the model which scored the data
+        :param testing_data_path: path of the scored data file
+        :return: tuple of Pandas DataFrames (predictions, contributions) or None on a cache miss
+        """
+        manifest = self._read_manifest(key)
+        frames = manifest.get("frames", {}).get(get_file_digest(testing_data_path))
+        if not frames:
+            return None
+
+        model_dir = self.get_model_dir(key)
+        predictions_path = os.path.join(model_dir, frames["predictions"])
+        contributions_path = os.path.join(model_dir, frames["contributions"])
+        if not (os.path.exists(predictions_path) and os.path.exists(contributions_path)):
+            return None
+
+        # Keep the predicted labels as strings, Pandas would parse TRUE/FALSE labels as booleans
+        return pd.read_csv(predictions_path, dtype={"predict": str}), pd.read_csv(contributions_path)
+
+    def save_frames(self, key, testing_data_path, predictions, contributions):
+        """
+        Save the predictions and contributions of the given testing data.
+
+        :param key: cache key of the model which scored the data
+        :param testing_data_path: path of the scored data file
+        :param predictions: Pandas DataFrame of predictions
+        :param contributions: Pandas DataFrame of contributions
+        """
+        data_digest = get_file_digest(testing_data_path)
+        frames = {
+            "predictions": f"predictions-{data_digest[:16]}.csv",
+            "contributions": f"contributions-{data_digest[:16]}.csv",
+        }
+
+        model_dir = self.get_model_dir(key)
+        os.makedirs(model_dir, exist_ok=True)
+        predictions.to_csv(os.path.join(model_dir, frames["predictions"]), index=False)
+        contributions.to_csv(os.path.join(model_dir, frames["contributions"]), index=False)
+
+        manifest = self._read_manifest(key)
+        manifest.setdefault("frames", {})[data_digest] = frames
+        self._write_manifest(key, manifest)
+
+    def _read_manifest(self, key):
+        path = os.path.join(self.get_model_dir(key), self.manifest_file)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, key, manifest):
+        model_dir = self.get_model_dir(key)
+        os.makedirs(model_dir, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves a half written manifest behind
+        path = os.path.join(model_dir, self.manifest_file)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.tmp", path)
+
+
+def get_file_digest(path):
+    """
+    Return the SHA-256 digest of a file's content.
+
+    :param path: path of the file
+    :return: hex digest as a string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,5 +1,4 @@
 import base64
-import copy
 import io
 
 from h2o_wave import ui
@@ -22,40 +21,28 @@ def convert_plot_to_html(config, fig, include_plotlyjs, validate):
     )
 
 
-def tall_stat_card_dollars(df, cust_id, x_variable, box, company_color):
-
-    df = df.copy()
-    df["rank"] = df[x_variable].rank(pct=True)
-    cust = df[df["Phone_No"] == cust_id]
-
-    card = ui.tall_gauge_stat_card(
+def tall_stat_card_dollars(charge, rank, x_variable, box, company_color):
+    return ui.tall_gauge_stat_card(
         box=box,
         title=x_variable,
         value="=${{intl charge minimum_fraction_digits=2 maximum_fraction_digits=2}}",
         aux_value='={{intl rank style="percent" minimum_fraction_digits=0 maximum_fraction_digits=0}}',
         plot_color=company_color,
-        progress=df["rank"].values[0],
-        data=dict(charge=cust[x_variable].values[0], rank=df["rank"].values[0]),
+        progress=rank,
+        data=dict(charge=charge, rank=rank),
     )
-    return card
-
-
-def wide_stat_card_dollars(df, cust_id, x_variable, box, company_color):
 
-    df = df.copy()
-    df["rank"] = df[x_variable].rank(pct=True)
-    cust = df[df["Phone_No"] == cust_id]
 
-    card = ui.wide_gauge_stat_card(
+def wide_stat_card_dollars(charge, rank, x_variable, box, company_color):
+    return ui.wide_gauge_stat_card(
         box=box,
         title=x_variable,
         value="=${{intl charge minimum_fraction_digits=2 maximum_fraction_digits=2}}",
         aux_value='={{intl rank style="percent" minimum_fraction_digits=0 maximum_fraction_digits=0}}',
         plot_color=company_color,
-        progress=df["rank"].values[0],
-        data=dict(charge=cust[x_variable].values[0], rank=df["rank"].values[0]),
+        progress=rank,
+        data=dict(charge=charge, rank=rank),
     )
-    return card
 
 
 def get_image_from_matplotlib(matplotlib_obj):
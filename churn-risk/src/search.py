@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+
+class PrefixIndex:
+    """
+    Sorted prefix index over the values of a column.
+
+    The normalised values are kept sorted in a NumPy array, so all values starting with a prefix form one
+    contiguous range which is found with two binary searches.
+    """
+
+    def __init__(self, values, positions=None):
+        """
+        :param values: iterable of values to index
+        :param positions: optional NumPy array of row positions of the values, defaults to their order
+        """
+        keys = normalise(pd.Series(values).astype(str)).to_numpy(dtype=str)
+        if positions is None:
+            positions = np.arange(len(keys))
+
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = np.asarray(positions)[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, prefix, limit):
+        """
+        Return the row positions of the values starting with the given prefix.
+
+        :param prefix: prefix to search for, case insensitive
+        :param limit: maximum number of positions to return
+        :return: NumPy array of row positions in the order of their values
+        """
+        prefix = prefix.strip().lower()
+        start = np.searchsorted(self.keys, prefix, side="left")
+        end = np.searchsorted(self.keys, prefix + "\uffff", side="left")
+        return self.positions[start:min(end, start + limit)]
+
+
+class CustomerSearch:
+    """
+    Typeahead search over customers, matching a prefix against several columns.
+
+    Matches of the first column come first, e.g. phone numbers before states and area codes.
+    """
+
+    def __init__(self, df, columns):
+        """
+        :param df: Pandas DataFrame of customers, positions returned by search() are row positions of it
+        :param columns: list of columns to search, in priority order
+        """
+        self.row_count = len(df)
+        self.indexes = [PrefixIndex(df[column]) for column in columns]
+
+    def search(self, query, limit):
+        """
+        Return the row positions of the customers matching the query.
+
+        :param query: prefix to search for, an empty query matches the first customers
+        :param limit: maximum number of positions to return
+        :return: list of row positions
+        """
+        if not query or not query.strip():
+            return list(range(min(limit, self.row_count)))
+
+        matches = {}
+        for index in self.indexes:
+            for position in index.search(query, limit).tolist():
+                matches.setdefault(position, None)
+                if len(matches) == limit:
+                    return list(matches)
+        return list(matches)
+
+
+def normalise(values):
+    return values.str.strip().str.lower()
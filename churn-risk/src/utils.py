@@ -25,3 +25,15 @@ def python_code_content(file_to_display):
     code = highlight(contents, py_lexer, html_formatter)
 
     return [ui.text_xl("Application Code"), ui.frame(content=code, height="90%")]
+
+
+def fill_missing_values(df, default_values, mandatory_columns):
+    """
+    Fill missing values with their defaults in place and drop the rows missing a mandatory value.
+
+    :param df: Pandas DataFrame
+    :param default_values: dict of column name to default value
+    :param mandatory_columns: list of columns which can not be filled
+    """
+    df.fillna(default_values, inplace=True)
+    df.dropna(subset=mandatory_columns, inplace=True)
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+from src.background import Superseded, TaskRunner
+
+
+def test_run_returns_result_off_the_event_loop():
+    tasks = TaskRunner(2)
+
+    async def run():
+        return await tasks.run(threading.get_ident)
+
+    assert asyncio.run(run()) != threading.get_ident()
+
+
+def test_run_for_current_request():
+    tasks = TaskRunner(2)
+
+    async def run():
+        request_id = tasks.start("client")
+        result = await tasks.run_for("client", request_id, sum, [1, 2, 3])
+        tasks.finish("client", request_id)
+        return result
+
+    assert asyncio.run(run()) == 6
+
+
+def test_newer_request_supersedes_pending_one():
+    tasks = TaskRunner(1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    async def run():
+        stale_id = tasks.start("client")
+        running = asyncio.ensure_future(tasks.run_for("client", stale_id, block))
+        queued = asyncio.ensure_future(tasks.run_for("client", stale_id, str, "queued"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+        current_id = tasks.start("client")
+        release.set()
+        current = await tasks.run_for("client", current_id, str, "current")
+
+        with pytest.raises(Superseded):
+            await running
+        with pytest.raises(Superseded):
+            await queued
+        return current
+
+    assert asyncio.run(run()) == "current"
+
+
+def test_other_clients_are_not_superseded():
+    tasks = TaskRunner(2)
+
+    async def run():
+        first_id = tasks.start("first")
+        tasks.start("second")
+        return await tasks.run_for("first", first_id, str, "first")
+
+    assert asyncio.run(run()) == "first"
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from src.batch_score import get_output_schema, score_file
+from src.scored_results import ScoredResults
+
+from .tree_scorer_test import ensemble, test_df
+
+
+config = SimpleNamespace(id_column="Phone_No", def_column_values={"x2": 1.0}, mandatory_columns=["Phone_No", "x0"])
+
+
+def write_customers(tmp_path):
+    # Only the first chunk has a missing x2, filled with its default, and the last one misses a mandatory x0
+    customers = test_df.assign(Phone_No=["007", "010", "123", "0456", "999"])
+    input_path = str(tmp_path / "customers.csv")
+    customers.to_csv(input_path, index=False)
+    return input_path, customers
+
+
+@pytest.mark.parametrize("native_model", [True, False])
+def test_score_file(tmp_path, native_model):
+    input_path, customers = write_customers(tmp_path)
+    output_path = str(tmp_path / "scores.parquet")
+    churn_predictor = SimpleNamespace(
+        native_model=ensemble if native_model else None,
+        score_batch=lambda df: ScoredResults(*ensemble.score_frames(df), "TRUE"),
+    )
+
+    assert score_file(churn_predictor, config, input_path, output_path, chunk_size=2, workers=2) == 4
+
+    table = pq.read_table(output_path)
+    assert table.schema.equals(get_output_schema(config))
+    scores = table.to_pandas()
+    assert scores["Phone_No"].tolist() == ["007", "010", "123", "999"]
+
+    expected = customers.fillna({"x2": 1.0}).dropna(subset=["x0"])
+    matrix = ensemble.encode(expected)
+    np.testing.assert_allclose(scores["churn_probability"], ensemble.predict(matrix))
+    contributions = pd.DataFrame(ensemble.predict_contributions(matrix), columns=ensemble.feature_names)
+    assert scores["top_positive_feature"].tolist() == contributions.idxmax(axis=1).tolist()
+    np.testing.assert_allclose(scores["top_negative_contribution"], contributions.min(axis=1))
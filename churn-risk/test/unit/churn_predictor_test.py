@@ -47,3 +47,24 @@ def test_get_shap_explanation():
     assert f"SHAP explanation for \"{model}\" on row {selected_customer_index}" in str(shap_explanation.axes[0].title)
 
 
+def test_export_native_model_checks_predictions_and_contributions(mocker):
+    from .tree_scorer_test import ensemble, test_df
+
+    matrix = ensemble.encode(test_df)
+    predictions = pd.DataFrame({"TRUE": ensemble.predict(matrix)})
+    contributions = pd.DataFrame(ensemble.predict_contributions(matrix), columns=ensemble.feature_names)
+    contributions["BiasTerm"] = ensemble.expected_value()
+    mocker.patch("src.churn_predictor.TreeEnsemble.from_h2o", return_value=ensemble)
+    frame = mocker.Mock(**{"as_data_frame.return_value": test_df})
+
+    def export(predictions, contributions):
+        predictor = ChurnPredictor()
+        predictor.model = mocker.Mock(**{
+            "predict.return_value.as_data_frame.return_value": predictions,
+            "predict_contributions.return_value.as_data_frame.return_value": contributions,
+        })
+        return predictor.export_native_model(frame, frame)
+
+    assert export(predictions, contributions) is ensemble
+    assert export(predictions + 1e-3, contributions) is None
+    assert export(predictions, contributions.assign(x1=contributions["x1"] + 1e-3)) is None
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+from src.config import Configuration
+from src.customer_store import CustomerStore
+
+
+config = Configuration()
+df = pd.read_csv("data/churnTest.csv")
+df.fillna(config.def_column_values, inplace=True)
+df.dropna(subset=config.mandatory_columns, inplace=True)
+customer_store = CustomerStore(df, config.id_column, config.column_types)
+cust_phone_no = 4034933
+
+
+def test_customer_store_is_typed():
+    assert len(customer_store) == len(df)
+    assert customer_store.frame["State"].dtype == "category"
+    assert customer_store.frame["No_CS_Calls"].dtype == "int16"
+    assert customer_store.frame["Total_Day_charge"].dtype == "float64"
+
+
+def test_get_position_accepts_typed_and_string_ids():
+    position = customer_store.get_position(cust_phone_no)
+    assert position is not None
+    assert customer_store.get_position(str(cust_phone_no)) == position
+    assert cust_phone_no in customer_store
+
+
+def test_get_position_of_unknown_customer():
+    assert customer_store.get_position(1) is None
+    assert customer_store.get_position("not a phone number") is None
+
+
+def test_get_record_matches_data_frame():
+    position = customer_store.get_position(cust_phone_no)
+    row_index = customer_store.get_row_index(position)
+    record = customer_store.get_record(position)
+    expected = df.loc[row_index]
+
+    assert record[config.id_column] == cust_phone_no
+    assert record["State"] == expected["State"]
+    assert record["Total_Day_charge"] == expected["Total_Day_charge"]
+    assert record["No_CS_Calls"] == expected["No_CS_Calls"]
+    assert isinstance(record["No_CS_Calls"], int)
+
+
+def test_get_record_columns():
+    position = customer_store.get_position(cust_phone_no)
+    assert list(customer_store.get_record(position, config.charge_columns)) == config.charge_columns
+
+
+def test_row_indices_skip_sanitized_rows():
+    sanitize_df = pd.read_csv("test/unit/data/sanitize.csv")
+    sanitize_df.dropna(subset=config.mandatory_columns, inplace=True)
+    store = CustomerStore(sanitize_df, config.id_column)
+
+    assert store.get_position(3548815) is None
+    assert store.get_row_index(store.get_position(3817211)) == 1
+
+
+def test_duplicate_ids_are_rejected():
+    with pytest.raises(ValueError, match="duplicate"):
+        CustomerStore(pd.concat([df.head(2), df.head(1)]), config.id_column)
+
+
+def test_get_percentile_of_selected_customer():
+    store = CustomerStore(df, config.id_column, config.column_types, config.charge_columns)
+    position = store.get_position(cust_phone_no)
+    expected_ranks = df["Total_Day_charge"].rank(pct=True)
+
+    charge, rank = store.get_percentile(position, "Total_Day_charge")
+    assert charge == df.loc[store.get_row_index(position), "Total_Day_charge"]
+    assert rank == expected_ranks[store.get_row_index(position)]
@@ -0,0 +1,61 @@
+from concurrent.futures import wait
+
+from src.explanation_cache import ExplanationCache
+
+
+def render(key):
+    _, row_index, plot_kind = key
+    return f"{plot_kind}-{row_index}".ljust(10, "=")
+
+
+def test_get_or_render_renders_once():
+    rendered = []
+    cache = ExplanationCache(max_bytes=100)
+
+    def counting_render(key):
+        rendered.append(key)
+        return render(key)
+
+    key = ("model", 1, "shap")
+    assert cache.get_or_render(key, counting_render) == render(key)
+    assert cache.get_or_render(key, counting_render) == render(key)
+    assert rendered == [key]
+
+
+def test_least_recently_used_image_is_evicted():
+    cache = ExplanationCache(max_bytes=30)
+    keys = [("model", row_index, "shap") for row_index in range(4)]
+
+    for key in keys[:3]:
+        cache.put(key, render(key))
+    cache.get(keys[0])
+    cache.put(keys[3], render(keys[3]))
+
+    assert keys[0] in cache
+    assert keys[1] not in cache
+    assert keys[2] in cache
+    assert keys[3] in cache
+    assert cache.size == 30
+
+
+def test_image_larger_than_cache_is_not_stored():
+    cache = ExplanationCache(max_bytes=5)
+    key = ("model", 1, "shap")
+    cache.put(key, render(key))
+
+    assert key not in cache
+    assert cache.size == 0
+
+
+def test_warm_up_renders_missing_images():
+    cache = ExplanationCache(max_bytes=100, max_workers=2)
+    cached_key = ("model", 0, "shap")
+    cache.put(cached_key, render(cached_key))
+
+    keys = [("model", row_index, "shap") for row_index in range(3)]
+    futures = cache.warm_up(keys, render)
+    wait(futures)
+
+    assert len(futures) == 2
+    assert all(key in cache for key in keys)
+    assert len(cache) == 3
@@ -0,0 +1,69 @@
+import pandas as pd
+from src.model_cache import ModelCache
+
+
+training_data_path = "data/churnTrain.csv"
+testing_data_path = "data/churnTest.csv"
+params = {"model_id": "telco_churn_model", "seed": 1234}
+
+
+def test_cache_key_is_stable(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    assert cache.get_key(training_data_path, params) == cache.get_key(training_data_path, dict(params))
+
+
+def test_cache_key_changes_with_params_and_data(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    key = cache.get_key(training_data_path, params)
+    assert key != cache.get_key(training_data_path, {**params, "seed": 1})
+    assert key != cache.get_key(testing_data_path, params)
+
+
+def test_model_path_miss(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    key = cache.get_key(training_data_path, params)
+    assert cache.get_model_path(key) is None
+
+    cache.save_model_path(key, str(tmp_path / "missing_model"))
+    assert cache.get_model_path(key) is None
+
+
+def test_model_path_hit(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    key = cache.get_key(training_data_path, params)
+    model_path = tmp_path / "telco_churn_model"
+    model_path.write_text("model")
+
+    cache.save_model_path(key, str(model_path))
+    assert cache.get_model_path(key) == str(model_path)
+
+
+def test_artifact_paths_are_kept_apart(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    key = cache.get_key(training_data_path, params)
+    model_path = tmp_path / "telco_churn_model"
+    model_path.write_text("model")
+    native_model_path = tmp_path / "native_model.npz"
+    native_model_path.write_text("native model")
+
+    cache.save_model_path(key, str(model_path))
+    assert cache.get_artifact_path(key, "native_model_path") is None
+
+    cache.save_artifact_path(key, "native_model_path", str(native_model_path))
+    assert cache.get_model_path(key) == str(model_path)
+    assert cache.get_artifact_path(key, "native_model_path") == str(native_model_path)
+
+
+def test_frames_round_trip(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    key = cache.get_key(training_data_path, params)
+    predictions = pd.DataFrame({"predict": ["FALSE", "TRUE"], "FALSE": [0.9, 0.2], "TRUE": [0.1, 0.8]})
+    contributions = pd.DataFrame({"State": [0.1, -0.2], "BiasTerm": [-1.5, -1.5]})
+
+    assert cache.load_frames(key, testing_data_path) is None
+    cache.save_frames(key, testing_data_path, predictions, contributions)
+    loaded_predictions, loaded_contributions = cache.load_frames(key, testing_data_path)
+
+    pd.testing.assert_frame_equal(loaded_predictions, predictions)
+    pd.testing.assert_frame_equal(loaded_contributions, contributions)
+    assert cache.load_frames(key, training_data_path) is None
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from src.partial_dependence import PartialDependence
+
+
+df = pd.DataFrame({
+    "Total_Day_charge": [10.0, 20.0, 30.0, 40.0],
+    "No_CS_Calls": [0, 1, 1, 3],
+    "International_Plan": ["no", "yes", "no", "no"],
+})
+plan_effect = {"no": 0.0, "yes": 0.5}
+batch_sizes = []
+
+
+def score(batch):
+    batch_sizes.append(len(batch))
+    return (
+        0.01 * batch["Total_Day_charge"].to_numpy() * batch["No_CS_Calls"].to_numpy()
+        + batch["International_Plan"].map(plan_effect).to_numpy()
+    )
+
+
+def test_grid():
+    partial_dependence = PartialDependence(score, df, df.columns, grid_size=3)
+    np.testing.assert_array_equal(partial_dependence.get_grid("No_CS_Calls"), [0, 1, 3])
+    np.testing.assert_array_equal(partial_dependence.get_grid("Total_Day_charge"), [10, 25, 40])
+    assert partial_dependence.get_grid("International_Plan").tolist() == ["no", "yes"]
+
+
+def test_curve_is_computed_once_in_one_batch():
+    partial_dependence = PartialDependence(score, df, df.columns)
+    batch_sizes.clear()
+
+    grid, mean, std = partial_dependence.get_curve("No_CS_Calls")
+    partial_dependence.get_curve("No_CS_Calls")
+
+    assert batch_sizes == [len(grid) * len(df)]
+    expected = [score(df.assign(No_CS_Calls=value)) for value in grid]
+    np.testing.assert_allclose(mean, np.mean(expected, axis=1))
+    np.testing.assert_allclose(std, np.std(expected, axis=1))
+
+
+def test_ice_of_a_row():
+    partial_dependence = PartialDependence(score, df, df.columns)
+    partial_dependence.get_curve("International_Plan")
+    batch_sizes.clear()
+
+    grid, ice = partial_dependence.get_ice(3, "International_Plan")
+
+    assert batch_sizes == [len(grid)]
+    np.testing.assert_allclose(ice, [0.01 * 40 * 3, 0.01 * 40 * 3 + 0.5])
+
+
+def test_curve_over_sampled_rows():
+    partial_dependence = PartialDependence(score, df, df.columns, max_rows=2)
+    grid, mean, _ = partial_dependence.get_curve("International_Plan")
+
+    sample = df.iloc[partial_dependence.sample]
+    expected = [score(sample.assign(International_Plan=value)).mean() for value in grid]
+    np.testing.assert_allclose(mean, expected)
+
+
+def test_plot():
+    partial_dependence = PartialDependence(score, df, df.columns)
+    for feature in df.columns:
+        figure = partial_dependence.plot(1, feature)
+        assert isinstance(figure, Figure)
+        assert f'"{feature}"' in figure.axes[0].get_title()
@@ -83,45 +83,25 @@ def test_html_pie_chart_conversion_missing_param():
         plots.convert_plot_to_html(None, pie_chart, "cdn")
 
 
+def get_charge_and_rank(cust_phone_no, column):
+    ranks = pytest.df[column].rank(pct=True)
+    customer = pytest.df[id_column] == cust_phone_no
+    return pytest.df[customer][column].values[0], ranks[customer].values[0]
+
+
 def test_wide_stat_card_for_dollars():
     cust_phone_no = 4034933
     day_charges = "Day Charges"
     day_stat_box = "3 2 2 1"
     plot_color = "#00A8E0"
-
-    pytest.df["Total Charges"] = (
-        pytest.df.Total_Day_charge
-        + pytest.df.Total_Eve_Charge
-        + pytest.df.Total_Night_Charge
-        + pytest.df.Total_Intl_Charge
-    )
-
-    df = pytest.df[
-        [
-            "Total_Day_charge",
-            "Total_Eve_Charge",
-            "Total_Night_Charge",
-            "Total_Intl_Charge",
-            id_column,
-            "Total Charges",
-        ]
-    ]
-
-    df.columns = [
-        day_charges,
-        "Evening Charges",
-        "Night Charges",
-        "Int'l Charges",
-        id_column,
-        "Total Charges",
-    ]
+    charge, rank = get_charge_and_rank(cust_phone_no, "Total_Day_charge")
 
     wide_stat_card = plots.wide_stat_card_dollars(
-        df, cust_phone_no, day_charges, day_stat_box, plot_color
+        charge, rank, day_charges, day_stat_box, plot_color
     )
 
     assert_stat_card(
-        cust_phone_no, day_charges, day_stat_box, df, plot_color, wide_stat_card
+        charge, rank, day_charges, day_stat_box, plot_color, wide_stat_card
     )
 
 
@@ -130,54 +110,37 @@ def test_tall_stat_card_for_dollars():
     day_charges = "Day Charges"
     day_stat_box = "3 2 2 1"
     plot_color = "#00A8E0"
+    charge, rank = get_charge_and_rank(cust_phone_no, "Total_Day_charge")
 
-    pytest.df["Total Charges"] = (
-        pytest.df.Total_Day_charge
-        + pytest.df.Total_Eve_Charge
-        + pytest.df.Total_Night_Charge
-        + pytest.df.Total_Intl_Charge
+    tall_stat_card = plots.tall_stat_card_dollars(
+        charge, rank, day_charges, day_stat_box, plot_color
     )
 
-    df = pytest.df[
-        [
-            "Total_Day_charge",
-            "Total_Eve_Charge",
-            "Total_Night_Charge",
-            "Total_Intl_Charge",
-            id_column,
-            "Total Charges",
-        ]
-    ]
-
-    df.columns = [
-        day_charges,
-        "Evening Charges",
-        "Night Charges",
-        "Int'l Charges",
-        id_column,
-        "Total Charges",
-    ]
-
-    wide_stat_card = plots.tall_stat_card_dollars(
-        df, cust_phone_no, day_charges, day_stat_box, plot_color
+    assert_stat_card(
+        charge, rank, day_charges, day_stat_box, plot_color, tall_stat_card
     )
 
-    assert_stat_card(
-        cust_phone_no, day_charges, day_stat_box, df, plot_color, wide_stat_card
+
+def test_stat_card_shows_selected_customer_rank():
+    first_cust_phone_no = pytest.df[id_column].values[0]
+    cust_phone_no = 4034933
+    charge, rank = get_charge_and_rank(cust_phone_no, "Total_Day_charge")
+    _, first_rank = get_charge_and_rank(first_cust_phone_no, "Total_Day_charge")
+
+    wide_stat_card = plots.wide_stat_card_dollars(
+        charge, rank, "Day Charges", "3 2 2 1", "#00A8E0"
     )
 
+    assert rank != first_rank
+    assert wide_stat_card.progress == rank
+
 
 def assert_stat_card(
-    cust_phone_no, day_charges, day_stat_box, df, plot_color, wide_stat_card
+    charge, rank, day_charges, day_stat_box, plot_color, stat_card
 ):
-    df = df.copy()
-    rank = df["rank"] = df[day_charges].rank(pct=True)
-    assert wide_stat_card.title == day_charges
-    assert wide_stat_card.box == day_stat_box
-    assert wide_stat_card.plot_color == plot_color
-    assert wide_stat_card.progress == rank.values[0]
-    assert (
-        wide_stat_card.data["charge"]
-        == df[df[id_column] == cust_phone_no][day_charges].values[0]
-    )
-    assert wide_stat_card.data["rank"] == rank.values[0]
+    assert stat_card.title == day_charges
+    assert stat_card.box == day_stat_box
+    assert stat_card.plot_color == plot_color
+    assert stat_card.progress == rank
+    assert stat_card.data["charge"] == charge
+    assert stat_card.data["rank"] == rank
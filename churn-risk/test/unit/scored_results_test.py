@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.scored_results import ScoredResults
+
+
+predictions = pd.DataFrame({
+    "predict": ["FALSE", "TRUE", "FALSE", "TRUE"],
+    "FALSE": [0.9, 0.3, 0.6, 0.1],
+    "TRUE": [0.1, 0.7, 0.4, 0.9],
+})
+contributions = pd.DataFrame({
+    "Total_Day_charge": [0.5, -0.2, 0.1, 1.2],
+    "No_CS_Calls": [-0.3, 0.9, 0.0, 0.4],
+    "State": [0.1, -0.6, -0.2, 0.3],
+    "BiasTerm": [-1.0, -1.0, -1.0, -1.0],
+})
+scored = ScoredResults(predictions, contributions, "TRUE")
+
+
+def test_scored_results_arrays():
+    assert len(scored) == 4
+    assert scored.feature_names == ["Total_Day_charge", "No_CS_Calls", "State"]
+    assert scored.contributions.shape == (4, 3)
+    assert scored.contributions.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(scored.bias, [-1.0] * 4)
+
+
+def test_get_score():
+    assert scored.get_score(1) == pytest.approx(0.7)
+
+
+def test_top_features_ignore_bias_term():
+    assert [scored.get_top_negative_feature(row) for row in range(4)] == [
+        "No_CS_Calls", "State", "State", "State"
+    ]
+    assert [scored.get_top_positive_feature(row) for row in range(4)] == [
+        "Total_Day_charge", "No_CS_Calls", "Total_Day_charge", "Total_Day_charge"
+    ]
+
+
+def test_get_contributions_ordered():
+    assert scored.get_contributions(1) == [("No_CS_Calls", 0.9), ("Total_Day_charge", -0.2), ("State", -0.6)]
+
+
+def test_get_highest_score_rows():
+    assert scored.get_highest_score_rows(2).tolist() == [3, 1]
+    assert scored.get_highest_score_rows(10).tolist() == [3, 1, 2, 0]
+    assert scored.get_highest_score_rows(0).tolist() == []
+
+
+def test_get_top_contributions_frame():
+    frame = scored.get_top_contributions_frame()
+
+    assert list(frame["score"]) == [0.1, 0.7, 0.4, 0.9]
+    assert list(frame["top_positive_feature"]) == ["Total_Day_charge", "No_CS_Calls", "Total_Day_charge",
+                                                   "Total_Day_charge"]
+    assert list(frame["top_positive_contribution"]) == [0.5, 0.9, 0.1, 1.2]
+    assert list(frame["top_negative_feature"]) == ["No_CS_Calls", "State", "State", "State"]
+    assert list(frame["top_negative_contribution"]) == [-0.3, -0.6, -0.2, 0.3]
+
+
+def test_plot_contributions():
+    figure = scored.plot_contributions(1, "Row 1", {"Total_Day_charge": 30.5, "No_CS_Calls": 4, "State": "KS"},
+                                       top_count=2)
+    axes = figure.axes[0]
+    assert axes.get_title() == "Row 1"
+    # Largest contribution in absolute value at the top
+    assert [label.get_text() for label in axes.get_yticklabels()] == ["State=KS", "No_CS_Calls=4"]
+    assert [patch.get_width() for patch in axes.patches] == pytest.approx([-0.6, 0.9])
@@ -0,0 +1,45 @@
+import pandas as pd
+from src.search import CustomerSearch, PrefixIndex
+
+
+df = pd.DataFrame({
+    "Phone_No": [4034933, 3548815, 3817211, 4035012, 3653009],
+    "State": ["CA", "HI", "MT", " ca", "NJ"],
+    "Area_Code": [415, 510, 510, 408, 415],
+})
+
+
+def test_prefix_index_search():
+    index = PrefixIndex(df["Phone_No"])
+    assert index.search("403", 10).tolist() == [0, 3]
+    assert index.search("4035", 10).tolist() == [3]
+    assert index.search("9", 10).tolist() == []
+
+
+def test_prefix_index_search_limit():
+    index = PrefixIndex(df["Phone_No"])
+    assert index.search("3", 2).tolist() == [1, 4]
+
+
+def test_prefix_index_is_case_insensitive():
+    index = PrefixIndex(df["State"])
+    assert sorted(index.search("Ca", 10).tolist()) == [0, 3]
+
+
+def test_customer_search_over_columns():
+    search = CustomerSearch(df, ["Phone_No", "State", "Area_Code"])
+    assert search.search("41", 10) == [0, 4]
+    assert search.search("n", 10) == [4]
+    assert search.search("3", 10) == [1, 4, 2]
+
+
+def test_customer_search_deduplicates_and_limits():
+    search = CustomerSearch(df, ["Phone_No", "Area_Code"])
+    assert search.search("4", 3) == [0, 3, 4]
+    assert search.search("4", 10) == [0, 3, 4]
+
+
+def test_customer_search_empty_query():
+    search = CustomerSearch(df, ["Phone_No"])
+    assert search.search("", 3) == [0, 1, 2]
+    assert search.search(None, 10) == [0, 1, 2, 3, 4]
@@ -0,0 +1,71 @@
+"""
+Load time and resident memory of the Credit Card Risk testing data, parsed by pandas as before, parsed into
+narrow dtypes and cached, and memory-mapped from the cache.
+
+Each load runs in a fresh process. Resident memory is split into private memory, which every worker process of
+the app holds a copy of, and file-backed memory, which the processes mapping the same cache share. The data set
+is repeated to scale it up, 100 times by default like a production portfolio. The model is not built, run it
+from the credit-risk directory:
+
+    python -m benchmarks.data_loading [scale]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from src.columnar_cache import ColumnarCache
+from src.config import config
+
+
+def get_memory():
+    """
+    Return the resident private and file-backed memory of this process in MB, read from /proc on Linux.
+    """
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                memory[key] = int(value.split()[0]) / 1024
+    return memory["RssAnon"], memory["RssFile"]
+
+
+def measure(mode, csv_path, cache_dir):
+    before = get_memory()
+    start = time.perf_counter()
+    if mode == "pandas":
+        df = pd.read_csv(csv_path)
+    else:
+        df = ColumnarCache(cache_dir).load_frame(csv_path)
+    # Touch every value, as scoring the customers does
+    df.sum()
+    duration = time.perf_counter() - start
+    after = get_memory()
+    return duration, after[0] - before[0], after[1] - before[1], df.memory_usage().sum() / 2 ** 20
+
+
+def measure_in_process(mode, csv_path, cache_dir):
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(measure, (mode, csv_path, cache_dir))
+
+
+def main(scale=100):
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "customers.csv")
+        df = pd.read_csv(config.testing_data_url)
+        pd.concat([df] * scale, ignore_index=True).to_csv(csv_path, index=False)
+        cache_dir = os.path.join(directory, "cache")
+
+        print(f"{len(df) * scale:,} customers")
+        print(f"{'load':<22}{'seconds':>10}{'private MB':>12}{'shared MB':>12}{'frame MB':>12}")
+        for name, mode in [("pandas", "pandas"), ("narrow, parse + cache", "cache"), ("narrow, memory-map", "cache")]:
+            duration, private, shared, frame = measure_in_process(mode, csv_path, cache_dir)
+            print(f"{name:<22}{duration:>10.2f}{private:>12.1f}{shared:>12.1f}{frame:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
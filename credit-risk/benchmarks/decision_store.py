@@ -0,0 +1,101 @@
+"""
+Review decision throughput and recovery time of the Credit Card Risk app.
+
+Reviewers are simulated by threads recording decisions one at a time, as the approve and reject buttons do. The
+write-behind DecisionStore is compared with committing every decision to SQLite straight away. Recovery is the
+time to open a store holding a million decisions, as the app does when it restarts. It does not need H2O-3, run
+it from the credit-risk directory:
+
+    python -m benchmarks.decision_store
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from src.decision_store import DecisionStore
+
+statuses = ["BoxCheckmarkSolid", "BoxMultiplySolid"]
+
+
+class CommitEachStore:
+    """
+    Baseline store committing every decision in its own transaction.
+    """
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS decisions "
+            "(customer_id PRIMARY KEY, status TEXT NOT NULL, decided_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        self.lock = threading.Lock()
+
+    def update(self, decisions):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO decisions (customer_id, status, decided_at) VALUES (?, ?, ?)",
+                [(customer_id, status, time.time()) for customer_id, status in decisions.items()],
+            )
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.connection.close()
+
+
+def run_reviewers(store, reviewers, decisions_per_reviewer):
+    def review(reviewer):
+        first = reviewer * decisions_per_reviewer
+        for customer_id in range(first, first + decisions_per_reviewer):
+            store.update({customer_id: statuses[customer_id % 2]})
+
+    threads = [threading.Thread(target=review, args=(reviewer,)) for reviewer in range(reviewers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorded = time.perf_counter() - start
+    store.flush()
+    durable = time.perf_counter() - start
+    return reviewers * decisions_per_reviewer, recorded, durable
+
+
+def time_recovery(directory, count):
+    path = os.path.join(directory, "recovery.sqlite3")
+    store = DecisionStore(path)
+    store.update({customer_id: statuses[customer_id % 2] for customer_id in range(count)})
+    store.close()
+
+    start = time.perf_counter()
+    store = DecisionStore(path)
+    duration = time.perf_counter() - start
+    assert len(store) == count
+    store.close()
+    return duration
+
+
+def main(reviewers=8, decisions_per_reviewer=2000, recovery_count=1000000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{reviewers} reviewers, {decisions_per_reviewer} decisions each")
+        print(f"{'store':<16}{'decisions/s':>14}{'durable/s':>14}")
+        for name, make_store in [
+            ("commit each", lambda path: CommitEachStore(path)),
+            ("write-behind", lambda path: DecisionStore(path)),
+        ]:
+            store = make_store(os.path.join(directory, f"{name.replace(' ', '_')}.sqlite3"))
+            count, recorded, durable = run_reviewers(store, reviewers, decisions_per_reviewer)
+            store.close()
+            print(f"{name:<16}{count / recorded:>14,.0f}{count / durable:>14,.0f}")
+
+        duration = time_recovery(directory, recovery_count)
+        print(f"Recovery of {recovery_count:,} decisions: {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Home page render latency of the Credit Card Risk app, before and after caching the scored customer table.
+
+Before, every render pulled the testing frame and the predictions frame out of H2O-3, dropped the response, added
+the rounded predictions and built the table rows. After, the rows are sliced from the table built once by
+predict(), from the native model's scores when there is one. The model is built first. The H2O-3 cluster is
+started for the before path only: when the native model was loaded from the cache, the testing data is imported
+and its native predictions are uploaded, so the same frames are pulled as before. Run it from the credit-risk
+directory:
+
+    python -m benchmarks.home_render
+"""
+import time
+from types import SimpleNamespace
+
+import h2o
+import numpy as np
+
+from src.config import model_manager
+from src.utils import add_column_to_df, drop_column_from_df, round_df_column
+from src.views.home import get_rows
+
+
+def get_h2o_frames(predictor):
+    """
+    Return the testing and predictions frames in H2O-3, importing and uploading them when the predictor has none.
+    """
+    predictor.start_h2o()
+    testing_frame = predictor.test_df
+    if testing_frame is None:
+        testing_frame = h2o.import_file(path=predictor.testing_data_path)
+    predicted_frame = predictor.predicted_df
+    if predicted_frame is None:
+        predicted_frame = h2o.H2OFrame(predictor.get_predict_data_as_pd_frame())
+    return testing_frame, predicted_frame
+
+
+def get_table_from_h2o(predictor, testing_frame, predicted_frame):
+    df = testing_frame.as_data_frame()
+    predicted_df = predicted_frame.as_data_frame()
+    drop_column_from_df(df, predictor.response_column)
+    add_column_to_df(df, predicted_df, predictor.prediction_column, "predict")
+    return round_df_column(df, predictor.prediction_column, 4)
+
+
+def time_render(get_table, q, repeats):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        get_rows(q, get_table())
+        durations.append(time.perf_counter() - start)
+    return np.array(durations) * 1000
+
+
+def main(repeats=20):
+    model_manager.start()
+    predictor = model_manager.wait()
+
+    testing_frame, predicted_frame = get_h2o_frames(predictor)
+
+    q = SimpleNamespace(app=SimpleNamespace(customer_status={}))
+    before = time_render(lambda: get_table_from_h2o(predictor, testing_frame, predicted_frame), q, repeats)
+    after = time_render(predictor.get_scored_table, q, repeats)
+
+    scorer = "native model" if predictor.native_model else "H2O-3"
+    print(f"{len(predictor.get_scored_table())} customers scored by the {scorer}, {repeats} renders each")
+    print(f"before: p50 {np.percentile(before, 50):8.2f}ms  p95 {np.percentile(before, 95):8.2f}ms")
+    print(f"after:  p50 {np.percentile(after, 50):8.2f}ms  p95 {np.percentile(after, 95):8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Bytes sent to the Wave server and handler latency per interaction of the Credit Card Risk app, before and after
+sending only the cards and values which changed.
+
+A reviewer opens the home page, pages through the table, opens a customer, approves them, opens another one,
+rejects them and goes to the review queue and back home. Before, every interaction dropped the page and sent it
+whole, which is replayed by starting each interaction from an empty page state. After, the page state of the
+client is kept. The bytes are those of the JSON page updates the app sends, the latency is the handler time up
+to the serialised updates, without the network. The model is built first. Run it from the credit-risk directory:
+
+    python -m benchmarks.page_updates
+"""
+import asyncio
+import time
+
+import numpy as np
+from h2o_wave.core import Expando, PageBase
+
+from src.app import serve
+from src.config import config, model_manager
+
+
+class RecordingPage(PageBase):
+    """
+    Page keeping the size of the updates it would send instead of sending them.
+    """
+
+    def __init__(self):
+        super().__init__('/benchmark')
+        self.sent_bytes = 0
+
+    async def save(self):
+        changes = self._diff()
+        if changes:
+            self.sent_bytes += len(changes.encode('utf-8'))
+
+
+def get_interactions(first_row, second_row):
+    return [
+        ('open home', {}),
+        ('next page', {'next_page': True}),
+        ('previous page', {'previous_page': True}),
+        ('open customer', {'risk_table': [str(first_row)]}),
+        ('approve', {'approve_btn': True}),
+        ('open customer', {'risk_table': [str(second_row)]}),
+        ('reject', {'reject_btn': True}),
+        ('open queue', {'queue': True}),
+        ('back home', {'home': True}),
+    ]
+
+
+def run(interactions, keep_state, repeats):
+    results = {i: ([], []) for i in range(len(interactions))}
+    for _ in range(repeats):
+        # Decisions are kept in memory, not in the decision store of the app
+        app = Expando(dict(initialized=True, customer_status={}, approval_threshold=config.approval_threshold))
+        q = Expando(dict(app=app, client=Expando(), page=RecordingPage()))
+        for i, (_, args) in enumerate(interactions):
+            if not keep_state:
+                q.client.page_state = None
+            q.args = Expando(dict(args))
+            q.page.sent_bytes = 0
+            start = time.perf_counter()
+            asyncio.run(serve(q))
+            results[i][0].append(time.perf_counter() - start)
+            results[i][1].append(q.page.sent_bytes)
+    return [(np.median(durations) * 1000, int(np.median(sizes))) for durations, sizes in results.values()]
+
+
+def main(repeats=5):
+    predictor = model_manager.wait()
+    # The two highest scores are on the first page of the default sort
+    first_row, second_row = predictor.scored.get_highest_score_rows(2)
+    interactions = get_interactions(first_row, second_row)
+
+    before = run(interactions, keep_state=False, repeats=repeats)
+    after = run(interactions, keep_state=True, repeats=repeats)
+
+    print(f"{'interaction':<16}{'before bytes':>14}{'after bytes':>14}{'before ms':>12}{'after ms':>12}")
+    for (name, _), (before_ms, before_bytes), (after_ms, after_bytes) in zip(interactions, before, after):
+        print(f"{name:<16}{before_bytes:>14,}{after_bytes:>14,}{before_ms:>12.2f}{after_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+What-if latency of the Credit Card Risk app, before and after batching and caching the variants.
+
+Before, every variant of a customer was scored on its own, as a full predict on a new frame. After, all variants
+over the grid of a feature are scored in one batched call, and moving the slider looks them up from the cache.
+The model is built first. Run it from the credit-risk directory:
+
+    python -m benchmarks.what_if
+"""
+import time
+
+import numpy as np
+
+from src.config import model_manager
+
+
+def time_calls(call, arguments):
+    durations = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        durations.append(time.perf_counter() - start)
+    return np.array(durations) * 1000
+
+
+def main(customers=20):
+    predictor = model_manager.wait()
+    what_if = predictor.what_if
+    feature = predictor.scored.get_top_positive_feature(0)
+    grid = what_if.get_grid(feature)
+    rows = predictor.scored.get_highest_score_rows(customers)
+
+    def score_one_by_one(row):
+        for value in grid:
+            batch = what_if.df.iloc[[row]].reset_index(drop=True)
+            batch[feature] = value
+            predictor.score_batch(batch)
+
+    def move_slider(row):
+        for value in grid:
+            what_if.get_variant(row, feature, value)
+
+    before = time_calls(score_one_by_one, rows)
+    batched = time_calls(lambda row: what_if.simulate(row, feature), rows)
+    # Every position of the slider, once the customer's simulation is cached
+    slider = time_calls(move_slider, rows) / len(grid)
+
+    print(f"{customers} customers, {feature} over {len(grid)} values")
+    for name, durations in [("one by one", before), ("batched", batched), ("slider, cached", slider)]:
+        print(f"{name:<16} p50 {np.percentile(durations, 50):8.2f}ms  p95 {np.percentile(durations, 95):8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
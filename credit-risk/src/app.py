@@ -1,11 +1,35 @@
-from h2o_wave import app, Q, ui, main
+# main is the ASGI app that wave run serves as src.app:main
+from h2o_wave import app, Q, main  # noqa: F401
 
+from .config import config, model_manager
+from .decision_store import DecisionStore
 from .views.home import render_home
-from .views.customer import render_customer_page, handle_approve_click, handle_reject_click
+from .views.customer import render_customer_page, handle_approve_click, handle_reject_click, handle_what_if_change
+from .views.explanations import handle_reason_change, render_explanations_page
+from .views.loading import render_loading_page
+from .views.queue import handle_priority_change, handle_queue_action, render_queue_page
+from .views.thresholds import (
+    handle_apply_threshold_click,
+    handle_best_threshold_click,
+    handle_threshold_change,
+    render_thresholds_page,
+)
+
+# Build the model in the background, pages are served meanwhile
+model_manager.start()
 
 
 def init(q: Q):
-    q.app.customer_status = {}
+    q.app.customer_status = DecisionStore(
+        config.decision_store_path, config.decision_flush_seconds, reload_interval=config.decision_reload_seconds
+    )
+    q.app.approval_threshold = config.approval_threshold
+
+
+def is_what_if_change(q: Q):
+    # Each control sends its value only when it mounts or changes, so any of them may be sent alone
+    args = ['what_if_feature', 'what_if_value', 'what_if_other', 'what_if_other_value']
+    return any(getattr(q.args, name) is not None for name in args)
 
 
 @app("/")
@@ -14,6 +38,11 @@ async def serve(q: Q):
         init(q)
         q.app.initialized = True
 
+    if not model_manager.is_ready():
+        await render_loading_page(q)
+        if not model_manager.is_ready():
+            return
+
     if q.args.risk_table:
         render_customer_page(q)
     elif q.args.approve_btn:
@@ -22,6 +51,29 @@ async def serve(q: Q):
     elif q.args.reject_btn:
         handle_reject_click(q)
         render_home(q)
+    elif q.args.home:
+        # Before the dropdowns and sliders below, which send their value along with any click on their page
+        render_home(q)
+    elif q.args.queue:
+        render_queue_page(q)
+    elif q.args.queue_action:
+        handle_queue_action(q)
+    elif q.args.thresholds:
+        render_thresholds_page(q)
+    elif q.args.apply_threshold:
+        handle_apply_threshold_click(q)
+    elif q.args.best_threshold:
+        handle_best_threshold_click(q)
+    elif q.args.explanations:
+        render_explanations_page(q)
+    elif is_what_if_change(q):
+        handle_what_if_change(q)
+    elif q.args.queue_priority is not None:
+        handle_priority_change(q)
+    elif q.args.approval_threshold is not None:
+        handle_threshold_change(q)
+    elif q.args.reason_feature is not None or q.args.reason_band is not None:
+        handle_reason_change(q)
     else:
         render_home(q)
 
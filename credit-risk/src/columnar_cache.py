@@ -0,0 +1,191 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Before pandas 2, data frames copy the columns they are built from into one block per dtype
+consolidates_columns = int(pd.__version__.split(".")[0]) < 2
+if consolidates_columns:
+    from pandas.core.internals import BlockManager, make_block
+
+
+class ColumnarCache:
+    """
+    Cache of parsed CSV files, with every column in the narrowest dtype holding its values.
+
+    The CSV file is parsed once in chunks, so the wide int64/float64 columns pandas parses into never exist for
+    the whole file at once. Integer columns are narrowed to the smallest signed integer type fitting their range,
+    e.g. int8 for the PAY_n codes and int32 for the amounts, and float columns to float32 when no value changes.
+    The columns of one dtype are written as the rows of one NumPy file, laid out like the block pandas keeps them
+    in. Later loads memory-map these files read-only instead of parsing, and the data frame is built around the
+    memory-maps without copying them, so loads are nearly free and the worker processes of the app share the same
+    page cache pages instead of each holding a private copy.
+    """
+
+    columns_file = "columns.json"
+    # Entries written in another layout are never read
+    layout_version = 2
+
+    def __init__(self, cache_dir, chunk_size=100000):
+        """
+        :param cache_dir: directory the parsed files are cached in
+        :param chunk_size: number of CSV rows parsed at once
+        """
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+
+    def get_cache_path(self, csv_path):
+        # A changed CSV file gets a new cache entry, the stale one is never read again
+        stat = os.stat(csv_path)
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{stat.st_size}-{stat.st_mtime_ns}-v{self.layout_version}")
+
+    def load_columns(self, csv_path):
+        """
+        Return the columns of a CSV file, parsing and caching it on the first call.
+
+        :param csv_path: path of the CSV file
+        :return: dict of column name to read-only memory-mapped NumPy array, in the order of the file
+        """
+        names, blocks = self.load_blocks(csv_path)
+        columns = {
+            name: values[row] for block_names, values in blocks for row, name in enumerate(block_names)
+        }
+        return {name: columns[name] for name in names}
+
+    def load_frame(self, csv_path):
+        """
+        Return a CSV file as a Pandas DataFrame of narrow dtypes, parsing and caching it on the first call.
+
+        The data frame holds the memory-maps themselves, so it shares their pages.
+
+        :param csv_path: path of the CSV file
+        :return: Pandas DataFrame with a default index
+        """
+        if not consolidates_columns:
+            return pd.DataFrame(self.load_columns(csv_path), copy=False)
+
+        # One block per dtype is already consolidated, pandas never copies it into a new one
+        names, blocks = self.load_blocks(csv_path)
+        positions = {name: i for i, name in enumerate(names)}
+        manager = BlockManager(
+            [make_block(values, placement=[positions[name] for name in block_names]) for block_names, values in blocks],
+            [pd.Index(names), pd.RangeIndex(blocks[0][1].shape[1] if blocks else 0)],
+        )
+        return pd.DataFrame(manager)
+
+    def load_blocks(self, csv_path):
+        path = self.get_cache_path(csv_path)
+        if not os.path.exists(os.path.join(path, self.columns_file)):
+            self.write(read_csv_columns(csv_path, self.chunk_size), path)
+        return self.read(path)
+
+    def read(self, path):
+        """
+        Read a cache entry.
+
+        :param path: path of the cache entry
+        :return: tuple of the list of column names in the order of the file and the list of blocks, tuples of the
+            names of the columns of one dtype and the 2D NumPy array of them, one per row. Numbers are read-only
+            memory-maps, strings are Python objects with NaN for missing values
+        """
+        with open(os.path.join(path, self.columns_file)) as f:
+            columns = json.load(f)
+        blocks = []
+        for i, block_names in enumerate(columns["blocks"]):
+            values = np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r", allow_pickle=False)
+            if values.dtype.kind == "U":
+                # Strings are held as Python objects by pandas, they are copied out of their fixed width block
+                values = values.astype(object)
+                values[np.load(os.path.join(path, f"{i}.missing.npy"), allow_pickle=False)] = np.nan
+            blocks.append((block_names, values))
+        return columns["names"], blocks
+
+    def write(self, columns, path):
+        """
+        Write columns to a cache entry, the columns of each dtype as the rows of one 2D array.
+
+        Strings are written fixed width, with the mask of their missing values next to them, as Python objects
+        cannot be memory-mapped.
+
+        The entry is written to a temporary directory first and renamed into place, so processes loading the same
+        file concurrently either see a complete entry or none.
+
+        :param columns: dict of column name to NumPy array, strings as Python objects with NaN for missing values
+        :param path: path of the cache entry
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=self.cache_dir)
+        blocks = {}
+        for name, values in columns.items():
+            blocks.setdefault(values.dtype.str, []).append(name)
+        try:
+            for i, block_names in enumerate(blocks.values()):
+                values = np.stack([columns[name] for name in block_names])
+                if values.dtype.kind == "O":
+                    missing = pd.isna(values)
+                    np.save(os.path.join(temporary_path, f"{i}.missing.npy"), missing, allow_pickle=False)
+                    values = np.where(missing, "", values).astype(str)
+                np.save(os.path.join(temporary_path, f"{i}.npy"), values, allow_pickle=False)
+            with open(os.path.join(temporary_path, self.columns_file), "w") as f:
+                json.dump({"names": list(columns), "blocks": list(blocks.values())}, f)
+            os.rename(temporary_path, path)
+        except OSError:
+            # Another process has written the same entry meanwhile
+            if not os.path.exists(os.path.join(path, self.columns_file)):
+                raise
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def read_csv_columns(csv_path, chunk_size):
+    """
+    Parse a CSV file in chunks, narrowing every column of every chunk before the next one is parsed.
+
+    :param csv_path: path of the CSV file
+    :param chunk_size: number of rows parsed at once
+    :return: dict of column name to NumPy array
+    """
+    chunks = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        for column in chunk.columns:
+            chunks.setdefault(column, []).append(narrow(chunk[column].to_numpy()))
+
+    columns = {}
+    for column, parts in chunks.items():
+        # Chunks narrowed to different dtypes are joined in the narrowest dtype holding all of them
+        columns[column] = narrow(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+    return columns
+
+
+def narrow(values):
+    """
+    Return values in the narrowest dtype holding them exactly.
+
+    Whole floats without missing values are integers, unless they are out of the int64 range. Booleans are kept.
+
+    :param values: NumPy array
+    :return: NumPy array of a bool, signed integer, float32 or float64 dtype, or the values themselves for other
+        dtypes, e.g. strings as Python objects
+    """
+    if values.dtype.kind == "f" and len(values) and np.isfinite(values).all() and (values == np.round(values)).all():
+        # Whole amounts written with a decimal point, 2 ** 63 is the first float past the int64 range
+        if -2.0 ** 63 <= values.min() and values.max() < 2.0 ** 63:
+            values = values.astype(np.int64)
+    if values.dtype.kind in "iu":
+        if len(values) == 0:
+            return values.astype(np.int8)
+        low, high = values.min(), values.max()
+        for dtype in (np.int8, np.int16, np.int32, np.int64):
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                return values.astype(dtype)
+        return values
+    if values.dtype.kind == "f":
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+            return narrowed
+        return values.astype(np.float64)
+    return values
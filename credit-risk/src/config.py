@@ -1,3 +1,4 @@
+from .model_manager import ModelManager
 from .predictor import Predictor
 
 
@@ -19,15 +20,57 @@ class Configuration:
 
         self.training_data_url = "./data/Kaggle/CreditCard-train.csv"
         self.testing_data_url = "./data/Kaggle/CreditCard-train.csv"
+        # Parsed testing data, memory-mapped and shared by the app processes
+        self.data_cache_dir = "./data/cache"
+
+        self.page_size = 20
+        self.default_sort_column = "Default Prediction Rate"
+        # The ID column is searched by prefix, the other search columns by substring
+        self.search_columns = ["LIMIT_BAL", "AGE"]
+
+        self.loading_refresh_seconds = 1
+
+        # Review decisions are kept in a SQLite database, written in batches in the background. The decisions of
+        # other app replicas sharing the database are read every few seconds
+        self.decision_store_path = "./data/decisions.sqlite3"
+        self.decision_flush_seconds = 1.0
+        self.decision_reload_seconds = 5.0
 
         self.figure_config = {"scrollZoom": False, "displayModeBar": None}
-        self.approval_threshold = 0.35  # This prediction threshold could be optimized per model but it is hard coded for this example.
+        # Default approval threshold, analysts can tune it on the threshold page
+        self.approval_threshold = 0.35
+        # Expected profit of approving a customer who pays and loss of approving one who defaults, in the same unit
+        self.approved_good_profit = 1.0
+        self.approved_default_loss = 5.0
+
+        # Score bands and number of top reasons per band of the global explanation page
+        self.explanation_band_edges = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+        self.explanation_top_reasons = 3
+
+
+def build_predictor(report_progress):
+    """
+    Load the cached native model, or start H2O-3 and train the model, then score the testing data.
+
+    :param report_progress: function called with the progress between 0 and 1 and a message
+    :return: ready Predictor
+    """
+    predictor = Predictor(cache_dir=config.data_cache_dir)
+    if predictor.has_native_model(config.training_data_url, config.default_model):
+        report_progress(0.05, "Loading the cached model")
+    else:
+        report_progress(0.05, "Starting H2O-3")
+        predictor.start_h2o()
+        report_progress(0.2, "Training the model")
+    predictor.build_model(config.training_data_url, config.default_model)
+    report_progress(0.7, "Loading the testing data")
+    predictor.set_testing_data_frame(config.testing_data_url)
+    report_progress(0.8, "Scoring the customers")
+    predictor.predict()
+    return predictor
 
 
 config = Configuration()
 
-# Initialize H2O-3 and run ML analysis
-predictor = Predictor()
-predictor.build_model(config.training_data_url, config.default_model)
-predictor.set_testing_data_frame(config.testing_data_url)
-predictor.predict()
+# The model is built in the background once the app starts, see ModelManager
+model_manager = ModelManager(build_predictor)
@@ -0,0 +1,217 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DecisionStore:
+    """
+    Durable map of customer id to review decision, backed by SQLite in WAL mode.
+
+    Reads and writes go to an in-memory dict, so the request path never waits for the disk. Writes are also
+    buffered and a background thread flushes the buffer in batches, one transaction per batch, either every
+    flush interval or as soon as the buffer holds a batch worth of decisions. The dict is rebuilt from the
+    database with a single query at startup. The background thread also reads the decisions written since its
+    last read every reload interval, so app replicas sharing the database see each other's decisions. A batch
+    which fails to be written, e.g. on a locked database or a full disk, goes back to the buffer and is written
+    again after the retry interval.
+    """
+
+    # Decisions are read again for this many seconds, batches of other replicas may be committed after they are
+    # stamped, and their clocks may be a little behind
+    reload_margin = 60.0
+
+    def __init__(self, path, flush_interval=1.0, batch_size=10000, retry_interval=5.0, reload_interval=5.0):
+        """
+        :param path: path of the SQLite database file
+        :param flush_interval: maximum number of seconds a decision waits in the buffer
+        :param batch_size: number of buffered decisions which triggers a flush right away
+        :param retry_interval: number of seconds to wait before writing a failed batch again
+        :param reload_interval: number of seconds between reads of the decisions of other replicas
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.reload_interval = reload_interval
+        self._decisions = {}
+        self._buffer = {}
+        self._batch = {}
+        self._reloaded_at = None
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+        self._thread = threading.Thread(target=self._run, name="decision-store", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._decisions)
+
+    def __contains__(self, customer_id):
+        return customer_id in self._decisions
+
+    def __getitem__(self, customer_id):
+        return self._decisions[customer_id]
+
+    def __setitem__(self, customer_id, status):
+        self.update({customer_id: status})
+
+    def __iter__(self):
+        return iter(list(self._decisions))
+
+    def get(self, customer_id, default=None):
+        return self._decisions.get(customer_id, default)
+
+    def keys(self):
+        return list(self._decisions)
+
+    def items(self):
+        return list(self._decisions.items())
+
+    def update(self, decisions):
+        """
+        Record a batch of decisions, they are written to the database in the background.
+
+        :param decisions: dict of customer id to status
+        """
+        with self._condition:
+            self._decisions.update(decisions)
+            self._buffer.update(decisions)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+
+    def reload(self):
+        """
+        Rebuild the in-memory map from the database.
+        """
+        connection = self._connect()
+        try:
+            self._reload(connection)
+        finally:
+            connection.close()
+
+    def _reload(self, connection, since=None):
+        """
+        Read the decisions of the database into the in-memory map.
+
+        :param connection: SQLite connection
+        :param since: optional time, only the decisions made after it are read and the others are kept
+        """
+        started_at = time.time()
+        if since is None:
+            rows = connection.execute("SELECT customer_id, status FROM decisions").fetchall()
+        else:
+            rows = connection.execute(
+                "SELECT customer_id, status FROM decisions WHERE decided_at >= ?", (since,)
+            ).fetchall()
+
+        with self._condition:
+            decisions = {} if since is None else dict(self._decisions)
+            decisions.update(rows)
+            # Decisions still being written or waiting in the buffer are newer than the database
+            decisions.update(self._batch)
+            decisions.update(self._buffer)
+            self._decisions = decisions
+            self._reloaded_at = started_at
+
+    def flush(self, timeout=None):
+        """
+        Wait until all buffered decisions are written to the database.
+
+        :param timeout: optional number of seconds to wait
+        :return: True if the buffer was flushed
+        """
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._buffer and not self._writing, timeout)
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent on a crash with synchronous=NORMAL, only the last commits may be lost
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS decisions "
+            "(customer_id PRIMARY KEY, status TEXT NOT NULL, decided_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS decisions_decided_at ON decisions (decided_at)")
+        return connection
+
+    def _run(self):
+        connection = self._connect()
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._closed or self._flush_requested or len(self._buffer) >= self.batch_size,
+                        min(self.flush_interval, self.reload_interval),
+                    )
+                    batch, self._buffer = self._buffer, {}
+                    self._batch = batch
+                    self._flush_requested = False
+                    self._writing = bool(batch)
+                    closed = self._closed
+
+                if not closed and time.time() - self._reloaded_at >= self.reload_interval:
+                    try:
+                        self._reload(connection, self._reloaded_at - self.reload_margin)
+                    except sqlite3.Error:
+                        logger.exception("Reading the decisions of %s failed", self.path)
+
+                if batch:
+                    try:
+                        self._write(connection, batch)
+                    except sqlite3.Error:
+                        logger.exception("Writing %d decisions to %s failed", len(batch), self.path)
+                        with self._condition:
+                            # Decisions buffered meanwhile are newer than the failed batch
+                            batch.update(self._buffer)
+                            self._buffer = batch
+                            self._batch = {}
+                            self._writing = False
+                            self._condition.notify_all()
+                            if closed:
+                                # The process is exiting, the buffered decisions are lost
+                                return
+                            self._condition.wait_for(lambda: self._closed, self.retry_interval)
+                            # Written again right away, not after another flush interval
+                            self._flush_requested = True
+                        continue
+
+                with self._condition:
+                    self._batch = {}
+                    self._writing = False
+                    self._condition.notify_all()
+                if closed and not batch:
+                    return
+        finally:
+            connection.close()
+
+    def _write(self, connection, batch):
+        decided_at = time.time()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO decisions (customer_id, status, decided_at) VALUES (?, ?, ?)",
+                [(customer_id, status, decided_at) for customer_id, status in batch.items()],
+            )
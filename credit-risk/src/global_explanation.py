@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class GlobalExplanation:
+    """
+    Portfolio level explanation of a model, from the Shapley contributions of every scored customer.
+
+    Everything is computed once with array operations over the whole contribution matrix: the mean absolute
+    contribution and the contribution quantiles of each feature, the dominant reason of each customer, i.e. the
+    feature pushing their score up the most, and the reason counts of each score band. Customers are also indexed
+    by dominant reason, sorted once so that drilling down into a reason is a slice instead of a scan.
+    """
+
+    quantiles = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+    def __init__(self, scored, band_edges=(0.0, 0.2, 0.4, 0.6, 0.8, 1.0), top_reason_count=3):
+        """
+        :param scored: ScoredResults of the customers
+        :param band_edges: increasing score band edges, from the lowest to the highest score
+        :param top_reason_count: number of top reasons kept per score band
+        """
+        contributions = scored.contributions
+        self.feature_names = list(scored.feature_names)
+        self.scores = scored.scores
+        self.band_edges = np.asarray(band_edges, dtype=np.float64)
+        feature_count = len(self.feature_names)
+        band_count = len(self.band_edges) - 1
+
+        absolute = np.abs(contributions)
+        self.mean_abs = absolute.mean(axis=0) if len(contributions) else np.zeros(feature_count)
+        self.feature_order = np.argsort(-self.mean_abs, kind="stable")
+        if len(contributions):
+            self.contribution_quantiles = np.quantile(contributions, self.quantiles, axis=0)
+        else:
+            self.contribution_quantiles = np.zeros((len(self.quantiles), feature_count))
+
+        # Scores outside of the edges fall into the first or the last band
+        self.bands = np.clip(np.searchsorted(self.band_edges, self.scores, side="right") - 1, 0, band_count - 1)
+        self.reasons = scored.top_positive
+        self.band_sizes = np.bincount(self.bands, minlength=band_count)
+        self.band_reason_counts = np.bincount(
+            self.bands * feature_count + self.reasons, minlength=band_count * feature_count
+        ).reshape(band_count, feature_count)
+        self.top_reason_count = min(top_reason_count, feature_count)
+
+        # Reason index: customers grouped by dominant reason, highest score first within a reason
+        self.reason_order = np.lexsort((-self.scores, self.reasons))
+        self.reason_offsets = np.concatenate([[0], np.cumsum(np.bincount(self.reasons, minlength=feature_count))])
+
+    def get_feature_importance(self):
+        """
+        Return the mean absolute contribution of every feature, the most important one first.
+
+        :return: list of (feature name, mean absolute contribution) tuples
+        """
+        return [(self.feature_names[i], float(self.mean_abs[i])) for i in self.feature_order]
+
+    def get_contribution_distributions(self):
+        """
+        Return the contribution quantiles of every feature, the most important one first.
+
+        :return: list of dicts with the feature name and one entry per quantile, e.g. "q50" for the median
+        """
+        distributions = []
+        for i in self.feature_order:
+            distribution = {"feature": self.feature_names[i]}
+            for quantile, value in zip(self.quantiles, self.contribution_quantiles[:, i]):
+                distribution[f"q{round(quantile * 100)}"] = float(value)
+            distributions.append(distribution)
+        return distributions
+
+    def get_band_label(self, band):
+        return f"{self.band_edges[band]:.1f} - {self.band_edges[band + 1]:.1f}"
+
+    def get_top_reasons_by_band(self):
+        """
+        Return the most frequent dominant reasons of every score band.
+
+        :return: list of dicts with the band, its label, its number of customers and its top reasons as a list of
+            (feature name, share of the customers of the band) tuples
+        """
+        top_reasons = np.argsort(-self.band_reason_counts, axis=1, kind="stable")[:, :self.top_reason_count]
+        bands = []
+        for band, size in enumerate(self.band_sizes):
+            reasons = [
+                (self.feature_names[i], float(self.band_reason_counts[band, i] / size))
+                for i in top_reasons[band] if self.band_reason_counts[band, i]
+            ]
+            bands.append({"band": band, "label": self.get_band_label(band), "count": int(size), "reasons": reasons})
+        return bands
+
+    def get_customers(self, feature, band=None):
+        """
+        Return the customers whose dominant reason is a feature, highest score first.
+
+        :param feature: feature name
+        :param band: optional score band to restrict the customers to
+        :return: NumPy array of row indices
+        """
+        i = self.feature_names.index(feature)
+        rows = self.reason_order[self.reason_offsets[i]:self.reason_offsets[i + 1]]
+        if band is not None:
+            rows = rows[self.bands[rows] == band]
+        return rows
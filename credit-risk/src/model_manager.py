@@ -0,0 +1,93 @@
+import threading
+
+
+class ModelManager:
+    """
+    Lifecycle manager of the predictor.
+
+    The predictor is built on a background thread, so the app can serve a loading page right away instead of
+    waiting for H2O-3 to start and the model to train. The manager reports its state and progress while building,
+    and swaps the ready predictor in atomically: pages always see either the previous predictor or the new one.
+    """
+
+    idle = "idle"
+    loading = "loading"
+    ready = "ready"
+    failed = "failed"
+
+    def __init__(self, build):
+        """
+        :param build: function building a predictor, called with a report_progress(progress, message) function
+        """
+        self.build = build
+        self.state = self.idle
+        self.progress = 0.0
+        self.message = ""
+        self.error = None
+        self._predictor = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def predictor(self):
+        """
+        Return the ready predictor, or None while the first one is still being built.
+        """
+        with self._lock:
+            return self._predictor
+
+    def is_ready(self):
+        return self.predictor is not None
+
+    def start(self):
+        """
+        Start building a predictor in the background, unless one is already being built.
+
+        Calling it again once a predictor is ready rebuilds it, the current one keeps serving until the swap.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.state = self.loading
+            self.progress = 0.0
+            self.message = "Starting"
+            self.error = None
+            if self._predictor is None:
+                self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="model-manager", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the first predictor to be ready.
+
+        :param timeout: optional number of seconds to wait
+        :return: the ready predictor
+        :raises RuntimeError: if building the predictor failed or timed out
+        """
+        if not self._ready.wait(timeout) or self.predictor is None:
+            raise RuntimeError(f"Predictor is not ready: {self.error or self.state}")
+        return self.predictor
+
+    def report_progress(self, progress, message):
+        with self._lock:
+            self.progress = progress
+            self.message = message
+
+    def _run(self):
+        try:
+            predictor = self.build(self.report_progress)
+        except Exception as e:
+            with self._lock:
+                self.state = self.failed
+                self.error = str(e)
+            self._ready.set()
+            raise
+
+        with self._lock:
+            self._predictor = predictor
+            self.state = self.ready
+            self.progress = 1.0
+            self.message = "Ready"
+        self._ready.set()
@@ -0,0 +1,114 @@
+from h2o_wave import Q
+
+
+class PageState:
+    """
+    Cards a client's browser already has, to send it only what changed.
+
+    Views render their cards in full as before, but through render() instead of assigning them to the page. Each
+    card is compared with the card last sent under the same name: an unchanged card sends nothing, and a changed
+    one only sends the values which differ, e.g. the status cell of one table row, as in-place updates. Cards are
+    never dropped when navigating, the cards of the other pages stay in the browser hidden, since their zones are
+    not in the layout, so coming back to a page only sends what changed meanwhile.
+    """
+
+    # Lists with more changed elements than this share are sent whole, which is smaller than one update each
+    list_change_share = 0.5
+
+    def __init__(self):
+        self.cards = {}
+
+    def render(self, page, name, card, in_place=True):
+        """
+        Send a card to the page, or only the parts of it which changed since it was last sent.
+
+        :param page: page of the client
+        :param name: name of the card
+        :param card: card, as created by ui.*_card()
+        :param in_place: whether a changed card may be updated in place, otherwise it is sent whole
+        :return: True if anything was sent
+        """
+        new = to_plain(card)
+        old = self.cards.get(name)
+        self.cards[name] = new
+        if old == new:
+            return False
+
+        changes = []
+        if old is None or not in_place or not get_changes(old, new, (), changes):
+            page[name] = card
+            return True
+
+        for path, value in changes:
+            ref = page[name]
+            for key in path[:-1]:
+                ref = ref[key]
+            ref[path[-1]] = value
+        return True
+
+
+def get_page_state(q: Q):
+    """
+    Return the page state of the client, starting from an empty page the first time.
+    """
+    if q.client.page_state is None:
+        # The page may still hold the cards of a previous app run, which the new state knows nothing about
+        q.page.drop()
+        q.client.page_state = PageState()
+    return q.client.page_state
+
+
+def render_card(q: Q, name, card, in_place=True):
+    return get_page_state(q).render(q.page, name, card, in_place)
+
+
+def render_layout(q: Q, meta_card):
+    # Layouts are small, and the browser rebuilds the zones when the meta card is replaced
+    return render_card(q, 'meta', meta_card, in_place=False)
+
+
+def to_plain(value):
+    """
+    Return a card or any part of it as nested dicts and lists, like it is sent to the browser.
+    """
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if hasattr(value, 'dump') and callable(value.dump):
+        return to_plain(value.dump())
+    return value
+
+
+def get_changes(old, new, path, changes):
+    """
+    Collect the in-place updates turning a card into another one.
+
+    :param old: plain card last sent
+    :param new: plain card to send
+    :param path: keys leading from the card to the compared values
+    :param changes: list the (path, value) updates are appended to
+    :return: False if the card has to be sent whole
+    """
+    if old == new:
+        return True
+
+    if not path and (not isinstance(new, dict) or not isinstance(old, dict) or old.get('view') != new.get('view')):
+        return False
+    # Data buffers are stored apart from the card, they can only be replaced with the card
+    if path and path[-1] == 'data':
+        return False
+
+    if isinstance(old, dict) and isinstance(new, dict) and set(old) <= set(new):
+        return all(get_changes(old.get(key), value, path + (key,), changes) for key, value in new.items())
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changed = [i for i, (old_item, new_item) in enumerate(zip(old, new)) if old_item != new_item]
+        if len(changed) <= PageState.list_change_share * len(new):
+            return all(get_changes(old[i], new[i], path + (i,), changes) for i in changed)
+
+    # A removed key, a resized or mostly changed list or a new value, the parent cannot be patched further
+    if not path:
+        return False
+    changes.append((path, new))
+    return True
@@ -0,0 +1,137 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+
+class PartialDependence:
+    """
+    Partial dependence (PD) and individual conditional expectation (ICE) engine.
+
+    The global PD curve of a feature does not depend on the selected customer, so it is computed once per feature:
+    the whole frame is replicated over the grid of the feature and scored in a single batched call. The ICE line
+    of a customer then only needs one small batch of one row per grid value.
+    """
+
+    def __init__(self, score, df, feature_names, grid_size=20, max_rows=None, seed=1234):
+        """
+        :param score: function scoring a Pandas DataFrame into a NumPy array of scores
+        :param df: Pandas DataFrame of the explained rows, ICE lines are looked up by row position
+        :param feature_names: list of features to explain
+        :param grid_size: maximum number of grid values per feature
+        :param max_rows: optional number of rows sampled to average the PD curves over, defaults to all rows
+        :param seed: random seed of the row sample
+        """
+        self.score = score
+        # A shallow copy, the values of a memory-mapped frame stay shared
+        self.df = df.copy(deep=False)
+        self.df.index = pd.RangeIndex(len(df))
+        self.feature_names = list(feature_names)
+        self.grid_size = grid_size
+        self.sample = np.arange(len(self.df))
+        if max_rows is not None and max_rows < len(self.df):
+            self.sample = np.sort(np.random.RandomState(seed).choice(len(self.df), max_rows, replace=False))
+        self._curves = {}
+        self._lock = threading.Lock()
+
+    def get_grid(self, feature):
+        """
+        Return the values a feature is set to.
+
+        Categorical features use their most frequent levels, numeric features use their distinct values or
+        evenly spaced values between their minimum and maximum.
+
+        :param feature: feature name
+        :return: NumPy array of grid values
+        """
+        column = self.df[feature].dropna()
+        if not is_numeric(column):
+            levels = column.astype(str).value_counts().index[:self.grid_size]
+            return np.sort(levels.to_numpy(dtype=object))
+
+        values = np.unique(column.to_numpy(dtype=np.float64))
+        if len(values) <= self.grid_size:
+            return values
+        return np.linspace(values[0], values[-1], self.grid_size)
+
+    def get_curve(self, feature):
+        """
+        Return the global PD curve of a feature, computed on the first call only.
+
+        :param feature: feature name
+        :return: tuple of NumPy arrays (grid, mean score, standard deviation of the score) over the grid
+        """
+        with self._lock:
+            curve = self._curves.get(feature)
+            if curve is None:
+                curve = self._compute_curve(feature)
+                self._curves[feature] = curve
+        return curve
+
+    def get_ice(self, row_index, feature):
+        """
+        Return the ICE line of a row, its score over the grid of a feature.
+
+        :param row_index: row position in the explained frame
+        :param feature: feature name
+        :return: tuple of NumPy arrays (grid, score) over the grid
+        """
+        grid = self.get_curve(feature)[0]
+        batch = self.df.iloc[np.repeat(row_index, len(grid))].reset_index(drop=True)
+        batch[feature] = grid
+        return grid, np.asarray(self.score(batch), dtype=np.float64)
+
+    def warm_up(self, features=None):
+        for feature in features or self.feature_names:
+            self.get_curve(feature)
+
+    def plot(self, row_index, feature):
+        """
+        Plot the PD curve of a feature with the ICE line of a row.
+
+        The figure is not attached to pyplot, so plots can be drawn from several threads at once.
+
+        :param row_index: row position in the explained frame
+        :param feature: feature name
+        :return: matplotlib figure object
+        """
+        grid, mean, std = self.get_curve(feature)
+        ice = self.get_ice(row_index, feature)[1]
+        value = self.df[feature].iloc[row_index]
+
+        figure = Figure(figsize=(16, 9))
+        axes = figure.subplots()
+        if is_numeric(self.df[feature]):
+            axes.plot(grid, mean, label="Partial dependence")
+            axes.fill_between(grid, mean - std, mean + std, alpha=0.2)
+            axes.plot(grid, ice, linestyle="--", label=f"Row {row_index}")
+            if pd.notna(value):
+                axes.axvline(value, color="grey", linestyle=":", label=f"{feature} = {value}")
+        else:
+            positions = np.arange(len(grid))
+            axes.errorbar(positions, mean, yerr=std, fmt="o", capsize=4, label="Partial dependence")
+            axes.plot(positions, ice, "x", markersize=10, label=f"Row {row_index}")
+            axes.set_xticks(positions)
+            axes.set_xticklabels(grid, rotation=45)
+
+        axes.set_title(f'Partial Dependence plot for "{feature}" with row {row_index}')
+        axes.set_xlabel(feature)
+        axes.set_ylabel("Mean response")
+        axes.grid(True)
+        axes.legend()
+        figure.tight_layout()
+        return figure
+
+    def _compute_curve(self, feature):
+        grid = self.get_grid(feature)
+        row_count = len(self.sample)
+
+        batch = self.df.iloc[np.tile(self.sample, len(grid))].reset_index(drop=True)
+        batch[feature] = np.repeat(grid, row_count)
+        scores = np.asarray(self.score(batch), dtype=np.float64).reshape(len(grid), row_count)
+        return grid, scores.mean(axis=1), scores.std(axis=1)
+
+
+def is_numeric(column):
+    return pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
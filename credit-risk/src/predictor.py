@@ -1,8 +1,19 @@
+import os
+
 import h2o
+import numpy as np
 import pandas as pd
 
 from h2o.estimators.gbm import H2OGradientBoostingEstimator
 
+from .columnar_cache import ColumnarCache
+from .global_explanation import GlobalExplanation
+from .partial_dependence import PartialDependence
+from .scored_results import ScoredResults
+from .thresholds import ThresholdAnalysis
+from .tree_scorer import TreeEnsemble
+from .what_if import WhatIf
+
 
 class Predictor:
     """
@@ -10,41 +21,266 @@ class Predictor:
 
     ChurnPredictor builds an abstraction between H2O-3 machine learning library and the Churn Risk app
     giving the developer freedom to integrate any 3rd party machine library with a minimal change to the app code.
+
+    The H2O-3 cluster is only started to train the model, or to score and explain with H2O-3 when the model could
+    not be exported to the native scorer. A native model loaded from the cache serves without the JVM.
     """
 
-    def __init__(self):
+    response_column = "default.payment.next.month"
+    prediction_column = "Default Prediction Rate"
+    native_model_tolerance = 1e-6
+    # H2O-3 computes the contributions in single precision
+    native_contributions_tolerance = 1e-5
+    # Number of customers the partial dependence curves are averaged over
+    partial_dependence_rows = 5000
+
+    def __init__(self, cache_dir=None):
+        """
+        :param cache_dir: optional directory to cache the parsed testing data and the native model in
+        """
+        self.cache_dir = cache_dir
+        self.columnar_cache = ColumnarCache(cache_dir) if cache_dir else None
         self.model = None
+        self.model_id = None
+        self.native_model = None
         self.train_df = None
         self.test_df = None
+        self.testing_df = None
+        self.testing_data_path = None
         self.predicted_df = None
         self.contributions_df = None
+        self.scored = None
+        self.scored_table = None
+        self.columns = None
+        self.labels = None
+        self.partial_dependence = None
+        self.what_if = None
+        self.h2o_started = False
+
+    def start_h2o(self):
+        """
+        Start the H2O-3 cluster, or connect to a running one, unless it was already done.
+        """
+        if not self.h2o_started:
+            h2o.init()
+            self.h2o_started = True
 
-        h2o.init()
+    def get_native_model_path(self, training_data_path, model_id):
+        # A changed training file gets a new model, the stale one is never loaded again
+        stat = os.stat(training_data_path)
+        return os.path.join(self.cache_dir, f"{model_id}-{stat.st_size}-{stat.st_mtime_ns}.npz")
+
+    def has_native_model(self, training_data_path, model_id):
+        """
+        Return whether the native export of a model trained on the same data is cached.
+
+        :param training_data_path: path of the training data file
+        :param model_id: H2O-3 model id
+        """
+        return bool(self.cache_dir) and os.path.exists(self.get_native_model_path(training_data_path, model_id))
 
     def build_model(self, training_data_path, model_id):
+        """
+        Train the GBM model, or load its native export from the cache when it was already trained on the same data.
+
+        :param training_data_path: path of the training data file
+        :param model_id: H2O-3 model id
+        """
+        self.model_id = model_id
+        native_model_path = self.get_native_model_path(training_data_path, model_id) if self.cache_dir else None
+        if self.has_native_model(training_data_path, model_id):
+            # Scored and explained in-process, neither the H2O-3 model nor the cluster are needed
+            self.native_model = TreeEnsemble.load(native_model_path)
+            return
+
+        self.start_h2o()
         train_df = h2o.import_file(path=training_data_path)
 
         predictors = train_df.columns
-        response = "default.payment.next.month"
+        response = self.response_column
         train, valid = train_df.split_frame([0.8])
 
         self.model = H2OGradientBoostingEstimator(model_id=model_id, seed=100)
         self.model.train(
             x=predictors, y=response, training_frame=train, validation_frame=valid
         )
+        self.native_model = self.export_native_model(train, valid)
+        if self.native_model and native_model_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.native_model.save(native_model_path)
+
+    def export_native_model(self, train, valid):
+        """
+        Export the trained model to the in-process tree scorer.
+
+        The exported model is only used when it reproduces both the H2O-3 predictions and contributions of the
+        validation frame.
+
+        :param train: H2OFrame the model was trained on
+        :param valid: H2OFrame to verify the exported model on
+        :return: TreeEnsemble or None
+        """
+        try:
+            native_model = TreeEnsemble.from_h2o(self.model, train.as_data_frame())
+        except ValueError:
+            return None
+
+        matrix = native_model.encode(valid.as_data_frame())
+        expected = self.model.predict(valid).as_data_frame()["predict"].to_numpy()
+        if not np.allclose(native_model.predict(matrix), expected, rtol=0, atol=self.native_model_tolerance):
+            return None
+
+        expected = self.model.predict_contributions(valid).as_data_frame()
+        expected = expected[native_model.feature_names + ["BiasTerm"]].to_numpy()
+        actual = np.column_stack([
+            native_model.predict_contributions(matrix), np.full(len(matrix), native_model.expected_value())
+        ])
+        if not np.allclose(actual, expected, rtol=0, atol=self.native_contributions_tolerance):
+            return None
+        return native_model
 
     def set_testing_data_frame(self, testing_data_path):
-        self.test_df = h2o.import_file(path=testing_data_path)
+        self.testing_data_path = testing_data_path
+        if not self.native_model:
+            # Only H2O-3 needs the testing data in the cluster, to score and explain it
+            self.test_df = h2o.import_file(path=testing_data_path)
 
     def get_testing_data_as_pd_frame(self):
-        return pd.DataFrame(self.test_df.as_data_frame())
+        return self.load_testing_data()
+
+    def load_testing_data(self):
+        """
+        Return the testing data as a Pandas DataFrame, in narrow dtypes and memory-mapped when there is a cache.
+        """
+        if self.columnar_cache:
+            return self.columnar_cache.load_frame(self.testing_data_path)
+        return pd.read_csv(self.testing_data_path)
 
     def get_predict_data_as_pd_frame(self):
-        return pd.DataFrame(self.predicted_df.as_data_frame())
+        return pd.DataFrame({"predict": self.scored.scores})
 
     def predict(self):
-        self.predicted_df = self.model.predict(self.test_df)
-        self.contributions_df = self.model.predict_contributions(self.test_df)
+        """
+        Score the testing data frame and materialise the results once into NumPy lookup tables.
+
+        The data is scored in-process by the native model when there is one, and by H2O-3 otherwise.
+        """
+        testing_df = self.load_testing_data()
+        self.testing_df = testing_df
+        if self.native_model:
+            self.scored = self.score_batch(testing_df)
+        else:
+            self.predicted_df = self.model.predict(self.test_df)
+            self.contributions_df = self.model.predict_contributions(self.test_df)
+            self.scored = ScoredResults(
+                self.predicted_df.as_data_frame(), self.contributions_df.as_data_frame(), "predict"
+            )
+
+        self.partial_dependence = PartialDependence(
+            self.predict_scores, testing_df, self.scored.feature_names, max_rows=self.partial_dependence_rows
+        )
+        # What-if variants of a customer follow the same grids as the partial dependence curves
+        self.what_if = WhatIf(self.score_batch, testing_df, self.partial_dependence.get_grid)
+
+        if self.response_column in testing_df.columns:
+            self.labels = testing_df[self.response_column].to_numpy()
+
+        # Dropping a column would copy every other one, deleting it only copies the columns of its dtype
+        scored_table = testing_df.copy(deep=False)
+        if self.response_column in scored_table.columns:
+            del scored_table[self.response_column]
+        scored_table[self.prediction_column] = np.round(self.scored.scores, 4)
+        self.scored_table = scored_table
+        self.columns = {column: scored_table[column].to_numpy() for column in scored_table.columns}
+
+    def get_scored_table(self):
+        """
+        Return the testing data with the rounded default prediction rate of every customer.
+
+        The table is built once by predict() and shared by all page renders, so callers slice it and never modify it.
+
+        :return: Pandas DataFrame indexed by row index
+        """
+        return self.scored_table
+
+    def get_threshold_analysis(self, approved_good_profit, approved_default_loss):
+        """
+        Return the approval metrics of every threshold over the scored customers.
+
+        :param approved_good_profit: profit of approving a customer who pays
+        :param approved_default_loss: loss of approving a customer who defaults
+        :return: ThresholdAnalysis or None if the testing data has no labels
+        """
+        if self.labels is None:
+            return None
+        return ThresholdAnalysis(self.scored.scores, self.labels, approved_good_profit, approved_default_loss)
+
+    def get_global_explanation(self, band_edges, top_reason_count):
+        """
+        Return the portfolio level explanation of the model over the scored customers.
+
+        :param band_edges: increasing score band edges to group the dominant reasons by
+        :param top_reason_count: number of top reasons kept per score band
+        :return: GlobalExplanation
+        """
+        return GlobalExplanation(self.scored, band_edges, top_reason_count)
+
+    def get_customer_record(self, row_index):
+        """
+        Return everything the customer page shows about one customer.
+
+        The record is read from the in-memory columns and lookup tables, so it only touches the data of that row.
+
+        :param row_index: row index of the customer in the testing data frame
+        :return: dict with the row index, the features as a dict of column name to value, the score and the
+            contributions as a list of (feature name, contribution) tuples from the most positive one
+        """
+        return {
+            "row_index": row_index,
+            "features": {
+                column: to_python(values[row_index])
+                for column, values in self.columns.items() if column != self.prediction_column
+            },
+            "score": self.scored.get_score(row_index),
+            "contributions": self.scored.get_contributions(row_index),
+        }
+
+    def predict_scores(self, df):
+        """
+        Return the default predictions of a batch of customers, without contributions.
+
+        :param df: Pandas DataFrame of customers
+        :return: NumPy array of predictions
+        """
+        if self.native_model:
+            return self.native_model.predict(self.native_model.encode(df))
+
+        frame = h2o.H2OFrame(df)
+        predicted_df = self.model.predict(frame)
+        try:
+            return predicted_df.as_data_frame()["predict"].to_numpy()
+        finally:
+            for h2o_frame in (frame, predicted_df):
+                h2o.remove(h2o_frame)
+
+    def score_batch(self, df):
+        """
+        Score a batch of customers outside of the testing data frame.
+
+        :param df: Pandas DataFrame of customers
+        :return: ScoredResults of the batch
+        """
+        if self.native_model:
+            return ScoredResults(*self.native_model.score_frames(df), "predict")
+
+        frame = h2o.H2OFrame(df)
+        predicted_df = self.model.predict(frame)
+        contributions_df = self.model.predict_contributions(frame)
+        try:
+            return ScoredResults(predicted_df.as_data_frame(), contributions_df.as_data_frame(), "predict")
+        finally:
+            for h2o_frame in (frame, predicted_df, contributions_df):
+                h2o.remove(h2o_frame)
 
     def get_churn_rate_of_customer(self, row_index):
         """
@@ -53,41 +289,38 @@ class Predictor:
         :param row_index: row index of the customer in dataframe
         :return: percentage as a float
         """
-        return round(
-            float(self.predicted_df.as_data_frame()["TRUE"][row_index]) * 100, 2
-        )
+        return round(self.scored.get_score(row_index) * 100, 2)
 
     def get_shap_explanation(self, row_index):
+        """
+        Return the SHAP explanation of a customer, drawn from the native contributions when there is a native model.
+
+        :param row_index: row index of the customer in the testing data frame
+        :return: matplotlib figure object
+        """
+        if self.native_model:
+            title = f'SHAP explanation for "{self.model_id}" on row {row_index}'
+            return self.scored.plot_contributions(row_index, title, self.testing_df.iloc[row_index].to_dict())
         return self.model.shap_explain_row_plot(frame=self.test_df, row_index=row_index)
 
     def get_top_negative_pd_explanation(self, row_index):
         """
         Return the partial dependence explanation of the top negatively contributing feature.
 
-        :param row_index: row index to select from H2OFrame for the explanation
+        :param row_index: row index of the customer in the testing data frame
         :return: matplotlib figure object
         """
-        column_index = self.contributions_df.idxmin(axis=1).as_data_frame()[
-            "which.min"
-        ][row_index]
-        return self.model.pd_plot(
-            frame=self.test_df,
-            row_index=row_index,
-            column=self.test_df.col_names[column_index],
-        )
+        return self.partial_dependence.plot(row_index, self.scored.get_top_negative_feature(row_index))
 
     def get_top_positive_pd_explanation(self, row_index):
         """
         Return the partial dependence explanation of the top positively contributing feature.
 
-        :param row_index: row index to select from H2OFrame for the explanation
+        :param row_index: row index of the customer in the testing data frame
         :return: matplotlib figure object
         """
-        column_index = self.contributions_df.idxmax(axis=1).as_data_frame()[
-            "which.max"
-        ][row_index]
-        return self.model.pd_plot(
-            frame=self.test_df,
-            row_index=row_index,
-            column=self.test_df.col_names[column_index],
-        )
+        return self.partial_dependence.plot(row_index, self.scored.get_top_positive_feature(row_index))
+
+
+def to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
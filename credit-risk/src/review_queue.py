@@ -0,0 +1,118 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+class ReviewQueue:
+    """
+    Queue of the customers waiting for a review decision, in priority order.
+
+    Each priority keeps a binary heap of (key, row position) entries, built once in linear time. Decided customers
+    are only flagged and dropped from a heap when they reach its top, so a decision costs O(1) per customer and
+    taking the next page costs O(page size * log n). Decisions are made in batches, either on a list of customers
+    or on a whole score band.
+    """
+
+    risk = "risk"
+    uncertainty = "uncertainty"
+
+    def __init__(self, ids, scores, threshold, decided_ids=()):
+        """
+        :param ids: customer ids
+        :param scores: NumPy array of predicted default probabilities of the customers
+        :param threshold: approval threshold, the uncertainty priority puts the scores closest to it first
+        :param decided_ids: ids of the customers which already have a decision
+        """
+        self.ids = np.asarray(ids)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.threshold = threshold
+        self.pending = np.ones(len(self.ids), dtype=bool)
+        self._index = pd.Index(self.ids)
+        self._heaps = {}
+
+        self.pending[self.get_positions(list(decided_ids))] = False
+        self.pending_count = int(self.pending.sum())
+
+    def __len__(self):
+        return self.pending_count
+
+    def set_threshold(self, threshold):
+        if threshold != self.threshold:
+            self.threshold = threshold
+            self._heaps.pop(self.uncertainty, None)
+
+    def get_keys(self, priority):
+        if priority == self.risk:
+            return -self.scores
+        if priority == self.uncertainty:
+            return np.abs(self.scores - self.threshold)
+        raise ValueError(f"Unknown priority {priority}")
+
+    def get_positions(self, ids):
+        """
+        Return the row positions of customers, unknown ids are skipped.
+
+        :param ids: list of customer ids
+        :return: NumPy array of row positions
+        """
+        positions = self._index.get_indexer(ids)
+        return positions[positions >= 0]
+
+    def peek(self, count, priority=risk):
+        """
+        Return the next pending customers without removing them from the queue.
+
+        :param count: maximum number of customers to return
+        :param priority: ReviewQueue.risk for the highest scores first or ReviewQueue.uncertainty for the scores
+            closest to the threshold first
+        :return: list of row positions in priority order
+        """
+        heap = self._get_heap(priority)
+        top = []
+        while heap and len(top) < count:
+            entry = heapq.heappop(heap)
+            # Decided customers are dropped for good once they reach the top of the heap
+            if self.pending[entry[1]]:
+                top.append(entry)
+
+        for entry in top:
+            heapq.heappush(heap, entry)
+        return [position for _, position in top]
+
+    def get_band(self, low, high):
+        """
+        Return the pending customers whose score lies in a band.
+
+        :param low: lowest score of the band, included
+        :param high: highest score of the band, included
+        :return: NumPy array of row positions
+        """
+        return np.flatnonzero(self.pending & (self.scores >= low) & (self.scores <= high))
+
+    def decide(self, positions, status):
+        """
+        Record the same decision for a batch of customers, removing them from the queue.
+
+        :param positions: row positions of the customers
+        :param status: status of the decision
+        :return: dict of customer id to status of the customers which were still pending
+        """
+        positions = np.unique(np.asarray(positions, dtype=np.int64))
+        positions = positions[self.pending[positions]]
+        self.pending[positions] = False
+        self.pending_count -= len(positions)
+        return {to_python(customer_id): status for customer_id in self.ids[positions]}
+
+    def _get_heap(self, priority):
+        heap = self._heaps.get(priority)
+        if heap is None:
+            positions = np.flatnonzero(self.pending)
+            heap = list(zip(self.get_keys(priority)[positions].tolist(), positions.tolist()))
+            heapq.heapify(heap)
+            self._heaps[priority] = heap
+        return heap
+
+
+def to_python(value):
+    return value.item() if isinstance(value, np.generic) else value
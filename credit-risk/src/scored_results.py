@@ -0,0 +1,97 @@
+import numpy as np
+from matplotlib.figure import Figure
+
+
+class ScoredResults:
+    """
+    In-process lookup tables of a scored data set.
+
+    Predictions and Shapley contributions are pulled out of H2O-3 once after scoring and kept as contiguous NumPy
+    arrays indexed by row, so reading the results of a single customer never needs a round trip to the cluster.
+    """
+
+    def __init__(self, predictions, contributions, score_column, bias_column="BiasTerm"):
+        """
+        :param predictions: Pandas DataFrame of predictions
+        :param contributions: Pandas DataFrame of contributions, one column per feature plus the bias term
+        :param score_column: column of the predictions holding the score
+        :param bias_column: column of the contributions holding the bias term
+        """
+        feature_names = [column for column in contributions.columns if column != bias_column]
+
+        self.feature_names = feature_names
+        self.scores = np.ascontiguousarray(predictions[score_column].to_numpy(dtype=np.float64))
+        self.contributions = np.ascontiguousarray(contributions[feature_names].to_numpy(dtype=np.float64))
+        if bias_column in contributions.columns:
+            self.bias = np.ascontiguousarray(contributions[bias_column].to_numpy(dtype=np.float64))
+        else:
+            self.bias = np.zeros(len(self.scores))
+
+        self.top_negative = self.contributions.argmin(axis=1)
+        self.top_positive = self.contributions.argmax(axis=1)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def get_score(self, row_index):
+        return float(self.scores[row_index])
+
+    def get_top_negative_feature(self, row_index):
+        return self.feature_names[self.top_negative[row_index]]
+
+    def get_top_positive_feature(self, row_index):
+        return self.feature_names[self.top_positive[row_index]]
+
+    def get_contributions(self, row_index):
+        """
+        Return the contributions of a row ordered from the most positive to the most negative one.
+
+        :param row_index: row index of the customer
+        :return: list of (feature name, contribution) tuples
+        """
+        row = self.contributions[row_index]
+        return [(self.feature_names[i], float(row[i])) for i in np.argsort(-row, kind="stable")]
+
+    def plot_contributions(self, row_index, title, values=None, top_count=10):
+        """
+        Plot the largest contributions of a row as horizontal bars, like the SHAP row plot of H2O-3.
+
+        The figure is not attached to pyplot, so plots can be drawn from several threads at once.
+
+        :param row_index: row index of the customer
+        :param title: title of the plot
+        :param values: optional dict of feature name to the value of the row, shown in the labels
+        :param top_count: number of contributions shown, the largest in absolute value
+        :return: matplotlib figure object
+        """
+        row = self.contributions[row_index]
+        # Largest contribution at the top
+        top = np.argsort(-np.abs(row), kind="stable")[:top_count][::-1]
+        labels = [
+            f"{self.feature_names[i]}={values[self.feature_names[i]]}" if values else self.feature_names[i] for i in top
+        ]
+
+        figure = Figure(figsize=(16, 9))
+        axes = figure.subplots()
+        axes.barh(np.arange(len(top)), row[top], color=np.where(row[top] >= 0, "tab:red", "tab:blue"))
+        axes.set_yticks(np.arange(len(top)))
+        axes.set_yticklabels(labels)
+        axes.set_title(title)
+        axes.set_xlabel("SHAP Contribution")
+        axes.grid(True, axis="x")
+        figure.tight_layout()
+        return figure
+
+    def get_highest_score_rows(self, count):
+        """
+        Return the row indices with the highest scores.
+
+        :param count: number of rows to return
+        :return: NumPy array of row indices, highest score first
+        """
+        count = min(count, len(self.scores))
+        if count <= 0:
+            return np.array([], dtype=np.int64)
+
+        top = np.argpartition(-self.scores, count - 1)[:count]
+        return top[np.argsort(-self.scores[top], kind="stable")]
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class TablePager:
+    """
+    Server-side sorting, searching and paging over a whole data frame.
+
+    Sort permutations of every column are built once, so a sorted page is a slice of a precomputed permutation.
+    Prefix columns are searched with binary searches over their sorted values, substring columns by matching their
+    distinct values once and mapping the matches back to the rows. Recent search results are cached, as paging
+    through the results repeats the same query.
+    """
+
+    def __init__(self, df, prefix_columns=(), substring_columns=(), cache_size=64):
+        """
+        :param df: Pandas DataFrame to page through, pages keep its index
+        :param prefix_columns: columns whose values are matched by prefix, e.g. ids
+        :param substring_columns: columns whose values are matched by substring
+        :param cache_size: number of search results to keep
+        """
+        self.df = df
+        self.cache_size = cache_size
+        self._orders = {}
+        for column in df.columns:
+            self._orders[column, False], self._orders[column, True] = get_sort_orders(df[column])
+        self._prefix_indexes = [get_prefix_index(df[column]) for column in prefix_columns]
+        self._substring_indexes = [get_substring_index(df[column]) for column in substring_columns]
+        self._matches = OrderedDict()
+
+    def __len__(self):
+        return len(self.df)
+
+    def get_order(self, column=None, descending=False):
+        """
+        Return the row positions sorted by a column, missing values last in both directions.
+
+        :param column: column to sort by, None keeps the order of the data frame
+        :param descending: whether to sort from the largest value to the smallest
+        :return: NumPy array of row positions
+        """
+        if column is None:
+            return np.arange(len(self.df))
+        return self._orders[column, bool(descending)]
+
+    def search(self, query):
+        """
+        Return which rows match a query in any of the searched columns.
+
+        :param query: text to search for, case insensitive
+        :return: NumPy bool array over the row positions
+        """
+        query = query.strip().lower()
+        matches = self._matches.get(query)
+        if matches is not None:
+            self._matches.move_to_end(query)
+            return matches
+
+        matches = np.zeros(len(self.df), dtype=bool)
+        for keys, positions in self._prefix_indexes:
+            start = np.searchsorted(keys, query, side="left")
+            end = np.searchsorted(keys, query + "\uffff", side="left")
+            matches[positions[start:end]] = True
+        for codes, values in self._substring_indexes:
+            matching_values = np.append(np.char.find(values, query) >= 0, False)
+            matches |= matching_values[codes]
+
+        self._matches[query] = matches
+        if len(self._matches) > self.cache_size:
+            self._matches.popitem(last=False)
+        return matches
+
+    def get_page(self, page, page_size, sort_column=None, descending=False, query=None):
+        """
+        Return one page of the sorted and filtered rows.
+
+        :param page: zero based page number, clamped to the last page
+        :param page_size: number of rows per page
+        :param sort_column: column to sort by, None keeps the order of the data frame
+        :param descending: whether to sort from the largest value to the smallest
+        :param query: optional text to search for
+        :return: tuple of (Pandas DataFrame of the page, number of matching rows, page number)
+        """
+        order = self.get_order(sort_column, descending)
+        if query and query.strip():
+            order = order[self.search(query)[order]]
+
+        page_count = max(1, -(-len(order) // page_size))
+        page = min(max(page, 0), page_count - 1)
+        return self.df.iloc[order[page * page_size:(page + 1) * page_size]], len(order), page
+
+
+def get_sort_orders(column):
+    """
+    Return the ascending and descending sort permutations of a column, missing values last in both.
+
+    :param column: Pandas Series
+    :return: tuple of NumPy arrays of row positions (ascending, descending)
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        order = np.argsort(column.to_numpy(), kind="stable")
+    else:
+        order = np.argsort(column.astype(str).where(column.notna(), "").to_numpy(dtype=str), kind="stable")
+
+    missing = column.isna().to_numpy()[order]
+    present, missing = order[~missing], order[missing]
+    return np.concatenate([present, missing]), np.concatenate([present[::-1], missing])
+
+
+def get_prefix_index(column):
+    keys = normalise(column).to_numpy(dtype=str)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], order
+
+
+def get_substring_index(column):
+    codes, values = pd.factorize(column)
+    return codes, normalise(pd.Series(values)).to_numpy(dtype=str)
+
+
+def normalise(column):
+    return column.astype(str).str.strip().str.lower()
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class ThresholdAnalysis:
+    """
+    Approval metrics at every candidate threshold of a model.
+
+    Customers scoring below the threshold are approved. Sorting the scores once gives, for each distinct score
+    used as a threshold, the number of approved customers and, with a cumulative sum of the labels, the number of
+    defaults among them. Every metric then follows with array arithmetic, and looking up a threshold is a binary
+    search, so moving the threshold never rescores or resorts anything.
+    """
+
+    def __init__(self, scores, labels, approved_good_profit=1.0, approved_default_loss=1.0):
+        """
+        :param scores: NumPy array of predicted default probabilities
+        :param labels: NumPy array of actual defaults, 1 for a default and 0 otherwise
+        :param approved_good_profit: profit of approving a customer who pays
+        :param approved_default_loss: loss of approving a customer who defaults
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        labels = np.asarray(labels, dtype=np.float64)
+        order = np.argsort(scores, kind="stable")
+        sorted_scores = scores[order]
+        defaults = np.concatenate([[0.0], np.cumsum(labels[order])])
+
+        # Candidate thresholds are the distinct scores, plus one approving everybody
+        thresholds, approved = np.unique(sorted_scores, return_index=True)
+        self.thresholds = np.append(thresholds, np.inf)
+        self.approved = np.append(approved, len(scores))
+        self.approved_defaults = defaults[self.approved]
+
+        self.count = len(scores)
+        self.default_count = defaults[-1]
+        rejected = self.count - self.approved
+        rejected_defaults = self.default_count - self.approved_defaults
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.approval_rate = self.approved / max(self.count, 1)
+            self.default_rate = np.where(self.approved > 0, self.approved_defaults / self.approved, 0.0)
+            # Rejecting is predicting a default, so precision and recall are those of the defaults
+            self.precision = np.where(rejected > 0, rejected_defaults / rejected, 0.0)
+            self.recall = rejected_defaults / self.default_count if self.default_count else np.zeros(len(rejected))
+        self.profit = (
+            approved_good_profit * (self.approved - self.approved_defaults)
+            - approved_default_loss * self.approved_defaults
+        )
+
+    def get_metrics(self, threshold):
+        """
+        Return the metrics of a threshold.
+
+        :param threshold: customers scoring below it are approved
+        :return: dict of metric name to value
+        """
+        i = int(np.searchsorted(self.thresholds, threshold, side="left"))
+        return {
+            "threshold": float(threshold),
+            "approved": int(self.approved[i]),
+            "approval_rate": float(self.approval_rate[i]),
+            "default_rate": float(self.default_rate[i]),
+            "precision": float(self.precision[i]),
+            "recall": float(self.recall[i]),
+            "profit": float(self.profit[i]),
+        }
+
+    def get_best_threshold(self):
+        """
+        Return the threshold with the highest expected profit.
+
+        :return: threshold as a float, 1.0 if approving everybody is the most profitable
+        """
+        i = int(np.argmax(self.profit))
+        return 1.0 if np.isinf(self.thresholds[i]) else float(self.thresholds[i])
+
+    def get_curve(self, points=101):
+        """
+        Return the metrics at evenly spaced thresholds between 0 and 1, e.g. to plot them.
+
+        :param points: number of thresholds
+        :return: list of metric dicts
+        """
+        return [self.get_metrics(threshold) for threshold in np.linspace(0, 1, points)]
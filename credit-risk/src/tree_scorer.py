@@ -0,0 +1,507 @@
+import json
+from math import factorial
+
+import numpy as np
+import pandas as pd
+
+
+class TreeEnsemble:
+    """
+    Gradient boosted trees stored as flat NumPy arrays, scored in-process without the H2O-3 JVM.
+
+    The nodes of all trees share one set of arrays (split feature, threshold, children, NA direction, categorical
+    split sets, leaf value and cover), and the trees are found through their root node indices. Rows are scored
+    and explained with path-dependent TreeSHAP vectorised over rows, matching H2O-3 predict() and
+    predict_contributions() up to floating point error.
+    """
+
+    # Explaining a leaf precomputes a table of 2^d rows for the d features of its path, deeper trees are not exported
+    max_depth = 8
+
+    def __init__(self, feature_names, domains, features, thresholds, left_children, right_children, na_left,
+                 categorical_left, values, covers, roots, init_f=0.0, link="identity", response_domain=None,
+                 threshold=0.5):
+        """
+        :param feature_names: list of feature names
+        :param domains: list of categorical levels per feature, None for numeric features
+        :param features: feature index of each node, -1 for leaves
+        :param thresholds: numeric split point of each node, rows with a smaller value go left
+        :param left_children: left child index of each node, -1 for leaves
+        :param right_children: right child index of each node, -1 for leaves
+        :param na_left: whether missing values go left at each node
+        :param categorical_left: matrix of nodes by categorical levels, True if the level goes left
+        :param values: value of each node, only used for leaves
+        :param covers: number of training rows which reached each node
+        :param roots: root node index of each tree
+        :param init_f: initial prediction of the ensemble
+        :param link: "logit" for binomial models, "identity" for regression models
+        :param response_domain: class labels of binomial models
+        :param threshold: probability threshold of the positive class label
+        """
+        self.feature_names = list(feature_names)
+        self.domains = [None if domain is None else list(domain) for domain in domains]
+        self.features = np.asarray(features, dtype=np.int64)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.left_children = np.asarray(left_children, dtype=np.int64)
+        self.right_children = np.asarray(right_children, dtype=np.int64)
+        self.na_left = np.asarray(na_left, dtype=bool)
+        self.categorical_left = np.asarray(categorical_left, dtype=bool).reshape(len(self.features), -1)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.covers = np.asarray(covers, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.init_f = float(init_f)
+        self.link = link
+        self.response_domain = response_domain
+        self.threshold = threshold
+
+        is_categorical_feature = np.array([domain is not None for domain in self.domains] + [False])
+        self.is_categorical = is_categorical_feature[self.features]
+        self._paths = None
+
+    @property
+    def node_count(self):
+        return len(self.features)
+
+    @property
+    def tree_count(self):
+        return len(self.roots)
+
+    @property
+    def depth(self):
+        """
+        Return the largest number of splits from a root to a leaf.
+        """
+        depth = 0
+        for root in self.roots:
+            stack = [(root, 0)]
+            while stack:
+                node, node_depth = stack.pop()
+                depth = max(depth, node_depth)
+                if self.features[node] >= 0:
+                    stack.append((self.left_children[node], node_depth + 1))
+                    stack.append((self.right_children[node], node_depth + 1))
+        return depth
+
+    def encode(self, df):
+        """
+        Encode a data frame into the feature matrix of the ensemble.
+
+        Categorical features become level indices of their domain, unknown levels and missing values become NaN.
+
+        :param df: Pandas DataFrame with the feature columns
+        :return: NumPy float matrix of rows by features
+        """
+        matrix = np.full((len(df), len(self.feature_names)), np.nan)
+        for i, (name, domain) in enumerate(zip(self.feature_names, self.domains)):
+            if name not in df.columns:
+                continue
+            if domain is None:
+                matrix[:, i] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+            else:
+                codes = encode_levels(df[name], domain)
+                matrix[:, i] = np.where(codes < 0, np.nan, codes)
+        return matrix
+
+    def apply(self, matrix):
+        """
+        Return the leaf each row ends up in, for every tree.
+
+        :param matrix: feature matrix returned by encode()
+        :return: NumPy int matrix of rows by trees
+        """
+        nodes = np.tile(self.roots, (len(matrix), 1))
+        active = self.features[nodes] >= 0
+        while active.any():
+            children = np.where(
+                self._go_left(matrix, nodes), self.left_children[nodes], self.right_children[nodes]
+            )
+            nodes = np.where(active, children, nodes)
+            active = self.features[nodes] >= 0
+        return nodes
+
+    def predict_raw(self, matrix):
+        return self.init_f + self.values[self.apply(matrix)].sum(axis=1)
+
+    def predict(self, matrix):
+        """
+        Return the prediction of each row, the positive class probability for binomial models.
+
+        :param matrix: feature matrix returned by encode()
+        :return: NumPy float array
+        """
+        raw = self.predict_raw(matrix)
+        if self.link == "logit":
+            return 1 / (1 + np.exp(-raw))
+        return raw
+
+    def expected_value(self):
+        """
+        Return the cover weighted average raw prediction, the bias term of the contributions.
+        """
+        leaves = np.flatnonzero(self.features < 0)
+        roots = self._get_leaf_roots()[leaves]
+        weights = np.divide(self.covers[leaves], self.covers[roots], out=np.zeros(len(leaves)),
+                            where=self.covers[roots] > 0)
+        return self.init_f + float((self.values[leaves] * weights).sum())
+
+    def predict_contributions(self, matrix, block_size=1000):
+        """
+        Return the path-dependent TreeSHAP contributions of every feature to the raw prediction of each row.
+
+        :param matrix: feature matrix returned by encode()
+        :param block_size: number of rows explained at once, bounds the memory used
+        :return: NumPy float matrix of rows by features, the bias term is given by expected_value()
+        """
+        if self._paths is None:
+            self._paths = self._build_paths()
+
+        contributions = np.zeros((len(matrix), len(self.feature_names)))
+        internal = np.flatnonzero(self.features >= 0)
+
+        for start in range(0, len(matrix), block_size):
+            block = matrix[start:start + block_size]
+            go_left = np.zeros((len(block), self.node_count), dtype=bool)
+            go_left[:, internal] = self._go_left(block, np.broadcast_to(internal, (len(block), len(internal))))
+
+            for paths in self._paths:
+                contributions[start:start + block_size] += self._explain_paths(go_left, paths)
+
+        return contributions
+
+    def score_frames(self, df):
+        """
+        Score a data frame into frames shaped like the output of H2O-3 predict() and predict_contributions().
+
+        :param df: Pandas DataFrame with the feature columns
+        :return: tuple of Pandas DataFrames (predictions, contributions)
+        """
+        matrix = self.encode(df)
+        scores = self.predict(matrix)
+
+        if self.link == "logit":
+            negative, positive = self.response_domain
+            predictions = pd.DataFrame({
+                "predict": np.where(scores >= self.threshold, positive, negative),
+                negative: 1 - scores,
+                positive: scores,
+            })
+        else:
+            predictions = pd.DataFrame({"predict": scores})
+
+        contributions = pd.DataFrame(self.predict_contributions(matrix), columns=self.feature_names)
+        contributions["BiasTerm"] = self.expected_value()
+        return predictions, contributions
+
+    def compute_covers(self, matrix):
+        """
+        Set the cover of every node to the number of rows of the matrix reaching it, usually the training rows.
+
+        :param matrix: feature matrix returned by encode()
+        """
+        nodes = np.tile(self.roots, (len(matrix), 1))
+        covers = np.bincount(nodes.ravel(), minlength=self.node_count)
+        active = self.features[nodes] >= 0
+        while active.any():
+            children = np.where(
+                self._go_left(matrix, nodes), self.left_children[nodes], self.right_children[nodes]
+            )
+            nodes = np.where(active, children, nodes)
+            covers += np.bincount(nodes[active], minlength=self.node_count)
+            active = self.features[nodes] >= 0
+
+        self.covers = covers.astype(np.float64)
+        self._paths = None
+
+    def save(self, path):
+        meta = {
+            "feature_names": self.feature_names,
+            "domains": self.domains,
+            "init_f": self.init_f,
+            "link": self.link,
+            "response_domain": self.response_domain,
+            "threshold": self.threshold,
+        }
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                meta=np.array(json.dumps(meta)),
+                features=self.features,
+                thresholds=self.thresholds,
+                left_children=self.left_children,
+                right_children=self.right_children,
+                na_left=self.na_left,
+                categorical_left=self.categorical_left,
+                values=self.values,
+                covers=self.covers,
+                roots=self.roots,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+        return cls(**meta, **arrays)
+
+    @classmethod
+    def from_h2o(cls, model, training_df):
+        """
+        Export a trained H2O-3 GBM model.
+
+        Needs a running H2O-3 cluster. H2O-3 does not expose the node covers, so they are recomputed from the
+        training data, which must be the frame the model was trained on.
+
+        :param model: trained H2OGradientBoostingEstimator, binomial or regression
+        :param training_df: Pandas DataFrame of the training frame
+        :return: TreeEnsemble
+        :raises ValueError: if the model is not binomial or regression, or its trees are deeper than max_depth
+        """
+        from h2o.tree import H2OTree
+
+        output = model._model_json["output"]
+        if output["model_category"] not in ("Binomial", "Regression"):
+            raise ValueError(f"Unsupported model category {output['model_category']}")
+
+        response = model._model_json.get("response_column_name") or output["names"][-1]
+        columns = [
+            (name, domain) for name, domain in zip(output["names"], output["domains"]) if name != response
+        ]
+        feature_names = [name for name, _ in columns]
+        domains = [domain for _, domain in columns]
+        level_count = max([len(domain) for domain in domains if domain] + [1])
+        tree_count = int(output["model_summary"]["number_of_trees"][0])
+
+        nodes = []
+        roots = []
+        for tree_number in range(tree_count):
+            tree = H2OTree(model=model, tree_number=tree_number, tree_class=None)
+            offset = len(nodes)
+            roots.append(offset)
+
+            for i, left in enumerate(tree.left_children):
+                right = tree.right_children[i]
+                if left < 0:
+                    nodes.append((-1, np.nan, -1, -1, None, None, tree.predictions[i]))
+                    continue
+
+                feature = feature_names.index(tree.features[i])
+                categorical_left = None
+                if domains[feature] is not None:
+                    categorical_left = get_categorical_left(
+                        domains[feature], level_count, tree.levels[left], tree.levels[right]
+                    )
+                na = tree.nas[i]
+                na_left = None if na is None else str(na).upper().startswith("L")
+                nodes.append((
+                    feature, tree.thresholds[i], offset + left, offset + right, na_left, categorical_left,
+                    tree.predictions[i],
+                ))
+
+        unknown_na = np.array([node[0] >= 0 and node[4] is None for node in nodes])
+        ensemble = cls(
+            feature_names=feature_names,
+            domains=domains,
+            features=[node[0] for node in nodes],
+            thresholds=[np.nan if node[1] is None else node[1] for node in nodes],
+            left_children=[node[2] for node in nodes],
+            right_children=[node[3] for node in nodes],
+            na_left=[bool(node[4]) for node in nodes],
+            categorical_left=[
+                np.zeros(level_count, dtype=bool) if node[5] is None else node[5] for node in nodes
+            ],
+            values=[node[6] for node in nodes],
+            covers=np.zeros(len(nodes)),
+            roots=roots,
+            init_f=output.get("init_f") or 0.0,
+            link="logit" if output["model_category"] == "Binomial" else "identity",
+            response_domain=output["domains"][output["names"].index(response)],
+            threshold=output.get("default_threshold") or 0.5,
+        )
+
+        if ensemble.depth > cls.max_depth:
+            raise ValueError(f"Trees of depth {ensemble.depth} are deeper than {cls.max_depth}")
+
+        ensemble.compute_covers(ensemble.encode(training_df))
+        # Splits which never saw a missing value send them to the child most training rows went to
+        unknown_na = np.flatnonzero(unknown_na)
+        ensemble.na_left[unknown_na] = (
+            ensemble.covers[ensemble.left_children[unknown_na]] >= ensemble.covers[ensemble.right_children[unknown_na]]
+        )
+        return ensemble
+
+    def _go_left(self, matrix, nodes):
+        rows = np.arange(len(matrix))[:, None]
+        x = matrix[rows, np.maximum(self.features[nodes], 0)]
+        missing = np.isnan(x)
+
+        codes = np.clip(np.where(missing, 0, x), 0, self.categorical_left.shape[1] - 1).astype(np.int64)
+        go_left = np.where(
+            self.is_categorical[nodes], self.categorical_left[nodes, codes], x < self.thresholds[nodes]
+        )
+        return np.where(missing, self.na_left[nodes], go_left)
+
+    def _get_leaf_roots(self):
+        node_roots = np.zeros(self.node_count, dtype=np.int64)
+        for root in self.roots:
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                node_roots[node] = root
+                if self.features[node] >= 0:
+                    stack.extend((self.left_children[node], self.right_children[node]))
+        return node_roots
+
+    def _build_paths(self):
+        """
+        Collect the root to leaf paths of all trees, grouped by their number of unique features.
+
+        For every leaf the unique features of its path get a zero fraction, the share of training rows following
+        the path through the splits on that feature, and the splits are kept to compute the one fractions per row.
+        """
+        leaves = {}
+        for root in self.roots:
+            stack = [(root, [])]
+            while stack:
+                node, path = stack.pop()
+                if self.features[node] >= 0:
+                    stack.append((self.left_children[node], path + [(node, True)]))
+                    stack.append((self.right_children[node], path + [(node, False)]))
+                    continue
+
+                slots = {}
+                zero_fractions = []
+                splits = []
+                for parent, went_left in path:
+                    child = self.left_children[parent] if went_left else self.right_children[parent]
+                    fraction = self.covers[child] / self.covers[parent] if self.covers[parent] > 0 else 0.0
+                    slot = slots.setdefault(self.features[parent], len(slots))
+                    if slot == len(zero_fractions):
+                        zero_fractions.append(1.0)
+                    zero_fractions[slot] *= fraction
+                    splits.append((slot, parent, went_left))
+
+                if slots:
+                    leaves.setdefault(len(slots), []).append(
+                        (self.values[node], list(slots), zero_fractions, splits)
+                    )
+
+        paths = []
+        for depth, group in sorted(leaves.items()):
+            split_count = max(len(splits) for _, _, _, splits in group)
+            # Pad shorter paths with splits which can never fail
+            split_bits = np.zeros((len(group), split_count), dtype=np.int64)
+            split_nodes = np.zeros((len(group), split_count), dtype=np.int64)
+            split_left = np.zeros((len(group), split_count), dtype=bool)
+            for i, (_, _, _, splits) in enumerate(group):
+                for j, (slot, node, went_left) in enumerate(splits):
+                    split_bits[i, j] = 1 << slot
+                    split_nodes[i, j] = node
+                    split_left[i, j] = went_left
+
+            features = np.array([features for _, features, _, _ in group])
+            feature_map = np.zeros((len(group) * depth, len(self.feature_names)))
+            feature_map[np.arange(len(group) * depth), features.ravel()] = 1
+
+            # The one fractions of a row are 0 or 1, so the contributions of a leaf only depend on which of its
+            # path features the row follows. Precompute them for all 2^depth patterns.
+            patterns = np.arange(1 << depth)
+            one = ((patterns[:, None] >> np.arange(depth)) & 1).astype(np.float64)
+            one = np.broadcast_to(one[:, None, :], (len(patterns), len(group), depth))
+            zero = np.array([zero_fractions for _, _, zero_fractions, _ in group])
+            values = np.array([value for value, _, _, _ in group])
+            table = get_shapley_values(one, zero) * values[None, :, None]
+
+            paths.append({
+                "depth": depth,
+                "table": np.ascontiguousarray(table.transpose(1, 0, 2)),
+                "feature_map": feature_map,
+                "split_bits": split_bits,
+                "split_nodes": split_nodes,
+                "split_left": split_left,
+            })
+        return paths
+
+    @staticmethod
+    def _explain_paths(go_left, paths):
+        row_count = len(go_left)
+        leaf_count = len(paths["table"])
+
+        # Bit pattern of the path features each row follows, a feature fails if any of its splits is not followed
+        followed = go_left[:, paths["split_nodes"]] == paths["split_left"]
+        failed = np.bitwise_or.reduce(np.where(followed, 0, paths["split_bits"]), axis=2)
+        pattern = ((1 << paths["depth"]) - 1) ^ failed
+
+        phi = paths["table"][np.arange(leaf_count), pattern]
+        return phi.reshape(row_count, -1) @ paths["feature_map"]
+
+
+def get_shapley_values(one, zero):
+    """
+    Return the Shapley values of the unique features of leaf paths, as in path-dependent TreeSHAP.
+
+    For a path with d unique features, feature i gets the sum over subsets S of the other features of
+    |S|! (d - |S| - 1)! / d! * (one_i - zero_i) * product of one_j over S * product of zero_j outside of S.
+
+    :param one: array of (..., leaves, d) one fractions, 1 if the row follows the path splits on the feature
+    :param zero: array of (leaves, d) zero fractions, the share of covers following the path splits on the feature
+    :return: array shaped like one, the values still have to be multiplied by the leaf values
+    """
+    depth = one.shape[-1]
+    weights = np.array([factorial(k) * factorial(depth - k - 1) / factorial(depth) for k in range(depth)])
+
+    phi = np.empty(one.shape)
+    for i in range(depth):
+        # Coefficients of the polynomial product of (zero_j + one_j * t) over the other features j
+        coefficients = np.zeros(one.shape)
+        coefficients[..., 0] = 1
+        for j in range(depth):
+            if j == i:
+                continue
+            shifted = coefficients[..., :-1] * one[..., j, None]
+            coefficients *= zero[:, j, None]
+            coefficients[..., 1:] += shifted
+        phi[..., i] = (coefficients @ weights) * (one[..., i] - zero[:, i])
+    return phi
+
+
+def encode_levels(column, domain):
+    """
+    Return the index of each value in the categorical domain, -1 for missing values and unknown levels.
+
+    :param column: Pandas Series
+    :param domain: list of categorical levels
+    :return: NumPy int array
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        # Levels which are not numbers never match, e.g. any level for a chunk whose values are all missing
+        levels = pd.to_numeric(pd.Series(domain), errors="coerce").dropna().drop_duplicates()
+        positions = np.append(levels.index.to_numpy(), -1)
+        return positions[pd.Index(levels).get_indexer(column)]
+
+    # CSV files often pad categorical values with spaces, match them ignoring the padding
+    levels = pd.Index([str(level).strip() for level in domain])
+    codes = levels.get_indexer(column.astype(str).str.strip())
+    codes[column.isna().to_numpy()] = -1
+    return codes
+
+
+def get_categorical_left(domain, level_count, left_levels, right_levels):
+    """
+    Return which levels of a categorical split go left.
+
+    :param domain: list of categorical levels of the split feature
+    :param level_count: width of the returned mask
+    :param left_levels: levels going to the left child, as names or indices, or None
+    :param right_levels: levels going to the right child, as names or indices, or None
+    :return: NumPy bool array
+    """
+    def to_indices(levels):
+        return [level if isinstance(level, (int, np.integer)) else domain.index(level) for level in levels]
+
+    categorical_left = np.zeros(level_count, dtype=bool)
+    if left_levels is not None:
+        categorical_left[to_indices(left_levels)] = True
+    elif right_levels is not None:
+        categorical_left[:len(domain)] = True
+        categorical_left[to_indices(right_levels)] = False
+    return categorical_left
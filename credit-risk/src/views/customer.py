@@ -1,14 +1,16 @@
-from h2o_wave import Q, ui
+import numpy as np
+from h2o_wave import Q, ui, data
 
 from .header import render_header
-from ..config import config, predictor
+from .queue import get_review_queue
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+from ..partial_dependence import is_numeric
 from ..plots import get_image_from_matplotlib
-from ..utils import add_column_to_df, drop_column_from_df, round_df_column
 
 
 def init(q: Q):
-    q.page.drop()
-    q.page['meta'] = ui.meta_card(box='', layouts=[
+    render_layout(q, ui.meta_card(box='', layouts=[
         ui.layout(
             breakpoint='xs',
             zones=[
@@ -17,6 +19,9 @@ def init(q: Q):
                 ui.zone('risk_table_selected', size='400px'),
                 ui.zone('risk_explanation', size='150px'),
                 ui.zone('shap_plot', size='600px'),
+                ui.zone('what_if_controls', size='400px'),
+                ui.zone('what_if_plot', size='400px'),
+                ui.zone('what_if_summary', size='200px'),
                 ui.zone('button_group', size='80px'),
             ]
         ),
@@ -29,11 +34,16 @@ def init(q: Q):
                     ui.zone('menu'),
                     ui.zone('button_group', size='200px'),
                 ]),
-                ui.zone('body', size='900px', direction=ui.ZoneDirection.ROW, zones=[
+                ui.zone('body', size='1300px', direction=ui.ZoneDirection.ROW, zones=[
                     ui.zone('risk_table_selected', size='400px'),
                     ui.zone('pane', direction=ui.ZoneDirection.COLUMN, zones=[
                         ui.zone('risk_explanation', size='150px'),
                         ui.zone('shap_plot'),
+                        ui.zone('what_if', size='400px', direction=ui.ZoneDirection.ROW, zones=[
+                            ui.zone('what_if_controls', size='400px'),
+                            ui.zone('what_if_plot'),
+                            ui.zone('what_if_summary', size='400px'),
+                        ]),
                     ])
                 ]),
             ]
@@ -47,16 +57,21 @@ def init(q: Q):
                     ui.zone('menu'),
                     ui.zone('button_group', size='200px'),
                 ]),
-                ui.zone('body', size='1200px', direction=ui.ZoneDirection.ROW, zones=[
+                ui.zone('body', size='1600px', direction=ui.ZoneDirection.ROW, zones=[
                     ui.zone('risk_table_selected', size='400px'),
                     ui.zone('pane', direction=ui.ZoneDirection.COLUMN, zones=[
                         ui.zone('risk_explanation', size='150px'),
                         ui.zone('shap_plot'),
+                        ui.zone('what_if', size='400px', direction=ui.ZoneDirection.ROW, zones=[
+                            ui.zone('what_if_controls', size='400px'),
+                            ui.zone('what_if_plot'),
+                            ui.zone('what_if_summary', size='400px'),
+                        ]),
                     ])
                 ]),
             ]
         )
-    ])
+    ]))
 
     render_header(q)
 
@@ -71,24 +86,14 @@ def get_customer_status(q):
     return status
 
 
-def get_transformed_df_rows(q: Q, df):
-    df_transformed = df.transpose()
+def get_record_rows(q: Q, record):
+    cells = [[column, str(value)] for column, value in record['features'].items()]
+    cells += [['Default Prediction Rate', str(round(record['score'], 4))], ['Status', get_customer_status(q)]]
+    return [ui.table_row(name=name, cells=[name, value]) for name, value in cells]
 
-    rows = [
-        ui.table_row(
-            name=index,
-            cells=[str(index)] + [str(row[column]) for column in df_transformed.columns]
-        )
-        for index, row in df_transformed.iterrows()
-    ]
-    rows += [ui.table_row(
-        name='approved',
-        cells=['Status'] + [get_customer_status(q)])]
-    return rows
 
-
-def render_customer_details_table(q: Q, df, row):
-    q.page.add('risk_table_row', ui.form_card(
+def render_customer_details_table(q: Q, record):
+    render_card(q, 'risk_table_row', ui.form_card(
         box='risk_table_selected',
         items=[
             ui.table(
@@ -97,24 +102,25 @@ def render_customer_details_table(q: Q, df, row):
                     ui.table_column(name="attribute", label="Attribute", sortable=False, searchable=False, max_width='100'),
                     ui.table_column(name="value", label="Value", sortable=False, searchable=False, max_width='100')
                 ],
-                rows=get_transformed_df_rows(q, df.loc[[row]]),
+                rows=get_record_rows(q, record),
                 groupable=False,
                 resettable=False,
                 multiple=False,
                 height='100%'
             )
-        ])
-   )
+        ]
+    ))
 
 
-def render_customer_summary(q: Q, training_df, contributions_df, row, can_approve):
-    top_feature = \
-        contributions_df.idxmin(axis=1)[row] if can_approve else contributions_df.idxmax(axis=1)[row]
+def render_customer_summary(q: Q, record, can_approve):
+    # Contributions are ordered from the most positive, i.e. the strongest reason to default, to the most negative
+    contributions = record['contributions']
+    top_feature = contributions[-1][0] if can_approve else contributions[0][0]
 
     explanation_data = {
         'will_or_will_not': 'will' if can_approve else 'will not',
         'top_contributing_feature': top_feature,
-        'value_of_top_contributing_feature': str(training_df.loc[row][top_feature]),
+        'value_of_top_contributing_feature': str(record['features'].get(top_feature)),
         'accept_or_reject': 'approve' if can_approve else 'reject',
     }
 
@@ -124,54 +130,164 @@ def render_customer_summary(q: Q, training_df, contributions_df, row, can_approv
 - It's a good idea to **{{accept_or_reject}}** this customer. 
 '''
 
-    q.page["risk_explanation"] = ui.markdown_card(
+    render_card(q, 'risk_explanation', ui.markdown_card(
         box='risk_explanation',
         title='Summary on Customer',
         content='=' + explanation,
         data=explanation_data,
-    )
+    ))
 
 
 def handle_approve_click(q: Q):
     customer_status = q.app.customer_status
     customer_status[q.client.selected_customer_id] = 'BoxCheckmarkSolid'
+    get_review_queue(q).decide([q.client.selected_customer_row], 'BoxCheckmarkSolid')
 
 
 def handle_reject_click(q: Q):
     customer_status = q.app.customer_status
     customer_status[q.client.selected_customer_id] = 'BoxMultiplySolid'
+    get_review_queue(q).decide([q.client.selected_customer_row], 'BoxMultiplySolid')
+
+
+def get_what_if_features(predictor):
+    # Only numeric features can be moved with a slider
+    return [name for name in predictor.scored.feature_names if is_numeric(predictor.what_if.df[name])]
+
+
+def get_slider(name, label, grid, value):
+    grid = np.asarray(grid, dtype=np.float64)
+    step = float(np.diff(grid).min()) if len(grid) > 1 else 1.0
+    return ui.slider(name=name, label=label, min=float(grid[0]), max=float(grid[-1]), step=step, value=float(value),
+                     trigger=True)
+
+
+def get_what_if_changes(q: Q):
+    if q.client.what_if_other in (None, 'none'):
+        return {}
+    return {q.client.what_if_other: q.client.what_if_other_value}
+
+
+def reset_what_if(q: Q, record, feature):
+    """
+    Start the what-if simulation of a customer over a feature from the actual values of the customer.
+    """
+    q.client.what_if_feature = feature
+    q.client.what_if_value = record['features'][feature]
+    q.client.what_if_other = 'none'
+    q.client.what_if_other_value = None
+
+
+def render_what_if(q: Q, predictor, record):
+    what_if = predictor.what_if
+    features = get_what_if_features(predictor)
+    row = q.client.selected_customer_row
+    feature = q.client.what_if_feature
+    changes = get_what_if_changes(q)
+
+    # One batched scoring call per customer, feature and other changes, slider moves are served from the cache
+    grid, scored = what_if.simulate(row, feature, changes=changes)
+    variant = what_if.get_variant(row, feature, q.client.what_if_value, changes)
+
+    items = [
+        ui.dropdown(
+            name='what_if_feature',
+            label='What if',
+            value=feature,
+            choices=[ui.choice(name=name, label=name) for name in features],
+            trigger=True,
+        ),
+        get_slider('what_if_value', f'{feature} was', grid, variant['value']),
+        ui.dropdown(
+            name='what_if_other',
+            label='And',
+            value=q.client.what_if_other,
+            choices=[ui.choice(name='none', label='Nothing else')] + [
+                ui.choice(name=name, label=name) for name in features if name != feature
+            ],
+            trigger=True,
+        ),
+    ]
+    if changes:
+        other = q.client.what_if_other
+        items.append(get_slider('what_if_other_value', f'{other} was', what_if.get_grid(other),
+                                q.client.what_if_other_value))
+    render_card(q, 'what_if_controls', ui.form_card(box='what_if_controls', items=items))
+
+    render_card(q, 'what_if_plot', ui.plot_card(
+        box='what_if_plot',
+        title=f'Default prediction rate by {feature}',
+        data=data('value score', rows=[(float(value), score) for value, score in zip(grid, scored.scores.tolist())]),
+        plot=ui.plot([
+            ui.mark(type='line', x='=value', y='=score', x_title=feature, y_title='Default Prediction Rate'),
+            ui.mark(x=float(variant['value']), y=variant['score'], type='point', size=8, fill_color='#7f0000'),
+        ]),
+    ))
+
+    reasons = '\n'.join(
+        f'- {name}: {contribution:+.4f}' for name, contribution in variant['contributions'][:3]
+    )
+    render_card(q, 'what_if_summary', ui.markdown_card(
+        box='what_if_summary',
+        title='What-if Result',
+        content=f"Default prediction rate **{record['score']:.4f}** now, **{variant['score']:.4f}** with "
+                f"{feature} = {variant['value']}.\n\nTop reasons to default:\n{reasons}",
+    ))
+
+
+def handle_what_if_change(q: Q):
+    """
+    Show another what-if variant of the selected customer.
+    """
+    predictor = model_manager.predictor
+    record = predictor.get_customer_record(q.client.selected_customer_row)
+    if q.args.what_if_feature is not None and q.args.what_if_feature != q.client.what_if_feature:
+        reset_what_if(q, record, q.args.what_if_feature)
+    elif q.args.what_if_other is not None and q.args.what_if_other != q.client.what_if_other:
+        q.client.what_if_other = q.args.what_if_other
+        q.client.what_if_other_value = record['features'].get(q.args.what_if_other)
+    else:
+        if q.args.what_if_value is not None:
+            q.client.what_if_value = q.args.what_if_value
+        if q.args.what_if_other_value is not None:
+            # Snapped to the grid, so that the simulations of nearby slider positions are shared
+            q.client.what_if_other_value = predictor.what_if.get_nearest(q.client.what_if_other,
+                                                                         q.args.what_if_other_value)
+
+    render_what_if(q, predictor, record)
 
 
 def render_customer_page(q: Q):
     init(q)
 
-    selected_row = q.args.risk_table[0]
-    training_df = predictor.get_testing_data_as_pd_frame()
-    predictions_df = predictor.predicted_df.as_data_frame()
-    contributions_df = predictor.contributions_df.as_data_frame()
-    del contributions_df['BiasTerm']
-
-    q.client.selected_customer_id = training_df.loc[selected_row]["ID"]
-    score = predictions_df.loc[selected_row]["predict"]
-    approve = bool(score < config.approval_threshold)
+    # Render the whole page from one predictor, even if a rebuilt one is swapped in meanwhile
+    predictor = model_manager.predictor
+    selected_row = int(q.args.risk_table[0])
+    record = predictor.get_customer_record(selected_row)
 
-    drop_column_from_df(training_df, 'default.payment.next.month')
-    add_column_to_df(training_df, predictions_df, 'Default Prediction Rate', 'predict')
-    training_df = round_df_column(training_df, 'Default Prediction Rate', 4)
+    q.client.selected_customer_id = record['features'][config.id_column]
+    q.client.selected_customer_row = selected_row
+    approve = bool(record['score'] < q.app.approval_threshold)
 
-    render_customer_details_table(q, training_df, selected_row)
+    render_customer_details_table(q, record)
 
     shap_plot = predictor.get_shap_explanation(selected_row)
-    q.page["shap_plot"] = ui.image_card(
+    render_card(q, 'shap_plot', ui.image_card(
         box='shap_plot',
         title="Effectiveness of each attribute on defaulting next payment",
         type="png",
         image=get_image_from_matplotlib(shap_plot, dpi=85),
-    )
+    ))
+
+    render_customer_summary(q, record, approve)
 
-    render_customer_summary(q, training_df, contributions_df, selected_row, approve)
+    # The what-if simulation starts on the strongest reason to default of the customer
+    features = get_what_if_features(predictor)
+    reasons = [name for name, _ in record['contributions'] if name in features]
+    reset_what_if(q, record, reasons[0] if reasons else features[0])
+    render_what_if(q, predictor, record)
 
-    q.page["buttons"] = ui.form_card(
+    render_card(q, 'buttons', ui.form_card(
         box='button_group',
         items=[
             ui.buttons([
@@ -179,4 +295,4 @@ def render_customer_page(q: Q):
                 ui.button(name='approve_btn', label='Approve', primary=approve),
             ])
         ]
-    )
+    ))
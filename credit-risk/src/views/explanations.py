@@ -0,0 +1,182 @@
+from h2o_wave import Q, ui, data
+
+from .header import render_header
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+
+
+def init(q: Q):
+    render_layout(q, ui.meta_card(box='', layouts=[
+        ui.layout(
+            breakpoint='xs',
+            zones=[
+                ui.zone('title', size='80px'),
+                ui.zone('menu', size='80px'),
+                ui.zone('feature_importance', size='500px'),
+                ui.zone('contribution_distribution', size='500px'),
+                ui.zone('band_reasons', size='400px'),
+                ui.zone('reason_customers', size='600px'),
+            ]
+        ),
+        ui.layout(
+            breakpoint='m',
+            width='1920px',
+            zones=[
+                ui.zone('header', size='80px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('title', size='400px'),
+                    ui.zone('menu'),
+                ]),
+                ui.zone('plots', size='500px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('feature_importance'),
+                    ui.zone('contribution_distribution'),
+                ]),
+                ui.zone('reasons', size='600px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('band_reasons'),
+                    ui.zone('reason_customers'),
+                ]),
+            ]
+        )
+    ]))
+
+    render_header(q)
+
+
+def get_global_explanation(q: Q):
+    # Computed once per predictor over all customers, the page and the drill-down only read it
+    predictor = model_manager.predictor
+    if q.app.global_explanation is None or q.app.global_explanation_predictor is not predictor:
+        q.app.global_explanation = predictor.get_global_explanation(
+            config.explanation_band_edges, config.explanation_top_reasons
+        )
+        q.app.global_explanation_predictor = predictor
+    return q.app.global_explanation
+
+
+def render_feature_importance(q: Q, explanation):
+    render_card(q, 'feature_importance', ui.plot_card(
+        box='feature_importance',
+        title='Mean absolute contribution to the default prediction',
+        data=data('feature importance', rows=explanation.get_feature_importance()),
+        plot=ui.plot([ui.mark(type='interval', x='=importance', y='=feature', y_title='')]),
+    ))
+
+
+def render_contribution_distribution(q: Q, explanation):
+    rows = [
+        (distribution['feature'], distribution['q5'], distribution['q95'], distribution['q25'], distribution['q75'],
+         distribution['q50'])
+        for distribution in explanation.get_contribution_distributions()
+    ]
+    render_card(q, 'contribution_distribution', ui.plot_card(
+        box='contribution_distribution',
+        title='Contributions of each feature, 5th to 95th and 25th to 75th percentiles and median',
+        data=data('feature low high lower_quartile upper_quartile median', rows=rows),
+        plot=ui.plot([
+            ui.mark(type='interval', x='=feature', y0='=low', y1='=high', color='#d8d8d8', x_title=''),
+            ui.mark(type='interval', x='=feature', y0='=lower_quartile', y1='=upper_quartile', color='#7f0000'),
+            ui.mark(type='point', x='=feature', y='=median', color='#000000', y_title='Contribution'),
+        ]),
+    ))
+
+
+def render_band_reasons(q: Q, explanation):
+    rows = []
+    for band in explanation.get_top_reasons_by_band():
+        reasons = ', '.join(f'{feature} ({share:.0%})' for feature, share in band['reasons'])
+        rows.append(ui.table_row(name=str(band['band']), cells=[band['label'], str(band['count']), reasons]))
+
+    render_card(q, 'band_reasons', ui.form_card(
+        box='band_reasons',
+        items=[
+            ui.text('Top reasons to default of each score band'),
+            ui.table(
+                name='band_reasons_table',
+                columns=[
+                    ui.table_column(name='band', label='Default Prediction Rate', max_width='200'),
+                    ui.table_column(name='count', label='Customers', max_width='100'),
+                    ui.table_column(name='reasons', label='Top Reasons'),
+                ],
+                rows=rows,
+                height='90%',
+            ),
+        ]
+    ))
+
+
+def get_reason_customer_rows(q: Q, explanation):
+    band = None if q.client.reason_band in (None, 'all') else int(q.client.reason_band)
+    rows = explanation.get_customers(q.client.reason_feature, band)
+    predictor = model_manager.predictor
+    ids = predictor.columns[config.id_column]
+    table_rows = [
+        ui.table_row(name=str(row), cells=[str(ids[row]), f'{explanation.scores[row]:.4f}'])
+        for row in rows[:config.page_size]
+    ]
+    return table_rows, len(rows)
+
+
+def get_reason_customer_summary(q: Q, count):
+    return f'{count} customers, showing the {min(count, config.page_size)} with the highest default prediction rate'
+
+
+def render_reason_customers(q: Q, explanation):
+    if q.client.reason_feature is None:
+        q.client.reason_feature = explanation.feature_names[explanation.feature_order[0]]
+        q.client.reason_band = 'all'
+
+    rows, count = get_reason_customer_rows(q, explanation)
+    render_card(q, 'reason_customers', ui.form_card(
+        box='reason_customers',
+        items=[
+            ui.dropdown(
+                name='reason_feature',
+                label='Customers whose top reason to default is',
+                value=q.client.reason_feature,
+                choices=[ui.choice(name=feature, label=feature) for feature, _ in explanation.get_feature_importance()],
+                trigger=True,
+            ),
+            ui.dropdown(
+                name='reason_band',
+                label='Default prediction rate',
+                value=q.client.reason_band,
+                choices=[ui.choice(name='all', label='All')] + [
+                    ui.choice(name=str(band), label=explanation.get_band_label(band))
+                    for band in range(len(explanation.band_sizes))
+                ],
+                trigger=True,
+            ),
+            ui.text(get_reason_customer_summary(q, count)),
+            # Named like the home table, so double clicking a customer opens the customer page
+            ui.table(
+                name='risk_table',
+                columns=[
+                    ui.table_column(name='ID', label='ID'),
+                    ui.table_column(name='score', label='Default Prediction Rate'),
+                ],
+                rows=rows,
+                multiple=False,
+                height='70%',
+            ),
+        ]
+    ))
+
+
+def render_explanations_page(q: Q):
+    init(q)
+    explanation = get_global_explanation(q)
+    render_feature_importance(q, explanation)
+    render_contribution_distribution(q, explanation)
+    render_band_reasons(q, explanation)
+    render_reason_customers(q, explanation)
+
+
+def handle_reason_change(q: Q):
+    """
+    Drill down into the customers of another reason or band, only the changed summary and rows are sent.
+    """
+    if q.args.reason_feature is not None:
+        q.client.reason_feature = q.args.reason_feature
+    if q.args.reason_band is not None:
+        q.client.reason_band = q.args.reason_band
+
+    render_reason_customers(q, get_global_explanation(q))
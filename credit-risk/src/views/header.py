@@ -1,20 +1,24 @@
 from h2o_wave import ui, Q
 
 from ..config import config
+from ..page_state import render_card
 
 
 def render_header(q: Q):
-    q.page["title"] = ui.header_card(
+    render_card(q, 'title', ui.header_card(
         box='title',
         title=config.title,
         subtitle=config.subtitle,
         icon=config.icon,
         icon_color=config.icon_color,
-    )
+    ))
 
-    q.page["menu"] = ui.breadcrumbs_card(
+    render_card(q, 'menu', ui.breadcrumbs_card(
         box='menu',
         items=[
             ui.breadcrumb(name='home', label='Home'),
+            ui.breadcrumb(name='queue', label='Review Queue'),
+            ui.breadcrumb(name='thresholds', label='Approval Threshold'),
+            ui.breadcrumb(name='explanations', label='Global Explanation'),
         ],
-    )
+    ))
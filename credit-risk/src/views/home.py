@@ -1,13 +1,13 @@
 from h2o_wave import Q, ui
 
 from .header import render_header
-from ..config import predictor
-from ..utils import add_column_to_df, drop_column_from_df, round_df_column
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+from ..table_pager import TablePager
 
 
 def init(q: Q):
-    q.page.drop()
-    q.page['meta'] = ui.meta_card(box='', layouts=[
+    render_layout(q, ui.meta_card(box='', layouts=[
         ui.layout(
             breakpoint='xs',
             zones=[
@@ -27,14 +27,15 @@ def init(q: Q):
                 ui.zone('risk_table'),
             ]
         )
-    ])
+    ]))
 
     render_header(q)
 
 
-def get_column_headers_for_df(df, searchable):
+def get_column_headers_for_df(df):
+    # Sorting and searching happen on the server over all customers, not in the browser over one page
     columns = [
-        ui.table_column(name=column, label=column, sortable=True, searchable=searchable, max_width='300')
+        ui.table_column(name=column, label=column, sortable=False, searchable=False, max_width='300')
         for column in df.columns
     ]
     columns += [ui.table_column(name='status', label='Status', cell_type=ui.icon_table_cell_type())]
@@ -43,7 +44,6 @@ def get_column_headers_for_df(df, searchable):
 
 
 def get_rows(q: Q, df):
-    df = df.head(20)
     rows = [
         ui.table_row(
             name=index,
@@ -54,26 +54,93 @@ def get_rows(q: Q, df):
     return rows
 
 
+def get_pager(q: Q, predictor):
+    # Build the pager again when a rebuilt predictor has been swapped in
+    scored_table = predictor.get_scored_table()
+    if q.app.risk_table_pager is None or q.app.risk_table_pager.df is not scored_table:
+        q.app.risk_table_pager = TablePager(
+            scored_table, prefix_columns=[config.id_column], substring_columns=config.search_columns
+        )
+    return q.app.risk_table_pager
+
+
+def update_table_state(q: Q):
+    """
+    Update the search, sort and page of the risk table of the client from the submitted arguments.
+
+    The page goes back to the first one whenever the search or the sort changes.
+    """
+    if q.client.risk_table_page is None:
+        q.client.risk_table_page = 0
+        q.client.risk_table_search = ''
+        q.client.risk_table_sort = config.default_sort_column
+        q.client.risk_table_descending = True
+
+    if q.args.risk_table_search is not None and q.args.risk_table_search != q.client.risk_table_search:
+        q.client.risk_table_search = q.args.risk_table_search
+        q.client.risk_table_page = 0
+    if q.args.risk_table_sort is not None and q.args.risk_table_sort != q.client.risk_table_sort:
+        q.client.risk_table_sort = q.args.risk_table_sort
+        q.client.risk_table_page = 0
+    if q.args.risk_table_descending is not None and q.args.risk_table_descending != q.client.risk_table_descending:
+        q.client.risk_table_descending = q.args.risk_table_descending
+        q.client.risk_table_page = 0
+
+    if q.args.next_page:
+        q.client.risk_table_page += 1
+    elif q.args.previous_page:
+        q.client.risk_table_page -= 1
+
+
 def render_home(q: Q):
     init(q)
+    update_table_state(q)
 
-    df = predictor.get_testing_data_as_pd_frame()
-    predicted_df = predictor.get_predict_data_as_pd_frame()
-    drop_column_from_df(df, 'default.payment.next.month')
-    add_column_to_df(df, predicted_df, 'Default Prediction Rate', 'predict')
-    df = round_df_column(df, 'Default Prediction Rate', 4)
+    pager = get_pager(q, model_manager.predictor)
+    df, row_count, page = pager.get_page(
+        q.client.risk_table_page,
+        config.page_size,
+        q.client.risk_table_sort,
+        q.client.risk_table_descending,
+        q.client.risk_table_search,
+    )
+    q.client.risk_table_page = page
+    page_count = max(1, -(-row_count // config.page_size))
 
-    q.page["risk_table"] = ui.form_card(
+    render_card(q, 'risk_table', ui.form_card(
         box='risk_table',
         items=[
             ui.message_bar(text='Double click to review a customer', type='info'),
+            ui.textbox(
+                name='risk_table_search',
+                label=f'Search by {config.id_column} prefix or {", ".join(config.search_columns)}',
+                value=q.client.risk_table_search,
+                trigger=True,
+            ),
+            ui.dropdown(
+                name='risk_table_sort',
+                label='Sort by',
+                value=q.client.risk_table_sort,
+                choices=[ui.choice(name=column, label=column) for column in df.columns],
+                trigger=True,
+            ),
+            ui.toggle(
+                name='risk_table_descending',
+                label='Descending',
+                value=q.client.risk_table_descending,
+                trigger=True,
+            ),
             ui.table(
                 name='risk_table',
-                columns=get_column_headers_for_df(df, True),
+                columns=get_column_headers_for_df(df),
                 rows=get_rows(q, df),
-                groupable=True,
                 multiple=False,
                 height="90%"
-            )
+            ),
+            ui.buttons([
+                ui.button(name='previous_page', label='Previous', disabled=page == 0),
+                ui.button(name='next_page', label='Next', disabled=page >= page_count - 1),
+            ]),
+            ui.text(f'Page {page + 1} of {page_count}, {row_count} customers'),
         ]
-    )
+    ))
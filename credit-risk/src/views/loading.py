@@ -0,0 +1,54 @@
+import asyncio
+
+from h2o_wave import Q, ui
+
+from .header import render_header
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+
+
+def init(q: Q):
+    render_layout(q, ui.meta_card(box='', layouts=[
+        ui.layout(
+            breakpoint='xs',
+            zones=[
+                ui.zone('title', size='80px'),
+                ui.zone('menu', size='80px'),
+                ui.zone('loading'),
+            ]
+        ),
+        ui.layout(
+            breakpoint='m',
+            width='1920px',
+            zones=[
+                ui.zone('header', size='80px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('title', size='400px'),
+                    ui.zone('menu'),
+                ]),
+                ui.zone('loading'),
+            ]
+        )
+    ]))
+
+    render_header(q)
+
+
+def get_loading_items():
+    if model_manager.state == model_manager.failed:
+        return [ui.message_bar(text=f'Loading the model failed: {model_manager.error}', type='error')]
+    return [ui.progress(label='Loading the credit risk model', caption=model_manager.message,
+                        value=model_manager.progress)]
+
+
+async def render_loading_page(q: Q):
+    """
+    Show the progress of the model manager until the predictor is ready or fails to build.
+    """
+    init(q)
+    render_card(q, 'loading', ui.form_card(box='loading', items=get_loading_items()))
+    await q.page.save()
+
+    while model_manager.state == model_manager.loading and not model_manager.is_ready():
+        await asyncio.sleep(config.loading_refresh_seconds)
+        render_card(q, 'loading', ui.form_card(box='loading', items=get_loading_items()))
+        await q.page.save()
@@ -0,0 +1,173 @@
+from h2o_wave import Q, ui
+
+from .header import render_header
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+from ..review_queue import ReviewQueue
+
+queue_actions = {
+    'approve_selected': 'BoxCheckmarkSolid',
+    'reject_selected': 'BoxMultiplySolid',
+    'approve_page': 'BoxCheckmarkSolid',
+    'reject_page': 'BoxMultiplySolid',
+    'approve_band': 'BoxCheckmarkSolid',
+    'reject_band': 'BoxMultiplySolid',
+}
+
+
+def init(q: Q):
+    render_layout(q, ui.meta_card(box='', layouts=[
+        ui.layout(
+            breakpoint='xs',
+            zones=[
+                ui.zone('title', size='80px'),
+                ui.zone('menu', size='80px'),
+                ui.zone('queue_controls', size='420px'),
+                ui.zone('review_queue'),
+            ]
+        ),
+        ui.layout(
+            breakpoint='m',
+            width='1920px',
+            zones=[
+                ui.zone('header', size='80px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('title', size='400px'),
+                    ui.zone('menu'),
+                ]),
+                ui.zone('body', size='900px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('queue_controls', size='400px'),
+                    ui.zone('review_queue'),
+                ]),
+            ]
+        )
+    ]))
+
+    render_header(q)
+
+
+def get_review_queue(q: Q):
+    """
+    Return the review queue shared by all reviewers, built again when a rebuilt predictor has been swapped in.
+    """
+    predictor = model_manager.predictor
+    if q.app.review_queue is None or q.app.review_queue_predictor is not predictor:
+        q.app.review_queue = ReviewQueue(
+            predictor.columns[config.id_column], predictor.scored.scores, q.app.approval_threshold,
+            decided_ids=q.app.customer_status.keys(),
+        )
+        q.app.review_queue_predictor = predictor
+
+    q.app.review_queue.set_threshold(q.app.approval_threshold)
+    return q.app.review_queue
+
+
+def decide(q: Q, positions, status):
+    """
+    Record one decision for a batch of pending customers and apply all status updates at once.
+
+    :return: number of decided customers
+    """
+    changes = get_review_queue(q).decide(positions, status)
+    q.app.customer_status.update(changes)
+    return len(changes)
+
+
+def get_queue_rows(q: Q):
+    queue = get_review_queue(q)
+    positions = queue.peek(config.page_size, q.client.queue_priority)
+    q.client.queue_positions = positions
+    return [
+        ui.table_row(name=str(position), cells=[str(queue.ids[position]), f'{queue.scores[position]:.4f}'])
+        for position in positions
+    ]
+
+
+def get_queue_summary(q: Q):
+    return f'{len(get_review_queue(q))} customers waiting for a decision'
+
+
+def render_queue_controls(q: Q):
+    render_card(q, 'queue_controls', ui.form_card(
+        box='queue_controls',
+        items=[
+            ui.dropdown(
+                name='queue_priority',
+                label='Review first',
+                value=q.client.queue_priority,
+                choices=[
+                    ui.choice(name=ReviewQueue.risk, label='Highest default prediction rate'),
+                    ui.choice(name=ReviewQueue.uncertainty, label='Closest to the approval threshold'),
+                ],
+                trigger=True,
+            ),
+            ui.buttons([
+                ui.button(name='queue_action', value='approve_selected', label='Approve Selected', primary=True),
+                ui.button(name='queue_action', value='reject_selected', label='Reject Selected'),
+            ]),
+            ui.buttons([
+                ui.button(name='queue_action', value='approve_page', label='Approve Page'),
+                ui.button(name='queue_action', value='reject_page', label='Reject Page'),
+            ]),
+            ui.separator('Score band'),
+            ui.slider(name='band_low', label='From', min=0, max=1, step=0.01, value=q.client.band_low),
+            ui.slider(name='band_high', label='To', min=0, max=1, step=0.01, value=q.client.band_high),
+            ui.buttons([
+                ui.button(name='queue_action', value='approve_band', label='Approve Band'),
+                ui.button(name='queue_action', value='reject_band', label='Reject Band'),
+            ]),
+        ]
+    ))
+
+
+def render_queue_page(q: Q):
+    init(q)
+    if q.client.queue_priority is None:
+        q.client.queue_priority = ReviewQueue.risk
+        q.client.band_low = 0.0
+        q.client.band_high = round(q.app.approval_threshold, 2)
+
+    render_queue_controls(q)
+    render_queue_table(q)
+
+
+def render_queue_table(q: Q):
+    # Sent whole the first time, then only the summary and the rows which changed
+    render_card(q, 'review_queue', ui.form_card(
+        box='review_queue',
+        items=[
+            ui.text(get_queue_summary(q)),
+            ui.table(
+                name='review_table',
+                columns=[
+                    ui.table_column(name='ID', label='ID'),
+                    ui.table_column(name='score', label='Default Prediction Rate'),
+                ],
+                rows=get_queue_rows(q),
+                multiple=True,
+                height='90%',
+            ),
+        ]
+    ))
+
+
+def handle_priority_change(q: Q):
+    q.client.queue_priority = q.args.queue_priority
+    render_queue_table(q)
+
+
+def handle_queue_action(q: Q):
+    action = q.args.queue_action
+    if action.endswith('_selected'):
+        positions = [int(name) for name in q.args.review_table or []]
+    elif action.endswith('_page'):
+        positions = q.client.queue_positions or []
+    else:
+        # Sliders send their value only when it has changed since the last submit
+        if q.args.band_low is not None:
+            q.client.band_low = q.args.band_low
+        if q.args.band_high is not None:
+            q.client.band_high = q.args.band_high
+        positions = get_review_queue(q).get_band(q.client.band_low, q.client.band_high)
+
+    decide(q, positions, queue_actions[action])
+    render_queue_table(q)
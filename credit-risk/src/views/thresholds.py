@@ -0,0 +1,122 @@
+from h2o_wave import Q, ui, data
+
+from .header import render_header
+from ..config import config, model_manager
+from ..page_state import render_card, render_layout
+
+
+def init(q: Q):
+    render_layout(q, ui.meta_card(box='', layouts=[
+        ui.layout(
+            breakpoint='xs',
+            zones=[
+                ui.zone('title', size='80px'),
+                ui.zone('menu', size='80px'),
+                ui.zone('threshold_controls', size='200px'),
+                ui.zone('threshold_metrics', size='120px'),
+                ui.zone('threshold_curve', size='500px'),
+            ]
+        ),
+        ui.layout(
+            breakpoint='m',
+            width='1920px',
+            zones=[
+                ui.zone('header', size='80px', direction=ui.ZoneDirection.ROW, zones=[
+                    ui.zone('title', size='400px'),
+                    ui.zone('menu'),
+                ]),
+                ui.zone('threshold_controls', size='200px'),
+                ui.zone('threshold_metrics', size='120px', direction=ui.ZoneDirection.ROW),
+                ui.zone('threshold_curve', size='600px'),
+            ]
+        )
+    ]))
+
+    render_header(q)
+
+
+def get_threshold_analysis(q: Q):
+    # Sorted once per predictor, moving the slider only looks metrics up
+    predictor = model_manager.predictor
+    if q.app.threshold_analysis is None or q.app.threshold_analysis_predictor is not predictor:
+        q.app.threshold_analysis = predictor.get_threshold_analysis(
+            config.approved_good_profit, config.approved_default_loss
+        )
+        q.app.threshold_analysis_predictor = predictor
+    return q.app.threshold_analysis
+
+
+def render_threshold_metrics(q: Q, threshold):
+    metrics = get_threshold_analysis(q).get_metrics(threshold)
+    cards = [
+        ('approval_rate', 'Approval Rate', f"{metrics['approval_rate']:.1%}"),
+        ('default_rate', 'Default Rate of Approved', f"{metrics['default_rate']:.1%}"),
+        ('precision', 'Precision of Rejections', f"{metrics['precision']:.1%}"),
+        ('recall', 'Recall of Defaults', f"{metrics['recall']:.1%}"),
+        ('profit', 'Expected Profit', f"{metrics['profit']:,.0f}"),
+    ]
+    for name, title, value in cards:
+        render_card(q, f'threshold_{name}', ui.small_stat_card(box='threshold_metrics', title=title, value=value))
+
+
+def render_threshold_controls(q: Q, threshold):
+    analysis = get_threshold_analysis(q)
+    render_card(q, 'threshold_controls', ui.form_card(
+        box='threshold_controls',
+        items=[
+            ui.slider(
+                name='approval_threshold',
+                label='Approve customers whose default prediction rate is below',
+                min=0,
+                max=1,
+                step=0.01,
+                value=threshold,
+                trigger=True,
+            ),
+            ui.buttons([
+                ui.button(name='apply_threshold', label='Apply Threshold', primary=True),
+                ui.button(name='best_threshold', label=f'Most Profitable ({analysis.get_best_threshold():.2f})'),
+            ]),
+            ui.text(f'Threshold in use: {q.app.approval_threshold:.2f}'),
+        ]
+    ))
+
+
+def render_thresholds_page(q: Q):
+    init(q)
+    if get_threshold_analysis(q) is None:
+        render_card(q, 'threshold_controls', ui.form_card(box='threshold_controls', items=[
+            ui.message_bar(text='The testing data has no labels to analyse thresholds with', type='warning')
+        ]))
+        return
+
+    q.client.approval_threshold = q.app.approval_threshold
+    render_threshold_controls(q, q.client.approval_threshold)
+    render_threshold_metrics(q, q.client.approval_threshold)
+
+    curve = get_threshold_analysis(q).get_curve()
+    render_card(q, 'threshold_curve', ui.plot_card(
+        box='threshold_curve',
+        title='Expected profit by threshold',
+        data=data('threshold profit', rows=[(metrics['threshold'], metrics['profit']) for metrics in curve]),
+        plot=ui.plot([ui.mark(type='line', x='=threshold', y='=profit', x_title='Threshold', y_title='Profit')]),
+    ))
+
+
+def handle_threshold_change(q: Q):
+    """
+    Show the metrics of the threshold picked with the slider, only the metric cards are updated.
+    """
+    q.client.approval_threshold = q.args.approval_threshold
+    render_threshold_metrics(q, q.client.approval_threshold)
+
+
+def handle_best_threshold_click(q: Q):
+    q.client.approval_threshold = round(get_threshold_analysis(q).get_best_threshold(), 2)
+    render_threshold_controls(q, q.client.approval_threshold)
+    render_threshold_metrics(q, q.client.approval_threshold)
+
+
+def handle_apply_threshold_click(q: Q):
+    q.app.approval_threshold = q.client.approval_threshold
+    render_threshold_controls(q, q.client.approval_threshold)
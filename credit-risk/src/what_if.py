@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class WhatIf:
+    """
+    What-if simulator rescoring a customer with some of their features changed.
+
+    The customer's row is replicated once per grid value of the varied feature, with the other changed features
+    set on every copy, and all variants are scored in a single batched call returning both the scores and the
+    contributions. Results are cached per customer, feature, grid and other changes, so moving a slider over the
+    grid only looks the variants up.
+    """
+
+    def __init__(self, score_batch, df, get_grid, cache_size=256):
+        """
+        :param score_batch: function scoring a Pandas DataFrame into ScoredResults
+        :param df: Pandas DataFrame of the customers, looked up by row position
+        :param get_grid: function returning the NumPy array of grid values of a feature
+        :param cache_size: number of simulations to keep
+        """
+        self.score_batch = score_batch
+        # A shallow copy, the values of a memory-mapped frame stay shared
+        self.df = df.copy(deep=False)
+        self.df.index = pd.RangeIndex(len(df))
+        self.get_grid = get_grid
+        self.cache_size = cache_size
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def simulate(self, row_index, feature, grid=None, changes=None):
+        """
+        Return the scores and contributions of a customer over the grid of a feature.
+
+        :param row_index: row position of the customer
+        :param feature: feature varied over the grid
+        :param grid: optional NumPy array of values of the feature, defaults to its grid
+        :param changes: optional dict of other feature name to the value they are set to
+        :return: tuple of the NumPy array of grid values and the ScoredResults of the variants, in grid order
+        """
+        grid = self.get_grid(feature) if grid is None else np.asarray(grid)
+        changes = {name: value for name, value in (changes or {}).items() if name != feature}
+        key = (row_index, feature, tuple(grid.tolist()), tuple(sorted(changes.items())))
+
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        batch = self.df.iloc[np.repeat(row_index, len(grid))].reset_index(drop=True)
+        for name, value in changes.items():
+            batch[name] = value
+        batch[feature] = grid
+        result = grid, self.score_batch(batch)
+
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def get_nearest(self, feature, value):
+        """
+        Return the grid value of a feature closest to a value.
+        """
+        grid = self.get_grid(feature)
+        return grid[int(np.argmin(np.abs(grid.astype(np.float64) - value)))].item()
+
+    def get_variant(self, row_index, feature, value, changes=None):
+        """
+        Return the variant of a customer closest to a value of a feature, from the simulation over its grid.
+
+        :param row_index: row position of the customer
+        :param feature: feature varied over the grid
+        :param value: value of the feature, e.g. from a slider
+        :param changes: optional dict of other feature name to the value they are set to
+        :return: dict with the grid value, the score and the contributions as a list of (feature name,
+            contribution) tuples from the most positive one
+        """
+        grid, scored = self.simulate(row_index, feature, changes=changes)
+        i = int(np.argmin(np.abs(grid.astype(np.float64) - value)))
+        return {
+            "value": grid[i].item(),
+            "score": scored.get_score(i),
+            "contributions": scored.get_contributions(i),
+        }
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from src.columnar_cache import ColumnarCache, narrow
+
+
+def write_csv(tmp_path, df):
+    csv_path = str(tmp_path / "customers.csv")
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def test_round_trip(tmp_path):
+    df = pd.DataFrame({
+        "ID": [1, 2, 3, 4],
+        "LIMIT_BAL": [20000.0, 120000.0, 90000.0, 50000.0],
+        "SEX": [1, 2, 2, 1],
+        "RATE": [0.5, 0.25, np.nan, 1.125],
+        "SCORE": [0.1, 0.2, 0.3, 0.4],
+        "FLAG": [True, False, True, True],
+        "HUGE": [1e20, 2e20, 3e20, 4e20],
+        "NAME": ["a", np.nan, "ccc", "b"],
+    })
+    csv_path = write_csv(tmp_path, df)
+    cache = ColumnarCache(str(tmp_path / "cache"), chunk_size=3)
+
+    for _ in range(2):
+        loaded = cache.load_frame(csv_path)
+        values = pd.DataFrame({column: np.asarray(loaded[column]) for column in loaded.columns})
+        pd.testing.assert_frame_equal(values, pd.read_csv(csv_path), check_dtype=False)
+
+    assert loaded.drop(columns=["NAME"]).dtypes.to_dict() == {
+        "ID": np.int8, "LIMIT_BAL": np.int32, "SEX": np.int8, "RATE": np.float32, "SCORE": np.float64,
+        "FLAG": bool, "HUGE": np.float64,
+    }
+    assert loaded["NAME"].isna().tolist() == [False, True, False, False]
+
+
+def test_frame_shares_the_memory_maps(tmp_path):
+    csv_path = write_csv(tmp_path, pd.DataFrame({"ID": [1, 2, 3], "AGE": [30, 40, 50], "BILL": [1e5, 2e5, 3e5]}))
+    loaded = ColumnarCache(str(tmp_path / "cache")).load_frame(csv_path)
+
+    for column in loaded.columns:
+        values = loaded[column].to_numpy()
+        while not isinstance(values, np.memmap):
+            values = values.base
+            assert values is not None
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    cache = ColumnarCache(str(tmp_path / "cache"))
+    csv_path = write_csv(tmp_path, pd.DataFrame({"ID": [1, 2]}))
+    cache.load_frame(csv_path)
+
+    csv_path = write_csv(tmp_path, pd.DataFrame({"ID": [1, 2, 3]}))
+    assert cache.load_frame(csv_path)["ID"].tolist() == [1, 2, 3]
+
+
+def test_narrow_integers():
+    assert narrow(np.array([0, 100])).dtype == np.int8
+    assert narrow(np.array([0, 1000])).dtype == np.int16
+    assert narrow(np.array([0, 100000])).dtype == np.int32
+    assert narrow(np.array([0, 2 ** 40])).dtype == np.int64
+    assert narrow(np.array([], dtype=np.int64)).dtype == np.int8
+
+
+def test_narrow_floats():
+    assert narrow(np.array([1.0, 2.0])).dtype == np.int8
+    assert narrow(np.array([1.5, np.nan])).dtype == np.float32
+    assert narrow(np.array([0.1, 0.2])).dtype == np.float64
+    assert narrow(np.array([1.0, np.nan])).dtype == np.float32
+
+
+def test_narrow_keeps_whole_floats_out_of_the_int64_range():
+    values = np.array([2.0 ** 63, -2.0 ** 70])
+    np.testing.assert_array_equal(narrow(values), values)
+    assert narrow(np.array([-2.0 ** 63, 0.0])).dtype == np.int64
+
+
+def test_narrow_keeps_booleans_and_strings():
+    assert narrow(np.array([True, False])).dtype == bool
+    values = np.array(["a", np.nan], dtype=object)
+    assert narrow(values) is values
@@ -0,0 +1,117 @@
+import sqlite3
+import time
+
+import pytest
+from src.decision_store import DecisionStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "decisions.sqlite3")
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_decisions_are_read_right_away(path):
+    store = DecisionStore(path, flush_interval=60)
+    store[101] = "BoxCheckmarkSolid"
+    store.update({102: "BoxMultiplySolid", 103: "BoxCheckmarkSolid"})
+
+    assert store[101] == "BoxCheckmarkSolid"
+    assert store.get(104) is None
+    assert len(store) == 3
+    assert sorted(store.keys()) == [101, 102, 103]
+    store.close()
+
+
+def test_decisions_survive_a_restart(path):
+    store = DecisionStore(path, flush_interval=60)
+    store.update({101: "BoxCheckmarkSolid", 102: "BoxMultiplySolid"})
+    store[101] = "BoxMultiplySolid"
+    assert store.flush(timeout=5)
+    store.close()
+
+    store = DecisionStore(path)
+    assert dict(store.items()) == {101: "BoxMultiplySolid", 102: "BoxMultiplySolid"}
+    store.close()
+
+
+def test_full_buffer_is_written_without_waiting(path):
+    store = DecisionStore(path, flush_interval=60, batch_size=10)
+    store.update({customer_id: "BoxCheckmarkSolid" for customer_id in range(10)})
+
+    def count():
+        with sqlite3.connect(path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+
+    wait_until(lambda: count() == 10)
+    store.close()
+
+
+def fail_once(mocker, store):
+    write = store._write
+
+    def fail_first_write(connection, batch):
+        if len(mocked.call_args_list) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return write(connection, batch)
+
+    mocked = mocker.patch.object(store, "_write", side_effect=fail_first_write)
+    return mocked
+
+
+def test_failed_batch_is_written_again(path, mocker):
+    store = DecisionStore(path, flush_interval=60, retry_interval=0.05, reload_interval=60)
+    write = fail_once(mocker, store)
+    store[101] = "BoxCheckmarkSolid"
+
+    assert store.flush(timeout=5)
+    assert write.call_count == 2
+    store.close()
+    assert dict(DecisionStore(path).items()) == {101: "BoxCheckmarkSolid"}
+
+
+def test_failed_batch_keeps_newer_decisions(path, mocker):
+    store = DecisionStore(path, flush_interval=60, retry_interval=60, reload_interval=60)
+    write = fail_once(mocker, store)
+    store.update({101: "BoxCheckmarkSolid", 102: "BoxCheckmarkSolid"})
+    store.flush(timeout=0)
+    wait_until(lambda: write.call_count == 1)
+
+    # Decided while the failed batch waits for its retry, which closing the store does right away
+    store[101] = "BoxMultiplySolid"
+    store.close()
+    assert dict(DecisionStore(path).items()) == {101: "BoxMultiplySolid", 102: "BoxCheckmarkSolid"}
+
+
+def test_replicas_see_each_others_decisions(path):
+    first = DecisionStore(path, flush_interval=60, reload_interval=0.05)
+    second = DecisionStore(path, flush_interval=60, reload_interval=0.05)
+
+    first[101] = "BoxCheckmarkSolid"
+    first.flush(timeout=5)
+    wait_until(lambda: second.get(101) == "BoxCheckmarkSolid")
+
+    second[101] = "BoxMultiplySolid"
+    second.flush(timeout=5)
+    wait_until(lambda: first.get(101) == "BoxMultiplySolid")
+    first.close()
+    second.close()
+
+
+def test_reload_keeps_buffered_decisions(path):
+    store = DecisionStore(path, flush_interval=60, reload_interval=60)
+    other = DecisionStore(path, flush_interval=60)
+    other.update({101: "BoxCheckmarkSolid", 102: "BoxCheckmarkSolid"})
+    other.flush(timeout=5)
+
+    store[102] = "BoxMultiplySolid"
+    store.reload()
+    assert dict(store.items()) == {101: "BoxCheckmarkSolid", 102: "BoxMultiplySolid"}
+    store.close()
+    other.close()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.global_explanation import GlobalExplanation
+from src.scored_results import ScoredResults
+
+
+feature_names = ["LIMIT_BAL", "PAY_0", "EDUCATION", "AGE"]
+rng = np.random.RandomState(3)
+predictions = pd.DataFrame({"predict": np.round(rng.uniform(0, 1, 200), 2)})
+contributions = pd.DataFrame(rng.normal(0, 1, (200, 4)) * [0.2, 1.0, 0.5, 0.1], columns=feature_names)
+contributions["BiasTerm"] = -1.0
+scored = ScoredResults(predictions, contributions, "predict")
+explanation = GlobalExplanation(scored)
+
+
+def get_band(score):
+    # Brute force band lookup, scores of 1.0 and above fall into the last band
+    for band in range(5):
+        if score < (band + 1) / 5:
+            return band
+    return 4
+
+
+def test_feature_importance_matches_pandas():
+    expected = contributions[feature_names].abs().mean().sort_values(ascending=False)
+    importance = explanation.get_feature_importance()
+    assert [name for name, _ in importance] == list(expected.index)
+    assert [value for _, value in importance] == pytest.approx(list(expected))
+
+
+def test_contribution_distributions_match_pandas():
+    for distribution in explanation.get_contribution_distributions():
+        values = contributions[distribution["feature"]]
+        for quantile in GlobalExplanation.quantiles:
+            key = f"q{round(quantile * 100)}"
+            assert distribution[key] == pytest.approx(values.quantile(quantile))
+
+
+def test_top_reasons_by_band_match_brute_force():
+    reasons = contributions[feature_names].idxmax(axis=1)
+    bands = predictions["predict"].map(get_band)
+    for band in explanation.get_top_reasons_by_band():
+        in_band = reasons[bands == band["band"]]
+        assert band["count"] == len(in_band)
+        shares = in_band.value_counts(normalize=True)
+        assert [share for _, share in band["reasons"]] == pytest.approx(list(shares.iloc[:3]))
+        for name, share in band["reasons"]:
+            assert share == pytest.approx(shares[name])
+    assert [band["label"] for band in explanation.get_top_reasons_by_band()] == [
+        "0.0 - 0.2", "0.2 - 0.4", "0.4 - 0.6", "0.6 - 0.8", "0.8 - 1.0"
+    ]
+
+
+def test_get_customers_matches_brute_force():
+    reasons = contributions[feature_names].idxmax(axis=1)
+    bands = predictions["predict"].map(get_band)
+    for feature in feature_names:
+        rows = explanation.get_customers(feature)
+        assert set(rows) == set(np.flatnonzero(reasons == feature))
+        assert np.all(np.diff(scored.scores[rows]) <= 0)
+        for band in range(5):
+            banded = explanation.get_customers(feature, band)
+            assert set(banded) == set(np.flatnonzero((reasons == feature) & (bands == band)))
+            assert np.all(np.diff(scored.scores[banded]) <= 0)
+
+
+def test_scores_outside_of_the_edges():
+    outside = ScoredResults(
+        pd.DataFrame({"predict": [-0.5, 1.0, 1.5]}), contributions.iloc[:3].reset_index(drop=True), "predict"
+    )
+    np.testing.assert_array_equal(GlobalExplanation(outside).bands, [0, 4, 4])
+
+
+def test_no_customers():
+    empty = ScoredResults(pd.DataFrame({"predict": []}), contributions.iloc[:0], "predict")
+    explanation = GlobalExplanation(empty)
+    assert [value for _, value in explanation.get_feature_importance()] == [0.0] * 4
+    assert all(band["count"] == 0 and band["reasons"] == [] for band in explanation.get_top_reasons_by_band())
+    assert len(explanation.get_customers("PAY_0")) == 0
@@ -0,0 +1,122 @@
+import copy
+
+from h2o_wave import ui
+from src.page_state import PageState, get_changes, to_plain
+
+
+class Ref:
+    def __init__(self, page, path):
+        self.page = page
+        self.path = path
+
+    def __getitem__(self, key):
+        return Ref(self.page, self.path + (key,))
+
+    def __setitem__(self, key, value):
+        self.page.updates.append((self.path + (key,), to_plain(value)))
+        target = self.page.cards
+        for part in self.path:
+            target = target[part]
+        target[key] = to_plain(value)
+
+
+class Page:
+    """
+    Page applying the cards and in-place updates it is sent, like the browser does.
+    """
+
+    def __init__(self):
+        self.cards = {}
+        self.replaced = []
+        self.updates = []
+
+    def __setitem__(self, name, card):
+        self.replaced.append(name)
+        self.cards[name] = copy.deepcopy(to_plain(card))
+
+    def __getitem__(self, name):
+        return Ref(self, (name,))
+
+
+def get_table(statuses):
+    return ui.form_card(box="table", items=[
+        ui.text_xl("Customers"),
+        ui.table(name="customers", columns=[ui.table_column(name="status", label="Status")], rows=[
+            ui.table_row(name=str(i), cells=[status]) for i, status in enumerate(statuses)
+        ]),
+    ])
+
+
+def render(state, page, card, **kwargs):
+    sent = state.render(page, "table", card, **kwargs)
+    assert page.cards["table"] == to_plain(card)
+    return sent
+
+
+def test_first_render_sends_the_card():
+    state, page = PageState(), Page()
+    assert render(state, page, get_table(["Approved", "Pending"]))
+    assert page.replaced == ["table"]
+
+
+def test_unchanged_card_sends_nothing():
+    state, page = PageState(), Page()
+    render(state, page, get_table(["Approved", "Pending"]))
+    assert not render(state, page, get_table(["Approved", "Pending"]))
+    assert page.replaced == ["table"]
+    assert page.updates == []
+
+
+def test_changed_row_is_updated_in_place():
+    state, page = PageState(), Page()
+    statuses = ["Pending"] * 10
+    render(state, page, get_table(statuses))
+    statuses[3] = "Approved"
+
+    assert render(state, page, get_table(statuses))
+    assert page.replaced == ["table"]
+    # The one cell of the row changed, more than the share of list changes, so the cells are sent whole
+    assert page.updates == [(("table", "items", 1, "table", "rows", 3, "cells"), ["Approved"])]
+
+
+def test_mostly_changed_list_is_sent_whole():
+    state, page = PageState(), Page()
+    render(state, page, get_table(["Pending"] * 4))
+    render(state, page, get_table(["Approved"] * 3 + ["Pending"]))
+    assert [path for path, _ in page.updates] == [("table", "items", 1, "table", "rows")]
+
+
+def test_resized_list_is_sent_whole():
+    state, page = PageState(), Page()
+    render(state, page, get_table(["Pending"] * 4))
+    render(state, page, get_table(["Pending"] * 5))
+    assert [path for path, _ in page.updates] == [("table", "items", 1, "table", "rows")]
+
+
+def test_other_view_replaces_the_card():
+    state, page = PageState(), Page()
+    render(state, page, get_table(["Pending"]))
+    render(state, page, ui.markdown_card(box="table", title="Customers", content="None left"))
+    assert page.replaced == ["table", "table"]
+    assert page.updates == []
+
+
+def test_not_in_place_replaces_the_card():
+    state, page = PageState(), Page()
+    render(state, page, get_table(["Pending"]))
+    render(state, page, get_table(["Approved"]), in_place=False)
+    assert page.replaced == ["table", "table"]
+
+
+def test_removed_key_replaces_its_parent():
+    old = {"view": "form", "items": [{"text": {"content": "a", "name": "x"}}, {"text": {"content": "b"}}]}
+    new = {"view": "form", "items": [{"text": {"content": "a"}}, {"text": {"content": "b"}}]}
+    changes = []
+    assert get_changes(old, new, (), changes)
+    assert changes == [(("items", 0, "text"), {"content": "a"})]
+
+
+def test_data_is_never_patched():
+    old = {"view": "plot", "data": [[1, 2]]}
+    new = {"view": "plot", "data": [[1, 3]]}
+    assert not get_changes(old, new, (), [])
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from src.review_queue import ReviewQueue
+
+
+ids = [101, 102, 103, 104, 105, 106]
+scores = np.array([0.9, 0.2, 0.55, 0.28, 0.75, 0.4])
+
+
+def test_peek_by_risk():
+    queue = ReviewQueue(ids, scores, 0.35)
+    assert queue.peek(3) == [0, 4, 2]
+    # Peeking does not remove anybody
+    assert queue.peek(10) == [0, 4, 2, 5, 3, 1]
+    assert len(queue) == 6
+
+
+def test_peek_by_uncertainty():
+    queue = ReviewQueue(ids, scores, 0.35)
+    assert queue.peek(4, ReviewQueue.uncertainty) == [5, 3, 1, 2]
+
+
+def test_decided_customers_are_skipped():
+    queue = ReviewQueue(ids, scores, 0.35)
+    queue.peek(2)
+
+    assert queue.decide([4, 0], "Approved") == {101: "Approved", 105: "Approved"}
+    assert queue.peek(2) == [2, 5]
+    assert queue.peek(2, ReviewQueue.uncertainty) == [5, 3]
+    assert len(queue) == 4
+
+
+def test_deciding_twice_only_reports_pending_customers():
+    queue = ReviewQueue(ids, scores, 0.35)
+    queue.decide([1, 1, 2], "Rejected")
+
+    assert queue.decide([2, 3], "Approved") == {104: "Approved"}
+    assert len(queue) == 3
+
+
+def test_already_decided_ids():
+    queue = ReviewQueue(ids, scores, 0.35, decided_ids=[101, 999])
+    assert len(queue) == 5
+    assert queue.peek(1) == [4]
+
+
+def test_changing_the_threshold_reorders_uncertainty():
+    queue = ReviewQueue(ids, scores, 0.35)
+    queue.peek(1, ReviewQueue.uncertainty)
+    queue.decide([5], "Approved")
+
+    queue.set_threshold(0.8)
+    assert queue.peek(2, ReviewQueue.uncertainty) == [4, 0]
+    assert queue.peek(1) == [0]
+
+
+def test_band():
+    queue = ReviewQueue(ids, scores, 0.35)
+    queue.decide([5], "Approved")
+    assert queue.get_band(0.25, 0.55).tolist() == [2, 3]
+
+
+def test_empty_queue():
+    queue = ReviewQueue(ids, scores, 0.35)
+    queue.decide(queue.get_band(0, 1), "Approved")
+
+    assert len(queue) == 0
+    assert queue.peek(5) == []
+    assert queue.peek(5, ReviewQueue.uncertainty) == []
+    assert ReviewQueue([], [], 0.35).peek(5) == []
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        ReviewQueue(ids, scores, 0.35).peek(1, "age")
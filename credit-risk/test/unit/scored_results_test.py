@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.scored_results import ScoredResults
+
+
+predictions = pd.DataFrame({"predict": [0.1, 0.7, 0.4, 0.9]})
+contributions = pd.DataFrame({
+    "LIMIT_BAL": [0.5, -0.2, 0.1, 1.2],
+    "PAY_0": [-0.3, 0.9, 0.0, 0.4],
+    "EDUCATION": [0.1, -0.6, -0.2, 0.3],
+    "BiasTerm": [-1.0, -1.0, -1.0, -1.0],
+})
+scored = ScoredResults(predictions, contributions, "predict")
+
+
+def test_scored_results_arrays():
+    assert len(scored) == 4
+    assert scored.feature_names == ["LIMIT_BAL", "PAY_0", "EDUCATION"]
+    assert scored.contributions.shape == (4, 3)
+    assert scored.contributions.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(scored.bias, [-1.0] * 4)
+
+
+def test_get_score():
+    assert scored.get_score(1) == pytest.approx(0.7)
+
+
+def test_top_features_ignore_bias_term():
+    assert [scored.get_top_negative_feature(row) for row in range(4)] == [
+        "PAY_0", "EDUCATION", "EDUCATION", "EDUCATION"
+    ]
+    assert [scored.get_top_positive_feature(row) for row in range(4)] == [
+        "LIMIT_BAL", "PAY_0", "LIMIT_BAL", "LIMIT_BAL"
+    ]
+
+
+def test_get_contributions_ordered():
+    assert scored.get_contributions(1) == [("PAY_0", 0.9), ("LIMIT_BAL", -0.2), ("EDUCATION", -0.6)]
+
+
+def test_get_highest_score_rows():
+    assert scored.get_highest_score_rows(2).tolist() == [3, 1]
+    assert scored.get_highest_score_rows(10).tolist() == [3, 1, 2, 0]
+    assert scored.get_highest_score_rows(0).tolist() == []
+
+
+def test_plot_contributions():
+    figure = scored.plot_contributions(1, "Row 1", {"LIMIT_BAL": 20000, "PAY_0": 2, "EDUCATION": 1}, top_count=2)
+    axes = figure.axes[0]
+    assert axes.get_title() == "Row 1"
+    # Largest contribution in absolute value at the top
+    assert [label.get_text() for label in axes.get_yticklabels()] == ["EDUCATION=1", "PAY_0=2"]
+    assert [patch.get_width() for patch in axes.patches] == pytest.approx([-0.6, 0.9])
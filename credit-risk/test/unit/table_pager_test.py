@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from src.table_pager import get_sort_orders, TablePager
+
+
+df = pd.DataFrame({
+    "ID": [101, 1020, 103, 2001, 105],
+    "LIMIT_BAL": [50000, 20000, np.nan, 80000, 20000],
+    "AGE": [24, 35, 41, 35, 58],
+    "Default Prediction Rate": [0.12, 0.87, 0.45, 0.03, 0.66],
+}, index=[10, 11, 12, 13, 14])
+pager = TablePager(df, prefix_columns=["ID"], substring_columns=["AGE"])
+
+
+def test_pages_keep_the_index():
+    page, total, page_number = pager.get_page(1, 2)
+    assert page.index.tolist() == [12, 13]
+    assert (total, page_number) == (5, 1)
+
+
+def test_last_page_is_partial():
+    page, total, page_number = pager.get_page(2, 2)
+    assert page.index.tolist() == [14]
+    assert (total, page_number) == (5, 2)
+
+
+def test_out_of_range_pages_are_clamped():
+    assert pager.get_page(7, 2)[0].index.tolist() == [14]
+    assert pager.get_page(7, 2)[2] == 2
+    assert pager.get_page(-1, 2)[0].index.tolist() == [10, 11]
+    assert pager.get_page(-1, 2)[2] == 0
+
+
+def test_sort_ascending_and_descending():
+    page, _, _ = pager.get_page(0, 5, sort_column="Default Prediction Rate")
+    assert page["Default Prediction Rate"].tolist() == [0.03, 0.12, 0.45, 0.66, 0.87]
+
+    page, _, _ = pager.get_page(0, 2, sort_column="Default Prediction Rate", descending=True)
+    assert page["Default Prediction Rate"].tolist() == [0.87, 0.66]
+
+
+def test_missing_values_sort_last_in_both_directions():
+    ascending, descending = get_sort_orders(df["LIMIT_BAL"])
+    assert df["LIMIT_BAL"].to_numpy()[ascending[:4]].tolist() == [20000, 20000, 50000, 80000]
+    assert ascending[-1] == 2
+    assert df["LIMIT_BAL"].to_numpy()[descending[:4]].tolist() == [80000, 50000, 20000, 20000]
+    assert descending[-1] == 2
+
+
+def test_sort_strings():
+    ascending, descending = get_sort_orders(pd.Series(["b", None, "a", "c"]))
+    assert ascending.tolist() == [2, 0, 3, 1]
+    assert descending.tolist() == [3, 0, 2, 1]
+
+
+def test_search_ids_by_prefix():
+    page, total, _ = pager.get_page(0, 10, query=" 10 ")
+    assert page["ID"].tolist() == [101, 1020, 103, 105]
+    assert total == 4
+    assert pager.get_page(0, 10, query="20")[0]["ID"].tolist() == [2001]
+
+
+def test_search_substring_columns():
+    page, total, _ = pager.get_page(0, 10, query="5")
+    assert page["AGE"].tolist() == [35, 35, 58]
+    assert total == 3
+
+
+def test_search_then_sort_and_page():
+    page, total, page_number = pager.get_page(5, 2, sort_column="AGE", descending=True, query="10")
+    assert page["ID"].tolist() == [1020, 101]
+    assert (total, page_number) == (4, 1)
+
+
+def test_search_without_matches():
+    page, total, page_number = pager.get_page(3, 2, query="xyz")
+    assert page.empty
+    assert (total, page_number) == (0, 0)
+
+
+def test_search_results_are_cached():
+    pager = TablePager(df, prefix_columns=["ID"], cache_size=2)
+    first = pager.search("10")
+    assert pager.search(" 10") is first
+
+    pager.search("20")
+    pager.search("3")
+    assert pager.search("10") is not first
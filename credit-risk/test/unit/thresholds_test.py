@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from src.thresholds import ThresholdAnalysis
+
+
+rng = np.random.RandomState(7)
+# Rounded so that many customers share a score
+scores = np.round(rng.uniform(0, 1, 300), 2)
+labels = (rng.uniform(0, 1, 300) < scores).astype(int)
+analysis = ThresholdAnalysis(scores, labels, approved_good_profit=1.0, approved_default_loss=5.0)
+
+
+def brute_force_metrics(threshold):
+    approved = scores < threshold
+    rejected = ~approved
+    approved_defaults = labels[approved].sum()
+    rejected_defaults = labels[rejected].sum()
+    return {
+        "threshold": threshold,
+        "approved": approved.sum(),
+        "approval_rate": approved.mean(),
+        "default_rate": approved_defaults / approved.sum() if approved.any() else 0.0,
+        "precision": rejected_defaults / rejected.sum() if rejected.any() else 0.0,
+        "recall": rejected_defaults / labels.sum(),
+        "profit": 1.0 * (approved.sum() - approved_defaults) - 5.0 * approved_defaults,
+    }
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.005, 0.3, 0.35, 0.351, 0.5, 0.99, 1.0, 2.0])
+def test_metrics_match_brute_force(threshold):
+    assert analysis.get_metrics(threshold) == pytest.approx(brute_force_metrics(threshold))
+
+
+def test_best_threshold_has_the_highest_profit():
+    best = analysis.get_best_threshold()
+    profits = [brute_force_metrics(threshold)["profit"] for threshold in np.append(np.unique(scores), np.inf)]
+    assert analysis.get_metrics(best)["profit"] == max(profits)
+
+
+def test_best_threshold_approving_everybody():
+    assert ThresholdAnalysis([0.1, 0.4, 0.8], [0, 0, 0]).get_best_threshold() == 1.0
+
+
+def test_without_defaults():
+    metrics = ThresholdAnalysis([0.1, 0.4, 0.8], [0, 0, 0]).get_metrics(0.5)
+    assert metrics["approved"] == 2
+    assert metrics["default_rate"] == 0.0
+    assert metrics["recall"] == 0.0
+
+
+def test_curve():
+    curve = analysis.get_curve(points=11)
+    assert [metrics["threshold"] for metrics in curve] == pytest.approx(np.linspace(0, 1, 11))
+    assert [metrics["approved"] for metrics in curve] == sorted(metrics["approved"] for metrics in curve)
@@ -0,0 +1,206 @@
+from itertools import combinations
+from math import factorial
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.tree_scorer import encode_levels, get_categorical_left, TreeEnsemble
+
+
+domain = ["a", "b", "c"]
+
+
+def build_ensemble():
+    # Tree 0: x0 < 0.5 ? (x1 in {a} ? 1.0 : -1.0) : (x0 < 2 ? 0.5 : 2.0)
+    # Tree 1: x2 < 1 or missing ? 0.3 : (x1 in {b, c} ? -0.2 : 0.7)
+    nodes = [
+        # feature, threshold, left, right, na_left, categorical_left, value
+        (0, 0.5, 1, 2, False, [0, 0, 0], 0.0),
+        (1, np.nan, 3, 4, True, [1, 0, 0], 0.0),
+        (0, 2.0, 5, 6, False, [0, 0, 0], 0.0),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], 1.0),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], -1.0),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], 0.5),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], 2.0),
+        (2, 1.0, 8, 9, True, [0, 0, 0], 0.0),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], 0.3),
+        (1, np.nan, 10, 11, False, [0, 1, 1], 0.0),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], -0.2),
+        (-1, np.nan, -1, -1, False, [0, 0, 0], 0.7),
+    ]
+    return TreeEnsemble(
+        feature_names=["x0", "x1", "x2"],
+        domains=[None, domain, None],
+        features=[node[0] for node in nodes],
+        thresholds=[node[1] for node in nodes],
+        left_children=[node[2] for node in nodes],
+        right_children=[node[3] for node in nodes],
+        na_left=[node[4] for node in nodes],
+        categorical_left=[node[5] for node in nodes],
+        values=[node[6] for node in nodes],
+        covers=np.zeros(len(nodes)),
+        roots=[0, 7],
+        init_f=-0.4,
+        link="logit",
+        response_domain=["FALSE", "TRUE"],
+    )
+
+
+rng = np.random.RandomState(42)
+training_df = pd.DataFrame({
+    "x0": rng.uniform(-1, 3, 500),
+    "x1": rng.choice(domain, 500),
+    "x2": rng.uniform(0, 2, 500),
+})
+test_df = pd.DataFrame({
+    "x0": [0.1, 1.0, 2.5, np.nan, -0.3],
+    "x1": ["a", " c", "b", "a", None],
+    "x2": [0.5, 1.5, np.nan, 1.2, 1.9],
+})
+ensemble = build_ensemble()
+ensemble.compute_covers(ensemble.encode(training_df))
+
+
+def expected_value_given(row, subset, node):
+    if ensemble.features[node] < 0:
+        return ensemble.values[node]
+
+    left, right = ensemble.left_children[node], ensemble.right_children[node]
+    if ensemble.features[node] in subset:
+        go_left = ensemble._go_left(row[None, :], np.array([[node]]))[0, 0]
+        return expected_value_given(row, subset, left if go_left else right)
+
+    return (
+        ensemble.covers[left] * expected_value_given(row, subset, left)
+        + ensemble.covers[right] * expected_value_given(row, subset, right)
+    ) / ensemble.covers[node]
+
+
+def brute_force_shapley(row):
+    feature_count = len(ensemble.feature_names)
+
+    def value(subset):
+        return ensemble.init_f + sum(expected_value_given(row, subset, root) for root in ensemble.roots)
+
+    phi = np.zeros(feature_count)
+    for i in range(feature_count):
+        others = [j for j in range(feature_count) if j != i]
+        for size in range(feature_count):
+            weight = factorial(size) * factorial(feature_count - size - 1) / factorial(feature_count)
+            for subset in combinations(others, size):
+                phi[i] += weight * (value(set(subset) | {i}) - value(set(subset)))
+    return phi
+
+
+def test_encode():
+    matrix = ensemble.encode(test_df)
+    np.testing.assert_array_equal(matrix[:, 1], [0, 2, 1, 0, np.nan])
+    assert np.isnan(matrix[3, 0])
+
+
+def test_covers():
+    assert ensemble.covers[0] == len(training_df)
+    assert ensemble.covers[7] == len(training_df)
+    assert ensemble.covers[1] + ensemble.covers[2] == len(training_df)
+    assert ensemble.covers[3] == ((training_df.x0 < 0.5) & (training_df.x1 == "a")).sum()
+
+
+def test_predict():
+    matrix = ensemble.encode(test_df)
+    raw = ensemble.predict_raw(matrix)
+
+    # Missing x0 goes right, missing x1 goes left at node 1 and right at node 9, missing x2 goes left
+    np.testing.assert_allclose(raw, [-0.4 + 1.0 + 0.3, -0.4 + 0.5 - 0.2, -0.4 + 2.0 + 0.3, -0.4 + 2.0 + 0.7,
+                                     -0.4 + 1.0 + 0.7])
+    np.testing.assert_allclose(ensemble.predict(matrix), 1 / (1 + np.exp(-raw)))
+
+
+def test_contributions_match_brute_force_shapley():
+    matrix = ensemble.encode(test_df)
+    contributions = ensemble.predict_contributions(matrix)
+
+    for row, row_contributions in zip(matrix, contributions):
+        np.testing.assert_allclose(row_contributions, brute_force_shapley(row), atol=1e-12)
+
+
+def test_contributions_add_up_to_raw_prediction():
+    matrix = ensemble.encode(training_df)
+    contributions = ensemble.predict_contributions(matrix, block_size=64)
+
+    np.testing.assert_allclose(contributions.sum(axis=1) + ensemble.expected_value(), ensemble.predict_raw(matrix))
+
+
+def test_score_frames():
+    predictions, contributions = ensemble.score_frames(test_df)
+
+    assert list(predictions.columns) == ["predict", "FALSE", "TRUE"]
+    assert list(contributions.columns) == ["x0", "x1", "x2", "BiasTerm"]
+    np.testing.assert_allclose(predictions["FALSE"] + predictions["TRUE"], 1)
+    assert list(predictions["predict"]) == ["TRUE" if p >= 0.5 else "FALSE" for p in predictions["TRUE"]]
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "native_model.npz")
+    ensemble.save(path)
+    loaded = TreeEnsemble.load(path)
+    matrix = ensemble.encode(test_df)
+
+    assert loaded.feature_names == ensemble.feature_names
+    assert loaded.domains == ensemble.domains
+    np.testing.assert_array_equal(loaded.predict(matrix), ensemble.predict(matrix))
+    np.testing.assert_array_equal(loaded.predict_contributions(matrix), ensemble.predict_contributions(matrix))
+
+
+def test_depth():
+    assert ensemble.depth == 2
+
+
+def get_chain_model(mocker, depth):
+    """
+    Return a regression model of one tree splitting x0 at 1, 2, ... depth, with the leaves on the left.
+    """
+    leaves = list(range(depth, 2 * depth + 1))
+    tree = mocker.Mock(
+        left_children=[depth + i for i in range(depth)] + [-1] * (depth + 1),
+        right_children=[i + 1 for i in range(depth - 1)] + [2 * depth] + [-1] * (depth + 1),
+        features=["x0"] * depth + [None] * (depth + 1),
+        thresholds=[float(i + 1) for i in range(depth)] + [None] * (depth + 1),
+        levels=[None] * (2 * depth + 1),
+        nas=["LEFT"] * depth + [None] * (depth + 1),
+        predictions=[0.0] * depth + [float(leaf) for leaf in leaves],
+    )
+    mocker.patch.dict("sys.modules", {"h2o.tree": mocker.Mock(**{"H2OTree.return_value": tree})})
+    output = {
+        "model_category": "Regression",
+        "names": ["x0", "y"],
+        "domains": [None, None],
+        "model_summary": {"number_of_trees": [1]},
+        "init_f": 0.0,
+    }
+    return mocker.Mock(_model_json={"output": output, "response_column_name": "y"})
+
+
+def test_from_h2o(mocker):
+    depth = TreeEnsemble.max_depth
+    exported = TreeEnsemble.from_h2o(get_chain_model(mocker, depth), pd.DataFrame({"x0": np.arange(depth + 1.0)}))
+
+    assert exported.depth == depth
+    np.testing.assert_array_equal(exported.predict(np.array([[0.5], [2.5], [100.0]])), [depth, depth + 2, 2 * depth])
+
+
+def test_from_h2o_rejects_deep_trees(mocker):
+    depth = TreeEnsemble.max_depth + 1
+    with pytest.raises(ValueError):
+        TreeEnsemble.from_h2o(get_chain_model(mocker, depth), pd.DataFrame({"x0": np.arange(depth + 1.0)}))
+
+
+def test_encode_numeric_levels():
+    codes = encode_levels(pd.Series([415, 510, 999, np.nan]), ["408", "415", "510"])
+    np.testing.assert_array_equal(codes, [1, 2, -1, -1])
+    # A chunk missing all values of a categorical column is parsed as numeric
+    np.testing.assert_array_equal(encode_levels(pd.Series([np.nan, np.nan]), domain), [-1, -1])
+
+
+@pytest.mark.parametrize("left_levels, right_levels", [(["b"], None), (None, [0, 2]), ([1], [0, 2])])
+def test_get_categorical_left(left_levels, right_levels):
+    np.testing.assert_array_equal(get_categorical_left(domain, 4, left_levels, right_levels), [0, 1, 0, 0])
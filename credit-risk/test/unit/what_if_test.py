@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.scored_results import ScoredResults
+from src.what_if import WhatIf
+
+
+weights = {"LIMIT_BAL": -0.00001, "PAY_0": 0.3, "AGE": 0.01}
+# Not a default index, customers are looked up by row position
+df = pd.DataFrame({
+    "LIMIT_BAL": [20000, 120000, 90000],
+    "PAY_0": [2, -1, 0],
+    "AGE": [24, 26, 34],
+}, index=[10, 20, 30])
+grids = {"PAY_0": np.arange(-2, 9), "AGE": np.array([20, 40, 60])}
+
+
+def score_batch(batch):
+    contributions = pd.DataFrame({name: batch[name] * weight for name, weight in weights.items()})
+    contributions["BiasTerm"] = -0.5
+    predictions = pd.DataFrame({"predict": contributions.sum(axis=1)})
+    return ScoredResults(predictions, contributions, "predict")
+
+
+@pytest.fixture
+def what_if(mocker):
+    return WhatIf(mocker.Mock(side_effect=score_batch), df, lambda feature: grids[feature], cache_size=2)
+
+
+def score_row(row):
+    return score_batch(pd.DataFrame([row])).get_score(0)
+
+
+def test_simulate_scores_every_grid_value_in_one_batch(what_if):
+    grid, scored = what_if.simulate(1, "PAY_0")
+
+    what_if.score_batch.assert_called_once()
+    np.testing.assert_array_equal(grid, grids["PAY_0"])
+    for i, value in enumerate(grid):
+        row = dict(df.iloc[1], PAY_0=value)
+        assert scored.get_score(i) == pytest.approx(score_row(row))
+    pd.testing.assert_frame_equal(what_if.df.set_axis(df.index), df)
+
+
+def test_simulate_applies_other_changes(what_if):
+    grid, scored = what_if.simulate(0, "AGE", changes={"PAY_0": 0, "AGE": 99})
+
+    for i, value in enumerate(grid):
+        row = dict(df.iloc[0], PAY_0=0, AGE=value)
+        assert scored.get_score(i) == pytest.approx(score_row(row))
+
+
+def test_simulate_caches_results(what_if):
+    first = what_if.simulate(2, "PAY_0", changes={"AGE": 40})
+    assert what_if.simulate(2, "PAY_0", changes={"AGE": 40}) is first
+    assert what_if.score_batch.call_count == 1
+
+    what_if.simulate(2, "PAY_0", changes={"AGE": 60})
+    what_if.simulate(2, "PAY_0", grid=[0, 1])
+    assert what_if.score_batch.call_count == 3
+
+
+def test_simulate_evicts_least_recently_used(what_if):
+    first = what_if.simulate(0, "PAY_0")
+    second = what_if.simulate(1, "PAY_0")
+    assert what_if.simulate(0, "PAY_0") is first
+    what_if.simulate(2, "PAY_0")
+
+    assert what_if.simulate(0, "PAY_0") is first
+    assert what_if.simulate(1, "PAY_0") is not second
+    assert what_if.score_batch.call_count == 4
+
+
+def test_get_variant_uses_nearest_grid_value(what_if):
+    variant = what_if.get_variant(1, "AGE", 33)
+
+    assert variant["value"] == 40
+    assert variant["score"] == pytest.approx(score_row(dict(df.iloc[1], AGE=40)))
+    assert [name for name, _ in variant["contributions"]] == ["AGE", "PAY_0", "LIMIT_BAL"]
+    assert what_if.get_nearest("AGE", 51) == 60
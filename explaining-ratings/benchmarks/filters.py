@@ -0,0 +1,57 @@
+"""
+Filter latency of the Explaining Ratings app over synthetic reviews, before and after indexing the attributes.
+
+Before, every filter copied the data frame with df[df[attr] == attr_value] and the filter dropdowns ran
+drop_duplicates() on every render. After, filters intersect the row ids of the attribute index and the dropdowns
+read its value catalog. Run it from the explaining-ratings directory:
+
+    python -m benchmarks.filters [reviews]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.reviews import make_reviews
+from src.config import Configuration
+from src.utils.data_utils import AttributeIndex
+
+
+def filter_data_frame(df, filters_map):
+    for value in filters_map.values():
+        for attr, attr_value in value.items():
+            df = df[df[attr] == attr_value]
+    return df
+
+
+def time_call(call, repeats=20):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    return np.median(durations) * 1000
+
+
+def main(count=500000):
+    config = Configuration()
+    df = make_reviews(count, words_per_review=10)
+    start = time.perf_counter()
+    index = AttributeIndex(df, config.filterable_columns)
+    print(f"{count:,} reviews, attribute index built in {time.perf_counter() - start:.2f}s")
+
+    filters = {}
+    print(f"{'filters':>8}{'rows':>10}{'before ms':>12}{'after ms':>12}")
+    for i, column in enumerate(['country', 'reviews.rating', 'city']):
+        filters[i] = {column: index.get_values(column)[1]}
+        before = time_call(lambda: filter_data_frame(df, filters))
+        after = time_call(lambda: index.filter(filters))
+        print(f"{i + 1:>8}{len(index.filter(filters)):>10,}{before:>12.2f}{after:>12.2f}")
+
+    before = time_call(lambda: [df[column].drop_duplicates() for column in config.filterable_columns])
+    after = time_call(lambda: [index.get_values(column) for column in config.filterable_columns])
+    print(f"dropdown values: before {before:.2f}ms, after {after:.4f}ms")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+"""
+Startup time and memory of the Explaining Ratings app: loading the reviews and building or loading the attribute
+and term indexes, as Configuration.init_dataset does.
+
+Before, pandas parsed the whole file at once and the indexes were built on every start. The first start now
+parses the file in chunks into categoricals and caches it with the term indexes, later starts load both from the
+cache. Each start runs in a fresh process. Peak memory is how far the resident memory of the process rose above
+its level before the start. Frame memory is the deep size of the loaded data frame. A tenth of the reviews miss a
+filter value and are dropped. Run it from the explaining-ratings directory:
+
+    python -m benchmarks.loading [reviews]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.reviews import make_reviews
+from src.config import Configuration
+from src.utils.data_utils import AttributeIndex
+from src.utils.term_index import TermIndex
+from src.utils.word_cloud_utils import stopwords
+
+
+def get_memory():
+    """
+    Return the current and peak resident memory of this process in MB, read from /proc on Linux.
+
+    The peak is not the one of getrusage, which a spawned process inherits from the process it was forked from.
+    """
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                memory[key] = int(value.split()[0]) / 1024
+    return memory["VmRSS"], memory["VmHWM"]
+
+
+def measure(mode, csv_path, cache_dir):
+    config = Configuration()
+    config.training_path = csv_path
+    config.data_cache_dir = cache_dir
+    before, _ = get_memory()
+    start = time.perf_counter()
+    if mode == "pandas":
+        df = pd.read_csv(csv_path)
+        df.dropna(subset=config.filterable_columns, inplace=True)
+        df[config.rating_column] = df[config.rating_column].astype(int)
+        df = df.reset_index(drop=True)
+        AttributeIndex(df, config.filterable_columns)
+        for column in config.review_column_list:
+            TermIndex.from_texts(df[column], stopwords)
+    else:
+        config.init_dataset()
+        df = config.dataset
+    duration = time.perf_counter() - start
+    _, peak = get_memory()
+    return len(df), duration, peak - before, df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def measure_in_process(mode, csv_path, cache_dir):
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(measure, (mode, csv_path, cache_dir))
+
+
+def main(count=1000000):
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "reviews.csv")
+        df = make_reviews(count)
+        columns = Configuration().filterable_columns
+        missing = np.random.RandomState(0).rand(count) < 0.1
+        df[columns[1]] = df[columns[1]].where(~missing)
+        df.to_csv(csv_path, index=False)
+        cache_dir = os.path.join(directory, "cache")
+
+        print(f"{count:,} reviews, {os.path.getsize(csv_path) / 2 ** 20:.0f} MB of CSV")
+        print(f"{'start':<22}{'reviews':>10}{'seconds':>10}{'peak MB':>10}{'frame MB':>10}")
+        for name, mode in [("pandas", "pandas"), ("first start", "cache"), ("later start", "cache")]:
+            rows, duration, peak, frame = measure_in_process(mode, csv_path, cache_dir)
+            print(f"{name:<22}{rows:>10,}{duration:>10.2f}{peak:>10.1f}{frame:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
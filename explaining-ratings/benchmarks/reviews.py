@@ -0,0 +1,37 @@
+"""
+Synthetic hotel reviews with the columns of the Hotel Reviews data set, to benchmark with more reviews than it has.
+"""
+import numpy as np
+import pandas as pd
+
+from src.config import Configuration
+
+
+def make_reviews(count, words_per_review=40, vocabulary_size=20000, seed=1234):
+    """
+    Return reviews whose words follow a Zipf distribution, like the words of natural language texts.
+
+    :param count: number of reviews
+    :param words_per_review: number of words of a review description, titles have a tenth of them
+    :param vocabulary_size: number of distinct words
+    :param seed: random seed
+    :return: Pandas DataFrame
+    """
+    random = np.random.RandomState(seed)
+    vocabulary = np.array([f"word{i}" for i in range(vocabulary_size)], dtype=object)
+    probabilities = 1 / np.arange(1, vocabulary_size + 1)
+    probabilities /= probabilities.sum()
+
+    def make_texts(length):
+        words = vocabulary[random.choice(vocabulary_size, size=(count, length), p=probabilities)]
+        return [" ".join(row) for row in words]
+
+    config = Configuration()
+    df = pd.DataFrame({
+        column: np.array([f"{column} {i}" for i in range(100)], dtype=object)[random.zipf(1.5, count) % 100]
+        for column in config.filterable_columns
+    })
+    df["reviews.rating"] = random.randint(1, 6, count)
+    df["reviews.title"] = make_texts(max(1, words_per_review // 10))
+    df["reviews.text"] = make_texts(words_per_review)
+    return df
@@ -0,0 +1,42 @@
+"""
+Word cloud latency of the Explaining Ratings app over synthetic reviews, before and after counting the terms once.
+
+Before, the texts of the filtered reviews were joined into one string and WordCloud tokenised and counted it on
+every request. After, the term counts of a subset are summed from the term index built at load time and drawn
+with WordCloud.generate_from_frequencies. Run it from the explaining-ratings directory:
+
+    python -m benchmarks.word_cloud [reviews]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.reviews import make_reviews
+from src.utils.term_index import TermIndex
+from src.utils.word_cloud_utils import merge_to_single_text, plot_word_cloud, plot_word_cloud_from_frequencies
+from src.utils.word_cloud_utils import stopwords
+
+
+def time_call(call):
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def main(count=200000):
+    texts = make_reviews(count)["reviews.text"]
+    start = time.perf_counter()
+    index = TermIndex.from_texts(texts, stopwords)
+    print(f"{count:,} reviews, term index built in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'reviews':>10}{'before s':>12}{'after s':>12}")
+    for subset in (count // 100, count // 10, count):
+        rows = np.sort(np.random.RandomState(subset).choice(count, subset, replace=False))
+        before = time_call(lambda: plot_word_cloud(merge_to_single_text(texts.iloc[rows])))
+        after = time_call(lambda: plot_word_cloud_from_frequencies(index.get_frequencies(rows)))
+        print(f"{subset:>10,}{before:>12.2f}{after:>12.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -2,10 +2,11 @@ from h2o_wave import main, app, Q, ui
 import json
 
 from .config import Configuration
-from .utils.word_cloud_utils import plot_word_cloud, merge_to_single_text
-from .utils.data_utils import filter_data_frame
+from .utils.word_cloud_utils import plot_word_cloud_from_frequencies
+from .utils.result_cache import ResultCache
 
 config = Configuration()
+word_cloud_cache = ResultCache(config.word_cloud_cache_bytes, config.word_cloud_workers)
 
 
 def render_home(q: Q):
@@ -54,7 +55,7 @@ def populate_dropdown_list(q: Q):
                 label="Choose a value for selected review attribute",
                 placeholder=attr_val,
                 choices=[ui.choice(name=json.dumps({'id': key, 'attr': attr, 'attr_val': column}), label=column) for
-                         column in config.dataset[attr].drop_duplicates()],
+                         column in config.attribute_index.get_values(attr)],
                 trigger=True,
             ), )
             items.append(ui.separator())
@@ -99,8 +100,28 @@ def render_filter_toolbar(q):
     q.page["filters"] = ui.form_card(box=config.boxes['filters'], items=filter_dropdown)
 
 
-def get_text_word_cloud_plot(q: Q):
-    return plot_word_cloud(merge_to_single_text(config.dataset[q.client.review]))
+def get_filter_key(filters):
+    """
+    Return the filters of a client in a canonical form: the order and repetitions of the filters do not change
+    the filtered reviews.
+    """
+    pairs = {(attr, attr_val) for value in filters.values() if value for attr, attr_val in value.items()}
+    return tuple(sorted(pairs, key=repr))
+
+
+def make_word_cloud(term_index, rows):
+    frequencies = term_index.get_frequencies(rows)
+    return plot_word_cloud_from_frequencies(frequencies, config.word_cloud_size)
+
+
+async def get_word_cloud(review, filters, rows=None):
+    key = (config.dataset_version, review, get_filter_key(filters), config.word_cloud_size)
+    # The index is passed along, so a word cloud is made from the dataset version of its key
+    return await word_cloud_cache.get(key, make_word_cloud, config.term_indexes[review], rows)
+
+
+async def get_text_word_cloud_plot(q: Q):
+    return await get_word_cloud(q.client.review, {})
 
 
 def render_text_word_cloud_image(q: Q, image):
@@ -112,8 +133,8 @@ def render_text_word_cloud_image(q: Q, image):
     )
 
 
-def render_all_text_word_cloud(q: Q):
-    image = plot_word_cloud(merge_to_single_text(config.dataset[q.client.review]))
+async def render_all_text_word_cloud(q: Q):
+    image = await get_text_word_cloud_plot(q)
 
     q.page['all'] = ui.image_card(
         box=config.boxes['middle_panel'],
@@ -123,11 +144,11 @@ def render_all_text_word_cloud(q: Q):
     )
 
 
-def render_compare_word_cloud(q: Q):
-    df = filter_data_frame(config.dataset, q.client.filters)
+async def render_compare_word_cloud(q: Q):
+    rows = config.attribute_index.filter(q.client.filters)
 
-    if len(df):
-        image = plot_word_cloud(merge_to_single_text(df[q.client.review]))
+    if len(rows):
+        image = await get_word_cloud(q.client.review, q.client.filters, rows)
 
         q.page['compare'] = ui.image_card(
             box=config.boxes['right_panel'],
@@ -174,8 +195,7 @@ async def serve(q: Q):
     if q.args.review_choice:
         q.client.review = q.args.review_choice
         render_filter_toolbar(q)
-        q.client.all_text_word_cloud = get_text_word_cloud_plot(q)
-        render_text_word_cloud_image(q, q.client.all_text_word_cloud)
+        render_text_word_cloud_image(q, await get_text_word_cloud_plot(q))
     elif q.args.add_filter:
         q.client.filter_count += 1
         if not q.client.filters:
@@ -183,26 +203,26 @@ async def serve(q: Q):
         if q.args.filter:
             q.client.filters[q.args.filter] = None
         render_filter_toolbar(q)
-        render_text_word_cloud_image(q, q.client.all_text_word_cloud)
+        render_text_word_cloud_image(q, await get_text_word_cloud_plot(q))
     elif q.args.filter_value:
         q.args.filter_value = json.loads(q.args.filter_value)
         q.client.filters[q.args.filter_value['id']] = {q.args.filter_value['attr']: q.args.filter_value['attr_val']}
         render_filter_toolbar(q)
-        render_text_word_cloud_image(q, q.client.all_text_word_cloud)
+        render_text_word_cloud_image(q, await get_text_word_cloud_plot(q))
     elif q.args.filter:
         q.args.filter = json.loads(q.args.filter)
         q.client.filters[q.args.filter['id']] = {q.args.filter['attr']: q.args.filter['attr_val']}
         render_filter_toolbar(q)
-        render_text_word_cloud_image(q, q.client.all_text_word_cloud)
+        render_text_word_cloud_image(q, await get_text_word_cloud_plot(q))
     elif q.args.reset_filters:
         reset_filters(q)
         render_filter_toolbar(q)
-        render_all_text_word_cloud(q)
+        await render_all_text_word_cloud(q)
     elif q.args.compare_review_button:
         render_filter_toolbar(q)
 
-        render_text_word_cloud_image(q, q.client.all_text_word_cloud)
-        render_compare_word_cloud(q)
+        render_text_word_cloud_image(q, await get_text_word_cloud_plot(q))
+        await render_compare_word_cloud(q)
     else:
         render_home(q)
     await q.page.save()
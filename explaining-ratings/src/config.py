@@ -1,4 +1,9 @@
-import pandas as pd
+import os
+
+from .utils.data_utils import AttributeIndex
+from .utils.review_cache import ReviewCache
+from .utils.term_index import load_term_index
+from .utils.word_cloud_utils import stopwords
 
 
 class Configuration:
@@ -14,11 +19,18 @@ class Configuration:
         self.icon = "ReviewSolid"
         self.review_column_list = ['reviews.title', 'reviews.text']
         self.training_path = "data/Hotel_Reviews.csv"
+        # Parsed reviews are cached here, a new CSV file is parsed again
+        self.data_cache_dir = "data/cache"
         self.default_model = "explain_rating_model"
 
         self.dataset = None
+        # Bumped on every load of the dataset, results cached for an older one are never served again
+        self.dataset_version = 0
+        self.term_indexes = None
+        self.attribute_index = None
         self.filterable_columns = ['categories', 'city', 'country', 'postalCode', 'province',
                                    'reviews.rating', 'reviews.userCity', 'reviews.userProvince']
+        self.rating_column = 'reviews.rating'
         self.column_mapping = {
             'reviews.title': 'Review Title',
             'reviews.text': 'Review Description',
@@ -32,6 +44,11 @@ class Configuration:
             'reviews.userProvince': 'Reviewer Province',
         }
 
+        # Rendered word clouds are shared by all clients, up to this many bytes of PNG images
+        self.word_cloud_cache_bytes = 64 * 1024 * 1024
+        self.word_cloud_workers = 2
+        self.word_cloud_size = (10, 10)
+
         self.boxes = {
             "banner": "1 1 12 1",
             "content": "1 2 -1 -1",
@@ -44,7 +61,20 @@ class Configuration:
 
     def init_dataset(self, refresh=False):
         if refresh or self.dataset is None:
-            df = pd.read_csv(self.training_path).head(50)
-            df.dropna(subset=self.filterable_columns, inplace=True)
-            df['reviews.rating'] = df['reviews.rating'].astype(int)
-            self.dataset = df
+            review_cache = ReviewCache(self.data_cache_dir)
+            self.dataset = review_cache.load_frame(
+                self.training_path,
+                category_columns=[column for column in self.filterable_columns if column != self.rating_column],
+                integer_columns=[self.rating_column],
+                text_columns=self.review_column_list,
+            )
+            self.attribute_index = AttributeIndex(self.dataset, self.filterable_columns)
+            # Word clouds of any subset of the reviews are summed from term counts made once per review column,
+            # cached with the parsed reviews
+            cache_path = review_cache.get_cache_path(self.training_path)
+            self.term_indexes = {
+                column: load_term_index(
+                    os.path.join(cache_path, f"terms-{column}.npz"), self.dataset[column], stopwords
+                ) for column in self.review_column_list
+            }
+            self.dataset_version += 1
@@ -1,6 +1,73 @@
-def filter_data_frame(df, filters_map):
-    for key, value in filters_map.items():
-        for attr, attr_value in value.items():
-            df = df[df[attr] == attr_value]
+import numpy as np
+import pandas as pd
 
-    return df
+
+class AttributeIndex:
+    """
+    Index of the rows holding each value of the filterable columns.
+
+    Each column is factorised once: its rows are sorted by value code, so the rows of one value are a slice of
+    ascending row ids, and its distinct values are kept as the catalog the filter dropdowns are filled from.
+    Combining filters takes the rows of the rarest filter value and keeps those whose codes match the other
+    filters, so it costs the size of the smallest match and never copies the data frame.
+    """
+
+    def __init__(self, df, columns):
+        """
+        :param df: Pandas DataFrame with a default index, row ids are row positions
+        :param columns: columns to index
+        """
+        self.row_count = len(df)
+        self._values = {}
+        self._value_codes = {}
+        self._codes = {}
+        self._rows = {}
+        self._offsets = {}
+        for column in columns:
+            try:
+                codes, uniques = pd.factorize(df[column], sort=True)
+            except TypeError:
+                # Values of mixed types cannot be sorted
+                codes, uniques = pd.factorize(df[column])
+            values = uniques.tolist()
+            self._values[column] = values
+            self._value_codes[column] = {value: code for code, value in enumerate(values)}
+            self._codes[column] = codes
+            # Missing values have the code -1, so they come first and are skipped by the offsets
+            self._rows[column] = np.argsort(codes, kind="stable")
+            self._offsets[column] = np.searchsorted(codes[self._rows[column]], np.arange(len(values) + 1))
+
+    def get_values(self, column):
+        """
+        Return the distinct values of a column, sorted when they can be.
+        """
+        return self._values[column]
+
+    def get_rows(self, column, value):
+        """
+        Return the ascending row ids holding a value, no rows for unknown values.
+        """
+        code = self._value_codes[column].get(value)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        offsets = self._offsets[column]
+        return self._rows[column][offsets[code]:offsets[code + 1]]
+
+    def filter(self, filters_map):
+        """
+        Return the rows matching all filters.
+
+        :param filters_map: dict of filter id to a dict of column to value, like the filters of a client
+        :return: NumPy array of ascending row ids
+        """
+        filters = [(attr, attr_value) for value in filters_map.values() for attr, attr_value in (value or {}).items()]
+        if not filters:
+            return np.arange(self.row_count)
+
+        matches = [(self.get_rows(attr, attr_value), attr, attr_value) for attr, attr_value in filters]
+        matches.sort(key=lambda match: len(match[0]))
+        rows = matches[0][0]
+        for _, attr, attr_value in matches[1:]:
+            # Unknown values get a code no row has
+            rows = rows[self._codes[attr][rows] == self._value_codes[attr].get(attr_value, -2)]
+        return rows
@@ -0,0 +1,76 @@
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ResultCache:
+    """
+    Results shared by all clients of the app, e.g. rendered word clouds, bounded in bytes with LRU eviction.
+
+    Results are computed on a thread pool, so the event loop keeps serving other clients meanwhile. Concurrent
+    requests for the same key are served by a single computation: the first request starts it and the others
+    wait for its result instead of computing it again.
+    """
+
+    def __init__(self, max_bytes, max_workers=2):
+        """
+        :param max_bytes: maximum total size of the cached results
+        :param max_workers: number of results computed at once
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    async def get(self, key, compute, *args):
+        """
+        Return the result of a key, computing it with compute(*args) unless it is cached or being computed.
+
+        Results of failed computations are not cached, the error is raised to every waiting request.
+
+        :param key: hashable key identifying the result
+        :param compute: function computing the result, returns str or bytes
+        :return: result
+        """
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+        future = self._pending.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(self._executor, compute, *args)
+            self._pending[key] = future
+            future.add_done_callback(lambda done: self._store(key, done))
+        # A cancelled request must not cancel the computation the other requests wait for
+        return await asyncio.shield(future)
+
+    def clear(self):
+        self._results.clear()
+        self.size = 0
+
+    def _store(self, key, future):
+        del self._pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        result = future.result()
+        size = len(result)
+        if size > self.max_bytes:
+            return
+        self._results[key] = result
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self._results.popitem(last=False)
+            self.size -= len(evicted)
@@ -0,0 +1,213 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+class ReviewCache:
+    """
+    Cache of parsed review CSV files, with the columns the app uses stored in compact files.
+
+    The CSV file is parsed once in chunks, reading only the columns the app uses. Rows missing a filter value are
+    dropped chunk by chunk. Each chunk's filter columns are turned into categoricals before the next chunk is
+    parsed, so one review's city is a small code into a shared list of cities instead of its own Python string.
+    Ratings are stored as the smallest integer type that holds them. Review texts are streamed to one UTF-8 file
+    per column, with their offsets, so the parsed texts of the whole file are never held at once. Later loads read
+    these files instead of parsing the CSV file.
+    """
+
+    columns_file = "columns.json"
+
+    def __init__(self, cache_dir, chunk_size=100000):
+        """
+        :param cache_dir: directory the parsed files are cached in
+        :param chunk_size: number of CSV rows parsed at once
+        """
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+
+    def get_cache_path(self, csv_path):
+        # A changed CSV file gets a new cache entry, the stale one is never read again
+        stat = os.stat(csv_path)
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(self.cache_dir, f"{name}-{stat.st_size}-{stat.st_mtime_ns}")
+
+    def load_frame(self, csv_path, category_columns, integer_columns, text_columns):
+        """
+        Return the reviews of a CSV file, parsing and caching them on the first call.
+
+        Rows missing a value of a category or integer column are dropped.
+
+        :param csv_path: path of the CSV file
+        :param category_columns: columns loaded as categoricals of strings
+        :param integer_columns: columns loaded as the narrowest integer type holding them, decimals are truncated
+        :param text_columns: columns loaded as Python strings, missing texts are NaN
+        :return: Pandas DataFrame with a default index
+        """
+        columns = {"category": category_columns, "integer": integer_columns, "text": text_columns}
+        path = self.get_cache_path(csv_path)
+        if not os.path.exists(os.path.join(path, self.columns_file)):
+            self.write(csv_path, columns, path)
+        return self.read(path)
+
+    def read(self, path):
+        with open(os.path.join(path, self.columns_file)) as f:
+            kinds = json.load(f)
+
+        def load(i, part):
+            return np.load(os.path.join(path, f"{i}.{part}.npy"), allow_pickle=False)
+
+        columns = {}
+        for i, (name, kind) in enumerate(kinds):
+            if kind == "category":
+                columns[name] = pd.Categorical.from_codes(load(i, "codes"), categories=load(i, "categories"))
+            elif kind == "integer":
+                columns[name] = load(i, "values")
+            else:
+                offsets = load(i, "offsets")
+                # The texts are copied out of the page cache, never read into memory as a whole
+                text = np.zeros(0, np.uint8)
+                if offsets[-1]:
+                    text = np.memmap(os.path.join(path, f"{i}.text"), dtype=np.uint8, mode="r")
+                # Kept as the Python strings they are decoded into, the term indexes read them as such
+                columns[name] = pd.Series(decode_texts(text, offsets, load(i, "missing")), dtype=object, copy=False)
+        return pd.DataFrame(columns, copy=False)
+
+    def write(self, csv_path, columns, path):
+        """
+        Parse the columns of a CSV file in chunks into a cache entry.
+
+        The texts of each chunk are encoded and appended to their files before the next chunk is parsed. The entry
+        is written to a temporary directory first and renamed into place, so processes loading the same file
+        concurrently either see a complete entry or none.
+
+        :param csv_path: path of the CSV file
+        :param columns: dict of kind, one of "category", "integer" or "text", to the list of columns of that kind
+        :param path: path of the cache entry
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=self.cache_dir)
+        kinds = {column: kind for kind, names in columns.items() for column in names}
+
+        def get_path(column, part):
+            return os.path.join(temporary_path, f"{list(kinds).index(column)}.{part}")
+
+        def save(column, part, values):
+            np.save(get_path(column, f"{part}.npy"), values, allow_pickle=False)
+
+        try:
+            chunks = {column: [] for column in kinds}
+            text_files = {column: open(get_path(column, "text"), "wb") for column in columns["text"]}
+            try:
+                for chunk in read_chunks(csv_path, columns, self.chunk_size):
+                    for column, values in chunk.items():
+                        if column in text_files:
+                            text, lengths, missing = encode_texts(values)
+                            text_files[column].write(text)
+                            values = lengths, missing
+                        chunks[column].append(values)
+            finally:
+                for text_file in text_files.values():
+                    text_file.close()
+
+            for column, kind in kinds.items():
+                parts = chunks.pop(column)
+                if kind == "category":
+                    values = union_categoricals(parts, sort_categories=True) if parts else pd.Categorical([])
+                    save(column, "codes", values.codes)
+                    save(column, "categories", np.asarray(values.categories, dtype=str))
+                elif kind == "integer":
+                    save(column, "values", narrow_integers(np.concatenate([np.zeros(0, np.int64)] + parts)))
+                else:
+                    lengths = np.concatenate([np.zeros(0, np.int64)] + [part[0] for part in parts])
+                    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+                    np.cumsum(lengths, out=offsets[1:])
+                    save(column, "offsets", offsets)
+                    save(column, "missing", np.concatenate([np.zeros(0, bool)] + [part[1] for part in parts]))
+            with open(os.path.join(temporary_path, self.columns_file), "w") as f:
+                json.dump([[column, kind] for column, kind in kinds.items()], f)
+            os.rename(temporary_path, path)
+        except OSError:
+            # Another process has written the same entry meanwhile
+            if not os.path.exists(os.path.join(path, self.columns_file)):
+                raise
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def read_chunks(csv_path, columns, chunk_size):
+    """
+    Parse the columns of a CSV file in chunks, dropping the rows missing a category or integer value.
+
+    :param csv_path: path of the CSV file
+    :param columns: dict of kind, one of "category", "integer" or "text", to the list of columns of that kind
+    :param chunk_size: number of rows parsed at once
+    :return: generator of dicts of column name to the values of a chunk, Pandas Categorical for category columns
+        and NumPy arrays for the others
+    """
+    required = columns["category"] + columns["integer"]
+    # Codes like postal codes are kept as written, e.g. with their leading zeros
+    dtypes = {column: str for column in columns["category"] + columns["text"]}
+    usecols = required + columns["text"]
+    for chunk in pd.read_csv(csv_path, usecols=usecols, dtype=dtypes, chunksize=chunk_size):
+        chunk = chunk.dropna(subset=required)
+        values = {column: pd.Categorical(chunk[column]) for column in columns["category"]}
+        values.update({
+            column: narrow_integers(chunk[column].to_numpy().astype(np.int64)) for column in columns["integer"]
+        })
+        values.update({column: chunk[column].to_numpy(dtype=object) for column in columns["text"]})
+        yield values
+
+
+def narrow_integers(values):
+    """
+    Return integers in the smallest signed integer type holding them.
+    """
+    if len(values) == 0:
+        return values.astype(np.int8)
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values.astype(np.int64)
+
+
+def encode_texts(texts):
+    """
+    Encode texts as one UTF-8 buffer.
+
+    :param texts: NumPy array of strings, anything else is a missing text
+    :return: tuple of the buffer bytes, the NumPy array of the byte lengths of the texts and the one of their
+        missing flags
+    """
+    missing = np.array([not isinstance(text, str) for text in texts], dtype=bool)
+    encoded = [b"" if is_missing else text.encode("utf-8") for text, is_missing in zip(texts, missing)]
+    return b"".join(encoded), np.array([len(text) for text in encoded], dtype=np.int64), missing
+
+
+def decode_texts(text, offsets, missing, block_size=100000):
+    """
+    Decode the texts of a UTF-8 buffer, as written by ReviewCache.write.
+
+    The buffer is copied out a block of texts at a time, so only the decoded texts are held in full.
+
+    :param text: NumPy array of the buffer bytes, e.g. memory-mapped
+    :param offsets: NumPy array of the byte offsets of the texts
+    :param missing: NumPy array of the missing flags of the texts
+    :param block_size: number of texts copied out at once
+    :return: NumPy array of Python strings, NaN for missing texts
+    """
+    texts = np.empty(len(missing), dtype=object)
+    for block_start in range(0, len(texts), block_size):
+        block_offsets = offsets[block_start:block_start + block_size + 1].tolist()
+        base = block_offsets[0]
+        data = text[base:block_offsets[-1]].tobytes()
+        texts[block_start:block_start + len(block_offsets) - 1] = [
+            data[start - base:end - base].decode("utf-8") for start, end in zip(block_offsets[:-1], block_offsets[1:])
+        ]
+    texts[missing] = np.nan
+    return texts
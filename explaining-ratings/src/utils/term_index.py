@@ -0,0 +1,190 @@
+import hashlib
+import os
+import re
+from array import array
+
+import numpy as np
+
+# Same tokens as WordCloud.process_text
+token_pattern = re.compile(r"\w[\w']*")
+
+
+class TermIndex:
+    """
+    Sparse document-term count matrix of a text column, in CSR layout with NumPy arrays.
+
+    Texts are tokenised and counted once, the way WordCloud.process_text does it: lower case, stopwords and
+    numbers dropped and a trailing "'s" removed. The term frequencies of any subset of the documents are then a
+    sparse row sum, fed to WordCloud.generate_from_frequencies instead of joining and tokenising the texts again.
+    As in WordCloud, plurals are merged into their singular when both appear in the subset. Collocations, the word
+    pairs WordCloud.generate counts by default, are not counted, so clouds show single words only. Counting is the
+    slow part of loading reviews, so the index is saved next to the parsed reviews and loaded from there by later
+    processes.
+    """
+
+    # Saved indexes of another version are built again
+    version = 2
+
+    def __init__(self, terms, indices, data, indptr):
+        """
+        :param terms: NumPy array of the terms
+        :param indices: NumPy array of the term of every entry, ordered by document then term
+        :param data: NumPy array of the count of every entry
+        :param indptr: NumPy array of the offsets of the entries of every document
+        """
+        self.terms = terms
+        self.indices = indices
+        self.data = data
+        self.indptr = indptr
+        self.singulars = get_singulars(terms)
+        self.totals = self.merge_plurals(np.bincount(self.indices, weights=self.data, minlength=len(self.terms)))
+
+    @classmethod
+    def from_texts(cls, texts, stopwords=()):
+        """
+        Count the terms of texts.
+
+        :param texts: iterable of texts, missing values count as empty texts
+        :param stopwords: words left out of the counts
+        :return: TermIndex
+        """
+        stopwords = {word.lower() for word in stopwords}
+        vocabulary = {}
+        term_ids = array("q")
+        row_lengths = []
+        for text in texts:
+            tokens = [get_term(token) for token in token_pattern.findall(text.lower())] if isinstance(text, str) else []
+            ids = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens
+                   if token and token not in stopwords and not token.isdigit()]
+            term_ids.extend(ids)
+            row_lengths.append(len(ids))
+
+        terms = np.array(list(vocabulary), dtype=object)
+        term_ids = np.frombuffer(term_ids, dtype=np.int64) if term_ids else np.zeros(0, np.int64)
+        row_ids = np.repeat(np.arange(len(row_lengths), dtype=np.int64), row_lengths)
+
+        # One entry per distinct (document, term) pair, ordered by document then term
+        keys, counts = np.unique(row_ids * len(terms) + term_ids, return_counts=True)
+        return cls(
+            terms=terms,
+            indices=(keys % max(len(terms), 1)).astype(np.int32),
+            data=counts.astype(np.int32),
+            indptr=np.searchsorted(keys // max(len(terms), 1), np.arange(len(row_lengths) + 1)),
+        )
+
+    def save(self, path, key=""):
+        """
+        Save the index to a NumPy .npz file, written to a temporary file first and renamed into place.
+
+        :param path: path of the file
+        :param key: string identifying what the index was built from, checked by load
+        """
+        # Terms are words without whitespace, so they are saved as one line each in a UTF-8 buffer
+        terms = np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as f:
+            np.savez(f, key=np.array(key), terms=terms, indices=self.indices, data=self.data, indptr=self.indptr)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path, key=""):
+        """
+        Load an index saved by save.
+
+        :param path: path of the file
+        :param key: string identifying what the index must have been built from
+        :return: TermIndex, None if the file does not exist or was saved with another key
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as saved:
+            if str(saved["key"]) != key:
+                return None
+            text = saved["terms"].tobytes().decode("utf-8")
+            terms = np.array(text.split("\n") if text else [], dtype=object)
+            return cls(terms=terms, indices=saved["indices"], data=saved["data"], indptr=saved["indptr"])
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def get_counts(self, rows=None):
+        """
+        Return the term counts of a subset of the documents, with the plurals merged into their singular.
+
+        :param rows: NumPy array of document positions, None for all documents
+        :return: NumPy array of counts per term, 0 for merged plurals
+        """
+        if rows is None:
+            return self.totals
+        selected = np.zeros(len(self), dtype=bool)
+        selected[rows] = True
+        entries = np.repeat(selected, np.diff(self.indptr))
+        return self.merge_plurals(
+            np.bincount(self.indices[entries], weights=self.data[entries], minlength=len(self.terms))
+        )
+
+    def merge_plurals(self, counts):
+        """
+        Add the counts of plurals to their singular when both were counted, like WordCloud does.
+
+        :param counts: NumPy array of counts per term, changed in place
+        :return: the counts
+        """
+        plurals = np.flatnonzero(self.singulars >= 0)
+        singulars = self.singulars[plurals]
+        merged = (counts[plurals] > 0) & (counts[singulars] > 0)
+        # A singular is never a plural itself, so the plurals are merged in one step
+        np.add.at(counts, singulars[merged], counts[plurals[merged]])
+        counts[plurals[merged]] = 0
+        return counts
+
+    def get_frequencies(self, rows=None, max_words=200):
+        """
+        Return the most frequent terms of a subset of the documents.
+
+        :param rows: NumPy array of document positions, None for all documents
+        :param max_words: maximum number of terms, WordCloud draws 200 words by default
+        :return: dict of term to count
+        """
+        counts = self.get_counts(rows)
+        top = np.flatnonzero(counts)
+        if len(top) > max_words:
+            top = top[np.argpartition(-counts[top], max_words - 1)[:max_words]]
+        return {self.terms[i]: float(counts[i]) for i in top}
+
+
+def load_term_index(path, texts, stopwords=()):
+    """
+    Return the term index of texts, loaded from a file or built and saved to it.
+
+    The file must belong to the texts, e.g. be in the cache entry they were loaded from. Indexes saved with other
+    stopwords or by another version of TermIndex are built again.
+
+    :param path: path of the .npz file
+    :param texts: iterable of texts, missing values count as empty texts
+    :param stopwords: words left out of the counts
+    :return: TermIndex
+    """
+    key = hashlib.sha1("\n".join([str(TermIndex.version)] + sorted(stopwords)).encode("utf-8")).hexdigest()
+    index = TermIndex.load(path, key)
+    if index is None:
+        index = TermIndex.from_texts(texts, stopwords)
+        index.save(path, key)
+    return index
+
+
+def get_term(token):
+    return token[:-2] if token.endswith("'s") else token
+
+
+def get_singulars(terms):
+    """
+    Find the singular of plural terms, words ending in "s" but not "ss" whose singular is a term too.
+
+    :param terms: NumPy array of distinct terms
+    :return: NumPy array of the position of the singular of every term, -1 for terms which are not plurals
+    """
+    positions = {term: i for i, term in enumerate(terms)}
+    return np.array([
+        positions.get(term[:-1], -1) if term.endswith("s") and not term.endswith("ss") else -1 for term in terms
+    ], dtype=np.int64)
@@ -2,20 +2,30 @@ import io
 import base64
 
 from wordcloud import WordCloud, STOPWORDS
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 stopwords = set(STOPWORDS)
 
 
-def plot_word_cloud(text):
+def plot_word_cloud(text, size=(10, 10)):
     word_cloud = WordCloud(
         background_color='white', stopwords=stopwords, min_font_size=10).generate(text)
+    return plot_word_cloud_image(word_cloud, size)
 
-    plt.figure(figsize=(10, 10))
-    plt.imshow(word_cloud)
-    plt.axis("off")
-    plt.tight_layout(pad=0)
-    return get_image_from_matplotlib(plt)
+
+def plot_word_cloud_from_frequencies(frequencies, size=(10, 10)):
+    word_cloud = WordCloud(background_color='white', min_font_size=10).generate_from_frequencies(frequencies)
+    return plot_word_cloud_image(word_cloud, size)
+
+
+def plot_word_cloud_image(word_cloud, size):
+    # Not attached to pyplot, so word clouds can be drawn from several threads at once
+    figure = Figure(figsize=size)
+    axes = figure.subplots()
+    axes.imshow(word_cloud)
+    axes.axis("off")
+    figure.tight_layout(pad=0)
+    return get_image_from_matplotlib(figure)
 
 
 def get_image_from_matplotlib(matplotlib_obj):
@@ -26,9 +36,4 @@ def get_image_from_matplotlib(matplotlib_obj):
 
 
 def merge_to_single_text(all_texts):
-    text = ''
-
-    for t in all_texts:
-        text += str(t).lower() + ' '
-
-    return text
+    return ''.join(str(t).lower() + ' ' for t in all_texts)
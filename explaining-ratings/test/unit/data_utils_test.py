@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.data_utils import AttributeIndex
+
+
+rng = np.random.RandomState(5)
+count = 500
+df = pd.DataFrame({
+    # As loaded from the review cache
+    "City": pd.Categorical(rng.choice(["Paris", "London", "Amsterdam", "Vienna"], count)),
+    "Hotel": pd.Categorical(rng.choice(["Hotel A", "Hotel B", "Hotel C"], count, p=[0.8, 0.15, 0.05])),
+    "Rating": rng.randint(1, 6, count).astype(np.int8),
+    # Not loaded through the cache, with missing values
+    "Trip": pd.Series(rng.choice(["Leisure", "Business", None], count), dtype=object),
+})
+columns = list(df.columns)
+index = AttributeIndex(df, columns)
+
+
+def get_mask_rows(filters):
+    mask = np.ones(count, dtype=bool)
+    for column, value in filters:
+        mask &= (df[column] == value).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def get_filters_map(filters):
+    # Filters are added one at a time, each with its own id, and a filter being added has no value yet
+    filters_map = {str(i): {column: value} for i, (column, value) in enumerate(filters)}
+    filters_map["new"] = None
+    return filters_map
+
+
+def random_filters(size):
+    chosen = rng.choice(columns, size)
+    return [(column, rng.choice(df[column].dropna().unique())) for column in chosen]
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4])
+def test_filter_matches_pandas_masks(size):
+    for _ in range(50):
+        filters = random_filters(size)
+        rows = index.filter(get_filters_map(filters))
+        np.testing.assert_array_equal(rows, get_mask_rows(filters))
+
+
+def test_filter_with_values_of_one_column():
+    filters = [("City", "Paris"), ("City", "London")]
+    assert len(index.filter(get_filters_map(filters))) == 0
+    filters = [("City", "Paris"), ("City", "Paris")]
+    np.testing.assert_array_equal(index.filter(get_filters_map(filters)), get_mask_rows(filters))
+
+
+def test_filter_with_unknown_values():
+    assert len(index.filter(get_filters_map([("City", "Berlin")]))) == 0
+    assert len(index.filter(get_filters_map([("Hotel", "Hotel C"), ("Trip", "Business"), ("Rating", 9)]))) == 0
+
+
+def test_no_filters():
+    np.testing.assert_array_equal(index.filter({}), np.arange(count))
+
+
+def test_get_values():
+    assert index.get_values("City") == ["Amsterdam", "London", "Paris", "Vienna"]
+    assert index.get_values("Rating") == [1, 2, 3, 4, 5]
+    # Missing values are not a value to filter on
+    assert index.get_values("Trip") == ["Business", "Leisure"]
+
+
+def test_get_rows():
+    for column in columns:
+        for value in index.get_values(column):
+            np.testing.assert_array_equal(index.get_rows(column, value), get_mask_rows([(column, value)]))
+
+
+def test_mixed_types():
+    mixed = pd.DataFrame({"Value": pd.Series(["a", 1, "b", 1, None], dtype=object)})
+    mixed_index = AttributeIndex(mixed, ["Value"])
+    assert set(mixed_index.get_values("Value")) == {"a", "b", 1}
+    np.testing.assert_array_equal(mixed_index.filter({"1": {"Value": 1}}), [1, 3])
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import pytest
+from src.utils.result_cache import ResultCache
+
+
+class Computation:
+    """
+    Computation blocking until released, counting its calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    def __call__(self, result):
+        self.calls += 1
+        self.started.set()
+        self.released.wait(5)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+async def wait_started(computation):
+    await asyncio.get_running_loop().run_in_executor(None, computation.started.wait, 5)
+
+
+def test_concurrent_requests_share_one_computation():
+    cache = ResultCache(max_bytes=100)
+    compute = Computation()
+
+    async def run():
+        requests = [asyncio.ensure_future(cache.get("key", compute, "result")) for _ in range(5)]
+        await wait_started(compute)
+        compute.released.set()
+        return await asyncio.gather(*requests)
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert compute.calls == 1
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert "key" in cache
+
+    assert asyncio.run(cache.get("key", compute, "other")) == "result"
+    assert compute.calls == 1
+    assert cache.hits == 1
+
+
+def test_failed_computation_is_raised_to_every_request_and_not_cached():
+    cache = ResultCache(max_bytes=100)
+    compute = Computation()
+
+    async def run():
+        requests = [asyncio.ensure_future(cache.get("key", compute, ValueError("failed"))) for _ in range(3)]
+        await wait_started(compute)
+        compute.released.set()
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert [str(error) for error in errors] == ["failed"] * 3
+    assert compute.calls == 1
+    assert "key" not in cache
+
+    assert asyncio.run(cache.get("key", compute, "result")) == "result"
+    assert compute.calls == 2
+
+
+def test_cancelled_request_does_not_cancel_the_computation():
+    cache = ResultCache(max_bytes=100)
+    compute = Computation()
+
+    async def run():
+        cancelled = asyncio.ensure_future(cache.get("key", compute, "result"))
+        waiting = asyncio.ensure_future(cache.get("key", compute, "result"))
+        await wait_started(compute)
+        cancelled.cancel()
+        compute.released.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await waiting
+
+    assert asyncio.run(run()) == "result"
+    assert "key" in cache
+
+
+def get_all(cache, keys):
+    async def run():
+        return [await cache.get(key, str.upper, key) for key in keys]
+
+    return asyncio.run(run())
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ResultCache(max_bytes=10)
+    get_all(cache, ["aaaa", "bbbb"])
+    # Reading "aaaa" makes "bbbb" the least recently used result
+    get_all(cache, ["aaaa", "ccc"])
+
+    assert "aaaa" in cache and "ccc" in cache and "bbbb" not in cache
+    assert cache.size == 7
+    assert len(cache) == 2
+
+
+def test_size_is_bounded_in_bytes():
+    cache = ResultCache(max_bytes=10)
+    get_all(cache, ["a" * 4, "b" * 4, "c" * 4, "d" * 9])
+    assert len(cache) == 1 and "d" * 9 in cache
+    assert cache.size == 9
+
+    # Larger than the whole cache, returned without evicting anything
+    assert get_all(cache, ["e" * 11]) == ["E" * 11]
+    assert len(cache) == 1 and "d" * 9 in cache
+
+
+def test_clear():
+    cache = ResultCache(max_bytes=10)
+    get_all(cache, ["aa", "bb"])
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
@@ -0,0 +1,149 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils import review_cache
+from src.utils.review_cache import ReviewCache, decode_texts, encode_texts, narrow_integers
+
+
+columns = {"category": ["Hotel_Name", "Postal_Code"], "integer": ["Rating"], "text": ["Positive", "Negative"]}
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / "reviews.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "Hotel_Name,Postal_Code,Rating,Positive,Negative,Unused\n"
+            "Hotel Arena,01234,8.7,Great location,,x\n"
+            "Hôtel Élysée,75008,9,Café downstairs ☕,Noisy,x\n"
+            ",01234,7,Dropped,Dropped,x\n"
+            "Hotel Arena,00001,10,,Small rooms,x\n"
+            "Hotel K,01234,,Dropped,Dropped,x\n"
+            "Hotel K,75008,5,\"Quiet, clean\",,x\n"
+            "Hotel Arena,01234,6,Staff,Bed,x\n"
+        )
+    return path
+
+
+def get_expected():
+    return pd.DataFrame({
+        "Hotel_Name": ["Hotel Arena", "Hôtel Élysée", "Hotel Arena", "Hotel K", "Hotel Arena"],
+        "Postal_Code": ["01234", "75008", "00001", "75008", "01234"],
+        "Rating": [8, 9, 10, 5, 6],
+        "Positive": ["Great location", "Café downstairs ☕", np.nan, "Quiet, clean", "Staff"],
+        "Negative": [np.nan, "Noisy", "Small rooms", np.nan, "Bed"],
+    })
+
+
+def load(cache, csv_path):
+    return cache.load_frame(csv_path, columns["category"], columns["integer"], columns["text"])
+
+
+def assert_reviews(df):
+    expected = get_expected()
+    assert list(df.columns) == list(expected.columns)
+    for column in columns["category"]:
+        assert df[column].dtype == "category"
+        assert df[column].astype(object).tolist() == expected[column].tolist()
+    assert df["Rating"].dtype == np.int8
+    assert df["Rating"].tolist() == expected["Rating"].tolist()
+    for column in columns["text"]:
+        assert df[column].dtype == object
+        assert df[column].isna().tolist() == expected[column].isna().tolist()
+        assert df[column].dropna().tolist() == expected[column].dropna().tolist()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_round_trip(tmp_path, csv_path, chunk_size, monkeypatch):
+    cache = ReviewCache(str(tmp_path / "cache"), chunk_size)
+
+    assert_reviews(load(cache, csv_path))
+    entries = os.listdir(cache.cache_dir)
+    assert entries == [os.path.basename(cache.get_cache_path(csv_path))]
+
+    # Read from the cache entry, not parsed again
+    monkeypatch.setattr(review_cache, "read_chunks", None)
+    assert_reviews(load(cache, csv_path))
+    assert os.listdir(cache.cache_dir) == entries
+
+
+def test_changed_file_gets_a_new_entry(tmp_path, csv_path):
+    cache = ReviewCache(str(tmp_path / "cache"))
+    load(cache, csv_path)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("Hotel K,75008,4,Late,Early,x\n")
+
+    df = load(cache, csv_path)
+    assert len(df) == 6
+    assert df["Positive"].iloc[-1] == "Late"
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_no_reviews_left(tmp_path):
+    path = str(tmp_path / "reviews.csv")
+    with open(path, "w") as f:
+        f.write("Hotel_Name,Postal_Code,Rating,Positive,Negative\n,01234,7,Dropped,Dropped\n")
+
+    df = load(ReviewCache(str(tmp_path / "cache")), path)
+    assert len(df) == 0
+    assert list(df.columns) == list(get_expected().columns)
+
+
+def test_concurrent_writers(tmp_path, csv_path):
+    cache = ReviewCache(str(tmp_path / "cache"), chunk_size=2)
+    barrier = threading.Barrier(4)
+    frames = []
+
+    def load_together():
+        barrier.wait()
+        frames.append(load(cache, csv_path))
+
+    threads = [threading.Thread(target=load_together) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(frames) == 4
+    for df in frames:
+        assert_reviews(df)
+    # The temporary directories of the writers which lost the race are removed
+    assert os.listdir(cache.cache_dir) == [os.path.basename(cache.get_cache_path(csv_path))]
+
+
+def test_writer_losing_the_race_keeps_the_entry(tmp_path, csv_path):
+    cache = ReviewCache(str(tmp_path / "cache"))
+    path = cache.get_cache_path(csv_path)
+    cache.write(csv_path, columns, path)
+    cache.write(csv_path, columns, path)
+
+    assert_reviews(cache.read(path))
+    assert os.listdir(cache.cache_dir) == [os.path.basename(path)]
+
+
+def test_encode_and_decode_texts():
+    texts = np.array(["a", "", np.nan, "ünïcödé", None, "b" * 10], dtype=object)
+    text, lengths, missing = encode_texts(texts)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    buffer = np.frombuffer(text, dtype=np.uint8)
+
+    for block_size in (1, 4, 100):
+        decoded = decode_texts(buffer, offsets, missing, block_size)
+        assert decoded[[0, 1, 3, 5]].tolist() == ["a", "", "ünïcödé", "b" * 10]
+        assert pd.isna(decoded[[2, 4]]).all()
+
+
+@pytest.mark.parametrize("values, dtype", [
+    ([], np.int8),
+    ([-128, 127], np.int8),
+    ([0, 128], np.int16),
+    ([-40000, 0], np.int32),
+    ([0, 2 ** 40], np.int64),
+])
+def test_narrow_integers(values, dtype):
+    narrowed = narrow_integers(np.array(values, dtype=np.int64))
+    assert narrowed.dtype == dtype
+    assert narrowed.tolist() == values
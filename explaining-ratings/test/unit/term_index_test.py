@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from src.utils.term_index import TermIndex, get_singulars, load_term_index
+from src.utils.word_cloud_utils import merge_to_single_text, stopwords
+from wordcloud import WordCloud
+
+
+texts = np.array([
+    "The rooms were clean and the room service was quick",
+    "Great location, the hotel's staff were friendly. Rooms are small!",
+    np.nan,
+    "Bus stop next to the hotel, buses every 10 minutes",
+    "The glass walls of the glasses bar, the boss and the bosses",
+    "Breakfast was great; GREAT coffee, great views and a great view of the hotels",
+    "",
+    "Staff's smile, 2019 renovation, it's the Hotel Café's best café",
+], dtype=object)
+
+
+def process_text(rows):
+    # The counts of the word clouds drawn from the joined texts, without word pairs
+    word_cloud = WordCloud(stopwords=stopwords, collocations=False)
+    counts = word_cloud.process_text(merge_to_single_text(texts[rows]))
+    return {word.lower(): count for word, count in counts.items()}
+
+
+def get_counts(index, rows=None):
+    counts = index.get_counts(rows)
+    return {index.terms[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+
+@pytest.mark.parametrize("rows", [[0, 1, 3, 4, 5, 6, 7], [0, 3], [1, 5, 7], [1], [4], [5]])
+def test_counts_match_word_cloud(rows):
+    index = TermIndex.from_texts(texts, stopwords)
+    assert get_counts(index, np.array(rows)) == process_text(rows)
+
+
+def test_counts_of_all_texts():
+    index = TermIndex.from_texts(texts, stopwords)
+    counts = get_counts(index)
+    assert counts == process_text(np.flatnonzero(texts == texts))
+    assert counts["room"] == 3 and "rooms" not in counts
+    assert counts["hotel"] == 4 and "hotels" not in counts
+    assert counts["café"] == 2
+    # Words ending in "ss" are never plurals, and plurals are only merged into a singular of the texts
+    assert counts["glass"] == 1 and counts["glasses"] == 1
+    assert counts["boss"] == 1 and counts["bosses"] == 1
+    assert counts["bus"] == 1 and counts["buses"] == 1
+
+
+def test_plurals_are_merged_within_the_rows():
+    index = TermIndex.from_texts(texts, stopwords)
+    # Only "rooms" is in the text, the word cloud of the text shows it as is
+    assert get_counts(index, np.array([1]))["rooms"] == 1
+    assert get_counts(index, np.array([0, 1]))["room"] == 3
+
+
+def test_missing_texts_are_empty():
+    # The word clouds of the joined texts used to count missing texts as the word "nan"
+    index = TermIndex.from_texts(texts, stopwords)
+    assert get_counts(index, np.array([2, 6])) == {}
+
+
+def test_csr_layout():
+    index = TermIndex.from_texts(["b a b", np.nan, "a"])
+    assert index.terms.tolist() == ["b", "a"]
+    assert index.indptr.tolist() == [0, 2, 2, 3]
+    assert index.indices.tolist() == [0, 1, 1]
+    assert index.data.tolist() == [2, 1, 1]
+    assert len(index) == 3
+
+
+def test_get_frequencies_keeps_the_most_frequent_terms():
+    index = TermIndex.from_texts(["a a a b b c", "a d"])
+    assert index.get_frequencies(max_words=2) == {"a": 4.0, "b": 2.0}
+    assert index.get_frequencies(np.array([1])) == {"a": 1.0, "d": 1.0}
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "index.npz")
+    built = load_term_index(path, texts, stopwords)
+    loaded = load_term_index(path, [], stopwords)
+
+    assert loaded.terms.tolist() == built.terms.tolist()
+    for name in ("indices", "data", "indptr", "totals"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(built, name))
+    # Saved with other stopwords, built again
+    assert "the" in load_term_index(path, texts).terms
+
+
+def test_get_singulars():
+    singulars = get_singulars(np.array(["views", "view", "class", "clas", "bus", "bu's", "s", ""], dtype=object))
+    assert singulars.tolist() == [1, -1, -1, -1, -1, -1, 7, -1]